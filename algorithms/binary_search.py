@@ -1,37 +1,100 @@
 from __future__ import annotations
-from typing import TypeVar
+from typing import Any, Callable, Iterable, TypeVar
 
 T = TypeVar("T")
 
-def binary_search(l: list[T], item: T) -> int:
+# Every search below takes the same optional arguments:
+# key: applied to the elements of l (never to the value searched for), l must be sorted by it.
+# lo, hi: only search l[lo:hi], hi defaults to len(l).
+
+def bisect_left(l: list[T], x: Any, key: Callable[[T], Any] | None = None, lo: int = 0, hi: int | None = None) -> int:
+    """
+    Returns the first index at which x could be inserted to keep l sorted, ie. before any elements equal to x.
+
+    :complexity:
+    Best/Worst Case Complexity: O(log(N) * comp(T)), where N is hi - lo.
+    """
+    if hi is None:
+        hi = len(l)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (l[mid] if key is None else key(l[mid])) < x:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+def bisect_right(l: list[T], x: Any, key: Callable[[T], Any] | None = None, lo: int = 0, hi: int | None = None) -> int:
+    """
+    Returns the last index at which x could be inserted to keep l sorted, ie. after any elements equal to x.
+
+    :complexity:
+    Best/Worst Case Complexity: O(log(N) * comp(T)), where N is hi - lo.
+    """
+    if hi is None:
+        hi = len(l)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if x < (l[mid] if key is None else key(l[mid])):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+def binary_search(l: list[T], item: Any, key: Callable[[T], Any] | None = None, lo: int = 0, hi: int | None = None) -> int:
     """
     Utilise the binary search algorithm to find the index where a particular element would be stored.
 
     :return: The index at which either:
-        * This item is located, or
+        * This item is located (the first one, if there are several), or
         * Where this item would be inserted to preserve the ordering.
 
     :complexity:
-    Best Case Complexity: O(1), when middle index contains item.
-    Worst Case Complexity: O(log(N)), where N is the length of l.
-    """
-    return _binary_search_aux(l, item, 0, len(l) - 1)
-
-def _binary_search_aux(l: list[T], item: T, lo: int, hi: int) -> int:
-    """
-    Auxilliary method used by binary search.
-    lo: smallest index where the return value could be.
-    hi: largest index where the return value could be.
-    """
-    if lo == hi:
-        return lo
-    mid = (hi + lo) // 2
-    if l[mid] > item:
-        # Item would be before mid
-        return _binary_search_aux(l, item, lo, mid)
-    elif l[mid] < item:
-        # Item would be after mid
-        return _binary_search_aux(l, item, mid+1, hi)
-    elif l[mid] == item:
-        return mid
-    raise ValueError(f"Comparison operator poorly implemented {item} and {l[mid]} cannot be compared.")
+    Best/Worst Case Complexity: O(log(N) * comp(T)), where N is the length of l.
+    """
+    return bisect_left(l, item, key, lo, hi)
+
+def find(l: list[T], x: Any, key: Callable[[T], Any] | None = None, lo: int = 0, hi: int | None = None) -> int:
+    """
+    Returns the index of the first element of l equal to x.
+
+    :complexity:
+    Best/Worst Case Complexity: O(log(N) * comp(T)), where N is hi - lo.
+    :raises KeyError: if there is no such element.
+    """
+    if hi is None:
+        hi = len(l)
+    index = bisect_left(l, x, key, lo, hi)
+    if index < hi and (l[index] if key is None else key(l[index])) == x:
+        return index
+    raise KeyError(x)
+
+def search_many(l: list[T], queries: Iterable[Any], key: Callable[[T], Any] | None = None, lo: int = 0, hi: int | None = None, right: bool = False) -> list[int]:
+    """
+    Returns bisect_left(l, query) for every query, in order (or bisect_right, if right is True).
+
+    As the queries are sorted each search can start where the last one finished. It gallops forward
+    (checking 1, 2, 4, ... elements ahead) to bound where the answer is, then binary searches within
+    that bound, so queries close together cost few comparisons.
+    :pre: queries is sorted.
+
+    :complexity:
+    Best Case Complexity: O(M * comp(T)), when each answer is next to the previous one.
+    Worst Case Complexity: O(M * log(N / M) * comp(T)), where M is the number of queries and N is hi - lo,
+    against O(M * log(N) * comp(T)) for M independent searches.
+    """
+    if hi is None:
+        hi = len(l)
+    bisect = bisect_right if right else bisect_left
+    positions = []
+    for x in queries:
+        # Gallop: find a step where l[lo + step - 1] is past x, the answer is then in (lo + step // 2, lo + step].
+        step = 1
+        while lo + step <= hi:
+            element = l[lo + step - 1] if key is None else key(l[lo + step - 1])
+            if x < element if right else not element < x:
+                break
+            step *= 2
+        lo = bisect(l, x, key, lo + step // 2, min(lo + step, hi))
+        positions.append(lo)
+    return positions
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+import tempfile
+from itertools import islice
+from typing import Callable, IO, Iterable, Iterator
+
+from algorithms.mergesort import adaptive_mergesort, kway_merge
+from mountain import Mountain
+
+RUN_SIZE = 100_000
+FAN_IN = 64
+
+def mountain_record(mountain: Mountain) -> list:
+    """Returns a mountain as a JSON serialisable record."""
+    return [mountain.name, mountain.difficulty_level, mountain.length]
+
+def mountain_from_record(record: list) -> Mountain:
+    """Returns the mountain a record from mountain_record describes."""
+    return Mountain(*record)
+
+def _spill(items: Iterable, encode: Callable) -> IO[str]:
+    """Writes items to a temporary file, one JSON record per line, and returns it rewound."""
+    f = tempfile.TemporaryFile("w+", encoding="utf-8")
+    for item in items:
+        f.write(json.dumps(encode(item), separators=(",", ":")))
+        f.write("\n")
+    f.seek(0)
+    return f
+
+def _read(f: IO[str], decode: Callable) -> Iterator:
+    """Lazily reads back a file written by _spill."""
+    for line in f:
+        yield decode(json.loads(line))
+
+def external_sort(
+    items: Iterable[Mountain],
+    key=None,
+    run_size: int = RUN_SIZE,
+    fan_in: int = FAN_IN,
+    encode: Callable = mountain_record,
+    decode: Callable = mountain_from_record,
+) -> Iterator[Mountain]:
+    """
+    Sorts a stream of mountains which may not fit in memory, yielding them in sorted order.
+    The `key` kwarg allows you to define a custom sorting order. The sort is stable.
+
+    Items are read run_size at a time, each run is sorted in memory with adaptive_mergesort and
+    spilled to a temporary file, and the runs are streamed back through kway_merge. If there are
+    more than fan_in runs, groups of them are first merged into longer runs, so no more than
+    fan_in files are ever open at once. Other record types can be sorted by giving encode and decode
+    functions to and from JSON serialisable records.
+
+    Only one run (or, while merging, one record per run) is held in memory, and a stream
+    which fits in a single run is never written out. The yielded mountains are rebuilt from
+    their records, so they are equal to, but not the same objects as, the ones given.
+    :complexity: Best/Worst Case O(NlogN * comp(T)) comparisons and O(N * log_fan_in(N / run_size)) records written and read
+    """
+    iterator = iter(items)
+    runs = []
+    try:
+        while True:
+            run = adaptive_mergesort(islice(iterator, run_size), key)
+            if not runs and len(run) < run_size:
+                # Everything fit in memory.
+                yield from run
+                return
+            if not run:
+                break
+            runs.append(_spill(run, encode))
+        while len(runs) > fan_in:
+            # Merge consecutive groups, so equal items stay in order.
+            groups = [runs[start:start + fan_in] for start in range(0, len(runs), fan_in)]
+            runs = []
+            for group in groups:
+                runs.append(_spill(kway_merge([_read(f, decode) for f in group], key), encode))
+                for f in group:
+                    f.close()
+        yield from kway_merge([_read(f, decode) for f in runs], key)
+    finally:
+        for f in runs:
+            f.close()
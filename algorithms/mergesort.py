@@ -1,5 +1,9 @@
 from __future__ import annotations
-from typing import TypeVar
+import heapq
+import os
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, TypeVar
 
 T = TypeVar("T")
 
@@ -36,4 +40,316 @@ def mergesort(l: list[T]) -> list[T]:
     break_index = (len(l)+1) // 2
     l1 = mergesort(l[:break_index])
     l2 = mergesort(l[break_index:])
-    return merge(l1, l2)
\ No newline at end of file
+    return merge(l1, l2)
+
+INSERTION_SORT_CUTOFF = 32
+
+def _insertion_sort(keys: list, items: list, lo: int, hi: int) -> None:
+    """
+    Sorts keys[lo:hi] in place, moving items[lo:hi] the same way.
+    :complexity: Best Case O(n * comp(T)) when already sorted, Worst Case O(n^2 * comp(T)), n = hi - lo
+    """
+    for i in range(lo + 1, hi):
+        current_key = keys[i]
+        current_item = items[i]
+        j = i - 1
+        while j >= lo and current_key < keys[j]:
+            keys[j + 1] = keys[j]
+            items[j + 1] = items[j]
+            j -= 1
+        keys[j + 1] = current_key
+        items[j + 1] = current_item
+
+def _merge_into(keys: list, items: list, out_keys: list, out_items: list, lo: int, mid: int, hi: int, keyless: bool) -> None:
+    """
+    Merges the sorted ranges [lo, mid) and [mid, hi) of keys (and items) into out_keys (and out_items) at [lo, hi).
+    Ties are taken from the left range first, keeping the merge stable.
+    :complexity: Best Case O(n) when the ranges are already in order, Worst Case O(n * comp(T)), n = hi - lo
+    """
+    if mid >= hi or not keys[mid] < keys[mid - 1]:
+        # Already in order (or only one range), so just copy it across.
+        for i in range(lo, hi):
+            out_keys[i] = keys[i]
+            if not keyless:
+                out_items[i] = items[i]
+        return
+    left = lo
+    right = mid
+    out = lo
+    while left < mid and right < hi:
+        if keys[right] < keys[left]:
+            out_keys[out] = keys[right]
+            if not keyless:
+                out_items[out] = items[right]
+            right += 1
+        else:
+            out_keys[out] = keys[left]
+            if not keyless:
+                out_items[out] = items[left]
+            left += 1
+        out += 1
+    # At most one of these ranges is non-empty.
+    for i in range(left, mid):
+        out_keys[out] = keys[i]
+        if not keyless:
+            out_items[out] = items[i]
+        out += 1
+    for i in range(right, hi):
+        out_keys[out] = keys[i]
+        if not keyless:
+            out_items[out] = items[i]
+        out += 1
+
+def bottom_up_mergesort(l: list[T], key=None) -> list[T]:
+    """
+    Sort a list using an iterative, bottom-up mergesort, returning a new sorted list.
+    The `key` kwarg allows you to define a custom sorting order, it is called once per element.
+    The sort is stable.
+
+    Runs of INSERTION_SORT_CUTOFF elements are insertion sorted, then merged in passes of
+    doubling width. Each pass merges from one list into a single auxiliary list of the same size
+    and the two are swapped, so nothing is sliced and there is no recursion.
+    :complexity: Best/Worst Case O(NlogN * comp(T)), plus N calls to key
+    """
+    items = list(l)
+    # Without a key the elements are their own keys, so only one list needs moving.
+    keys = items if key is None else [key(item) for item in items]
+    n = len(items)
+    for lo in range(0, n, INSERTION_SORT_CUTOFF):
+        _insertion_sort(keys, items, lo, min(lo + INSERTION_SORT_CUTOFF, n))
+
+    other_keys = [None] * n
+    other_items = other_keys if key is None else [None] * n
+    width = INSERTION_SORT_CUTOFF
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            _merge_into(keys, items, other_keys, other_items, lo, mid, hi, key is None)
+        keys, other_keys = other_keys, keys
+        items, other_items = other_items, items
+        width *= 2
+    return items
+
+
+MIN_RUN = 32
+MIN_GALLOP = 7
+
+def _min_run(n: int) -> int:
+    """
+    Returns a run length between MIN_RUN / 2 and MIN_RUN, chosen so that n / run length
+    is a power of two (or just under one), which keeps the final merges balanced.
+    """
+    extra = 0
+    while n >= MIN_RUN:
+        extra |= n & 1
+        n >>= 1
+    return n + extra
+
+def _count_run(keys: list, items: list, lo: int, n: int) -> int:
+    """
+    Returns the end of the natural run starting at lo. A strictly descending run is reversed
+    in place (strictly, so reversing it cannot reorder equal elements).
+    :complexity: Best/Worst Case O(r * comp(T)), r = the length of the run
+    """
+    hi = lo + 1
+    if hi == n:
+        return hi
+    if keys[hi] < keys[lo]:
+        while hi < n and keys[hi] < keys[hi - 1]:
+            hi += 1
+        keys[lo:hi] = keys[lo:hi][::-1]
+        if items is not keys:
+            items[lo:hi] = items[lo:hi][::-1]
+    else:
+        while hi < n and not keys[hi] < keys[hi - 1]:
+            hi += 1
+    return hi
+
+def _binary_insertion_sort(keys: list, items: list, lo: int, hi: int, start: int) -> None:
+    """
+    Sorts keys[lo:hi] in place (moving items the same way), given keys[lo:start] is already sorted.
+    :complexity: Best/Worst Case O(n * log(n) * comp(T)) comparisons and O(n^2) moves, n = hi - lo
+    """
+    for i in range(start, hi):
+        current_key = keys[i]
+        position = bisect_right(keys, current_key, lo, i)
+        keys[position + 1:i + 1] = keys[position:i]
+        keys[position] = current_key
+        if items is not keys:
+            current_item = items[i]
+            items[position + 1:i + 1] = items[position:i]
+            items[position] = current_item
+
+def _merge_runs(keys: list, items: list, lo: int, mid: int, hi: int) -> None:
+    """
+    Merges the adjacent sorted runs [lo, mid) and [mid, hi) in place, stably.
+
+    Elements already in their final place at either end are skipped using binary search,
+    and only what is left of the first run is copied out. While merging, once one run has
+    supplied MIN_GALLOP elements in a row it is assumed to keep winning: the rest of its
+    winning streak is found with a binary search and moved as a single block.
+    :complexity: Best Case O(log(n) * comp(T)) when the runs are already in order,
+                 Worst Case O(n * comp(T)), n = hi - lo
+    """
+    keyless = items is keys
+    # Elements of the first run not after the start of the second are already in place.
+    lo = bisect_right(keys, keys[mid], lo, mid)
+    if lo == mid:
+        return
+    # As are elements of the second run not before the end of the first.
+    hi = bisect_left(keys, keys[mid - 1], mid, hi)
+
+    left_keys = keys[lo:mid]
+    left_items = left_keys if keyless else items[lo:mid]
+    left = 0
+    left_end = mid - lo
+    right = mid
+    out = lo
+    left_wins = right_wins = 0
+    while left < left_end and right < hi:
+        if left_wins >= MIN_GALLOP:
+            end = bisect_right(left_keys, keys[right], left, left_end)
+            keys[out:out + end - left] = left_keys[left:end]
+            if not keyless:
+                items[out:out + end - left] = left_items[left:end]
+            out += end - left
+            left = end
+            left_wins = 0
+        elif right_wins >= MIN_GALLOP:
+            end = bisect_left(keys, left_keys[left], right, hi)
+            keys[out:out + end - right] = keys[right:end]
+            if not keyless:
+                items[out:out + end - right] = items[right:end]
+            out += end - right
+            right = end
+            right_wins = 0
+        elif keys[right] < left_keys[left]:
+            keys[out] = keys[right]
+            if not keyless:
+                items[out] = items[right]
+            right += 1
+            out += 1
+            right_wins += 1
+            left_wins = 0
+        else:
+            keys[out] = left_keys[left]
+            if not keyless:
+                items[out] = left_items[left]
+            left += 1
+            out += 1
+            left_wins += 1
+            right_wins = 0
+    # Whatever is left of the second run is already in place.
+    keys[out:out + left_end - left] = left_keys[left:left_end]
+    if not keyless:
+        items[out:out + left_end - left] = left_items[left:left_end]
+
+def adaptive_mergesort(l: list[T], key=None) -> list[T]:
+    """
+    Sort a list using a natural merge sort, returning a new sorted list.
+    The `key` kwarg allows you to define a custom sorting order, it is called once per element.
+    The sort is stable.
+
+    The list is split into its existing ascending (or strictly descending, which are reversed) runs,
+    short runs being extended to a minimum length with binary insertion sort. Runs are merged
+    as they are found, keeping the stack of pending runs balanced like Timsort does, with
+    galloping merges (see _merge_runs), so input made of a few long runs sorts in close to linear time.
+    :complexity: Best Case O(N * comp(T)) when already sorted (or reverse sorted),
+                 Worst Case O(NlogN * comp(T)), plus N calls to key
+    """
+    items = list(l)
+    keys = items if key is None else [key(item) for item in items]
+    n = len(items)
+    min_run = _min_run(n)
+    # Stack of (start, length) of runs still to be merged.
+    runs = []
+    lo = 0
+    while lo < n:
+        hi = _count_run(keys, items, lo, n)
+        if hi - lo < min_run:
+            forced = min(lo + min_run, n)
+            _binary_insertion_sort(keys, items, lo, forced, hi)
+            hi = forced
+        runs.append((lo, hi - lo))
+        lo = hi
+        # Each run must be longer than the one above it, and than the two above it combined.
+        while len(runs) > 1:
+            length = len(runs)
+            if length > 2 and runs[-3][1] <= runs[-2][1] + runs[-1][1]:
+                at = length - 3 if runs[-3][1] < runs[-1][1] else length - 2
+            elif runs[-2][1] <= runs[-1][1]:
+                at = length - 2
+            else:
+                break
+            _merge_at(keys, items, runs, at)
+    while len(runs) > 1:
+        _merge_at(keys, items, runs, len(runs) - 2)
+    return items
+
+def _merge_at(keys: list, items: list, runs: list[tuple[int, int]], at: int) -> None:
+    """Merges run `at` on the run stack with the run after it."""
+    start, length = runs[at]
+    following_length = runs[at + 1][1]
+    _merge_runs(keys, items, start, start + length, start + length + following_length)
+    runs[at:at + 2] = [(start, length + following_length)]
+
+
+def kway_merge(iterables: Iterable[Iterable[T]], key=None) -> Iterator[T]:
+    """
+    Lazily merges any number of sorted iterables into one sorted stream,
+    keeping the smallest current element of each in a heap.
+    The `key` kwarg allows you to define a custom sorting order, it is called once per element.
+    The merge is stable: equal elements come out in the order of the iterables they came from.
+    :pre: Each iterable is sorted by key.
+    :complexity: Best/Worst Case O(N * log(k) * comp(T)), N = the total number of elements, k = the number of iterables
+    """
+    heap = []
+    for number, iterable in enumerate(iterables):
+        iterator = iter(iterable)
+        for item in iterator:
+            heap.append((item if key is None else key(item), number, item, iterator))
+            break
+    heapq.heapify(heap)
+    while heap:
+        _, number, item, iterator = heap[0]
+        yield item
+        for item in iterator:
+            # The number breaks ties, so neither items nor iterators are ever compared.
+            heapq.heapreplace(heap, (item if key is None else key(item), number, item, iterator))
+            break
+        else:
+            heapq.heappop(heap)
+
+PARALLEL_CUTOFF = 100_000
+
+def _sort_chunk(keys: list, start: int) -> list[tuple]:
+    """
+    Returns (key, index) pairs for keys, whose first element is at index start, sorted by key.
+    Run in a worker process by parallel_mergesort.
+    """
+    return adaptive_mergesort(zip(keys, range(start, start + len(keys))), key=lambda pair: pair[0])
+
+def parallel_mergesort(l: list[T], key=None, workers: int = None, cutoff: int = PARALLEL_CUTOFF) -> list[T]:
+    """
+    Sort a list using a pool of worker processes, returning a new sorted list.
+    The `key` kwarg allows you to define a custom sorting order, it is called once per element
+    (in this process, so it does not need to be picklable). The sort is stable.
+
+    The keys are split into one chunk per worker, each chunk is sorted with adaptive_mergesort in a
+    ProcessPoolExecutor, and the sorted chunks are merged back with a heap. Only the keys are sent to
+    the workers, so the elements themselves stay in this process and keep their identity.
+    Lists shorter than `cutoff` (or with a single worker) are sorted in process instead,
+    as sending them to the workers would cost more than it saves.
+    :complexity: Best/Worst Case O(N/W * logN * comp(T) + N * logW * comp(T)) with W workers, plus pickling the keys
+    """
+    items = list(l)
+    workers = workers or os.cpu_count() or 1
+    if len(items) < cutoff or workers <= 1:
+        return adaptive_mergesort(items, key)
+    keys = items if key is None else [key(item) for item in items]
+    size = -(-len(keys) // workers)
+    starts = range(0, len(keys), size)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        runs = list(executor.map(_sort_chunk, [keys[start:start + size] for start in starts], starts))
+    return [items[index] for _, index in kway_merge(runs, key=lambda pair: pair[0])]
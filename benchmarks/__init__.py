@@ -0,0 +1,4 @@
+"""
+Benchmarks for the trail and mountain structures.
+Each module can be run from the repository root, e.g. `python -m benchmarks.compiled_trail`.
+"""
@@ -0,0 +1,40 @@
+"""Memory use and attribute access speed of trails with a __dict__ against Trail.compacted() ones."""
+
+import timeit
+
+from personality import LazyWalker
+from benchmarks.trails import random_trail
+from benchmarks.trail_interning import traced_size
+
+def touch_all(trail) -> int:
+    """Reads every attribute of every node, returning how many trails were visited."""
+    count = 0
+    stack = [trail]
+    while stack:
+        store = stack.pop().store
+        count += 1
+        if store is None:
+            continue
+        if hasattr(store, "mountain"):
+            store.mountain.name, store.mountain.difficulty_level, store.mountain.length
+            stack.append(store.following)
+        else:
+            stack.extend((store.path_top, store.path_bottom, store.path_follow))
+    return count
+
+def main(mountains: int = 300_000, repeats: int = 5) -> None:
+    trail, trail_size = traced_size(lambda: random_trail(mountains))
+    compact, compact_size = traced_size(trail.compacted)
+    print(f"{mountains} mountains, {touch_all(trail)} trails")
+    print(f"memory: with __dict__ {trail_size / 1e6:.1f}MB, compact {compact_size / 1e6:.1f}MB ({compact_size / trail_size:.0%})")
+    for name, run in [
+        ("read every attribute", touch_all),
+        ("collect_all_mountains", lambda t: t.collect_all_mountains()),
+        ("follow_path(LazyWalker)", lambda t: t.follow_path(LazyWalker())),
+    ]:
+        with_dict = timeit.timeit(lambda: run(trail), number=repeats)
+        slotted = timeit.timeit(lambda: run(compact), number=repeats)
+        print(f"{name:>24}: with __dict__ {with_dict:.3f}s, compact {slotted:.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Compares Trail.follow_path against the CompiledTrail walker, and follow_paths for batches of walkers."""
+
+import timeit
+
+from personality import TopWalker, BottomWalker, LazyWalker
+from benchmarks.trails import random_trail
+
+def main(mountains: int = 100_000, walkers: int = 50, batch: int = 10_000) -> None:
+    trail = random_trail(mountains)
+    compile_time = timeit.timeit(trail.compile, number=1)
+    compiled = trail.compile()
+    print(f"{mountains} mountains, {len(compiled)} nodes, compile: {compile_time:.3f}s")
+    for personality in (TopWalker, BottomWalker, LazyWalker):
+        tree = timeit.timeit(lambda: trail.follow_path(personality()), number=walkers)
+        flat = timeit.timeit(lambda: compiled.follow_path(personality()), number=walkers)
+        print(f"{personality.__name__:>12}: follow_path {tree:.3f}s, compiled {flat:.3f}s, speedup {tree / flat:.1f}x")
+
+    kinds = (TopWalker, BottomWalker, LazyWalker)
+    small = random_trail(mountains // 100)
+    separate = timeit.timeit(lambda: [small.follow_path(kinds[i % 3]()) for i in range(batch)], number=1)
+    together = timeit.timeit(lambda: small.follow_paths([kinds[i % 3]() for i in range(batch)]), number=1)
+    print(f"{batch} walkers on {mountains // 100} mountains: follow_path {separate:.3f}s, follow_paths {together:.3f}s, speedup {separate / together:.1f}x")
+
+if __name__ == "__main__":
+    main()
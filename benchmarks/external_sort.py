@@ -0,0 +1,26 @@
+"""Peak memory and time of external_sort against sorting in memory, for a stream of mountains."""
+
+import sys
+import timeit
+from collections import deque
+
+from algorithms.mergesort import adaptive_mergesort
+from algorithms.external_sort import external_sort
+from benchmarks.serialize import peak
+from mountain import Mountain
+
+def stream(n: int):
+    """Yields n mountains, without ever holding them all."""
+    for i in range(n):
+        yield Mountain(f"m{i}", (i * 7919) % 10, (i * 104729) % 100_000)
+
+def main(n: int = 300_000, run_size: int = 20_000) -> None:
+    key = lambda m: m.length
+    print(f"{n} mountains, runs of {run_size}")
+    external = lambda: deque(external_sort(stream(n), key=key, run_size=run_size), maxlen=0)
+    internal = lambda: adaptive_mergesort(stream(n), key=key)
+    print(f"external_sort: {timeit.timeit(external, number=1):.3f}s, peak {peak(external) / 1e6:.2f}MB")
+    print(f"adaptive_mergesort: {timeit.timeit(internal, number=1):.3f}s, peak {peak(internal) / 1e6:.2f}MB")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,32 @@
+"""Time to build the difficulty graph's position history with graph_data, against replaying each group into a MountainOrganiser."""
+
+import sys
+import timeit
+
+from mountain_manager import MountainManager
+from mountain_organiser import MountainOrganiser
+from graph_data import graph_data
+from benchmarks.trails import random_mountains
+
+def main(n: int = 20_000) -> None:
+    manager = MountainManager()
+    for mountain in random_mountains(n):
+        manager.add_mountain(mountain)
+    groups = manager.group_by_difficulty()
+    print(f"{n} mountains, {len(groups)} groups")
+
+    def replay():
+        # What main.on_graph_clicked used to do.
+        organiser = MountainOrganiser()
+        added = []
+        for group in groups:
+            organiser.add_mountains(group)
+            added.extend(group)
+            for mountain in added:
+                organiser.cur_position(mountain)
+
+    print(f"graph_data: {timeit.timeit(lambda: graph_data(manager), number=1):.3f}s")
+    print(f"MountainOrganiser replay: {timeit.timeit(replay, number=1):.3f}s")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
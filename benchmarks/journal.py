@@ -0,0 +1,37 @@
+"""Time to save a large trail after a few edits, rewriting it with dump against appending to a TrailJournal."""
+
+import os
+import tempfile
+import timeit
+
+from mountain import Mountain
+from serialize import dump
+from journal import TrailJournal
+from trail_history import TrailHistory
+from benchmarks.trails import random_trail
+
+def main(mountains: int = 200_000, edits: int = 100) -> None:
+    trail = random_trail(mountains)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trail.json")
+        with open(path, "w") as f:
+            dump(trail, f)
+        journal = TrailJournal(path, compact_every=10 ** 9)
+        history = TrailHistory(journal.load())
+        journal.attach(history)
+
+        def edit():
+            for i in range(edits):
+                history.apply((), "add_mountain_before", Mountain(f"new-{i}", 1, 1))
+
+        def rewrite():
+            with open(path + ".copy", "w") as f:
+                dump(history.current, f)
+
+        print(f"{mountains} mountains, {edits} edits")
+        print(f"journal, edits and sync: {timeit.timeit(lambda: (edit(), journal.sync()), number=1):.3f}s")
+        print(f"dump, whole trail: {timeit.timeit(rewrite, number=1):.3f}s")
+        journal.close()
+
+if __name__ == "__main__":
+    main()
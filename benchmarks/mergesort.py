@@ -0,0 +1,25 @@
+"""Time of the recursive mergesort against bottom_up_mergesort and adaptive_mergesort on mountain lists."""
+
+import sys
+import timeit
+
+from algorithms.mergesort import mergesort, bottom_up_mergesort, adaptive_mergesort
+from benchmarks.trails import random_mountains
+
+def main(n: int = 1_000_000) -> None:
+    mountains = random_mountains(n)
+    lengths = [mountain.length for mountain in mountains]
+    print(f"{n} mountains")
+    # mergesort ignores keys, so it sorts the lengths themselves.
+    print(f"mergesort, lengths: {timeit.timeit(lambda: mergesort(lengths), number=1):.3f}s")
+    print(f"bottom_up_mergesort, lengths: {timeit.timeit(lambda: bottom_up_mergesort(lengths), number=1):.3f}s")
+    print(f"bottom_up_mergesort, mountains by length: {timeit.timeit(lambda: bottom_up_mergesort(mountains, key=lambda m: m.length), number=1):.3f}s")
+    print(f"adaptive_mergesort, mountains by length: {timeit.timeit(lambda: adaptive_mergesort(mountains, key=lambda m: m.length), number=1):.3f}s")
+    # Already ordered, with a few new mountains appended.
+    nearly = sorted(mountains, key=lambda m: m.length) + random_mountains(100, seed=1)
+    print(f"nearly sorted, bottom_up_mergesort: {timeit.timeit(lambda: bottom_up_mergesort(nearly, key=lambda m: m.length), number=1):.3f}s")
+    print(f"nearly sorted, adaptive_mergesort: {timeit.timeit(lambda: adaptive_mergesort(nearly, key=lambda m: m.length), number=1):.3f}s")
+    print(f"sorted, mountains by length: {timeit.timeit(lambda: sorted(mountains, key=lambda m: m.length), number=1):.3f}s")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
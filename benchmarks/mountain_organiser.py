@@ -0,0 +1,50 @@
+"""Time to add mountains to a MountainOrganiser one at a time and in batches, against inserting into a plain sorted list."""
+
+import bisect
+import sys
+import timeit
+
+from mountain_organiser import MountainOrganiser
+from benchmarks.trails import random_mountains
+
+def main(n: int = 200_000) -> None:
+    mountains = random_mountains(n)
+    print(f"{n} mountains")
+
+    def organiser():
+        organiser = MountainOrganiser()
+        for mountain in mountains:
+            organiser.add_mountains([mountain])
+        return organiser
+
+    def plain_list():
+        # What add_mountains used to do, with the search done in C.
+        keys = []
+        ordered = []
+        for mountain in mountains:
+            key = MountainOrganiser.order(mountain)
+            index = bisect.bisect_left(keys, key)
+            keys.insert(index, key)
+            ordered.insert(index, mountain)
+
+    print(f"MountainOrganiser.add_mountains: {timeit.timeit(organiser, number=1):.3f}s")
+    def batches():
+        # As main.on_graph_clicked does, one batch per difficulty.
+        organiser = MountainOrganiser()
+        for difficulty in range(10):
+            organiser.add_mountains([m for m in mountains if m.difficulty_level == difficulty])
+
+    def sorted_batches():
+        organiser = MountainOrganiser()
+        ordered = sorted(mountains, key=MountainOrganiser.order)
+        for start in range(10):
+            organiser.add_mountains(ordered[start::10])
+
+    print(f"MountainOrganiser.add_mountains, batch per difficulty: {timeit.timeit(batches, number=1):.3f}s")
+    print(f"MountainOrganiser.add_mountains, 10 already sorted batches: {timeit.timeit(sorted_batches, number=1):.3f}s")
+    print(f"list.insert: {timeit.timeit(plain_list, number=1):.3f}s")
+    built = organiser()
+    print(f"cur_position for every mountain: {timeit.timeit(lambda: [built.cur_position(m) for m in mountains], number=1):.3f}s")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,19 @@
+"""Time of parallel_mergesort with increasing worker counts on a large mountain list."""
+
+import os
+import sys
+import timeit
+
+from algorithms.mergesort import adaptive_mergesort, parallel_mergesort
+from benchmarks.trails import random_mountains
+
+def main(n: int = 2_000_000) -> None:
+    mountains = random_mountains(n)
+    print(f"{n} mountains, {os.cpu_count()} cpus")
+    print(f"adaptive_mergesort: {timeit.timeit(lambda: adaptive_mergesort(mountains, key=lambda m: m.length), number=1):.3f}s")
+    for workers in (2, 4, 8):
+        time = timeit.timeit(lambda: parallel_mergesort(mountains, key=lambda m: m.length, workers=workers), number=1)
+        print(f"parallel_mergesort, {workers} workers: {time:.3f}s")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,41 @@
+"""Peak memory and time of the streaming serialize.dump against EnhancedJSONEncoder."""
+
+import json
+import sys
+import timeit
+import tracemalloc
+
+from serialize import EnhancedJSONEncoder, dump
+from benchmarks.trails import random_trail
+
+class Discard:
+    """A file object which throws away everything written to it."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+def peak(run) -> int:
+    """Returns the peak bytes allocated while running run()."""
+    tracemalloc.start()
+    run()
+    result = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+def main(mountains: int = 20_000) -> None:
+    trail = random_trail(mountains)
+    print(f"{mountains} mountains")
+    print(f"dump: {timeit.timeit(lambda: dump(trail, Discard()), number=1):.3f}s, peak {peak(lambda: dump(trail, Discard())) / 1e6:.2f}MB")
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(10 ** 6)
+    try:
+        encoder_time = timeit.timeit(lambda: json.dumps(trail, cls=EnhancedJSONEncoder), number=1)
+        encoder_peak = peak(lambda: json.dumps(trail, cls=EnhancedJSONEncoder))
+        print(f"EnhancedJSONEncoder: {encoder_time:.3f}s, peak {encoder_peak / 1e6:.2f}MB")
+    except RecursionError:
+        print("EnhancedJSONEncoder: RecursionError")
+    finally:
+        sys.setrecursionlimit(limit)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""File size and load time of the binary trail format against JSON, loaded eagerly and lazily."""
+
+import json
+import os
+import tempfile
+import timeit
+
+from serialize import dump, load, load_lazy, deserialize
+from trail_binary import dump_binary, load_binary
+from benchmarks.trails import random_trail
+
+def walk(trail) -> None:
+    """Touches every store in the trail, so lazy trails are fully loaded."""
+    stack = [trail]
+    while stack:
+        store = stack.pop().store
+        if store is None:
+            continue
+        if hasattr(store, "following"):
+            stack.append(store.following)
+        else:
+            stack.extend((store.path_top, store.path_bottom, store.path_follow))
+
+def main(mountains: int = 200_000) -> None:
+    trail = random_trail(mountains)
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "trail.json")
+        binary_path = os.path.join(directory, "trail.bin")
+        with open(json_path, "w") as f:
+            dump(trail, f)
+        with open(binary_path, "wb") as f:
+            dump_binary(trail, f)
+        print(f"{mountains} mountains")
+        print(f"size: json {os.path.getsize(json_path) / 1e6:.2f}MB, binary {os.path.getsize(binary_path) / 1e6:.2f}MB")
+
+        def json_loads():
+            with open(json_path) as f:
+                return deserialize(json.loads(f.read()))
+
+        def json_load():
+            with open(json_path) as f:
+                return load(f)
+
+        def json_open():
+            with open(json_path, "rb") as f:
+                return load_lazy(f)
+
+        def binary_open():
+            with open(binary_path, "rb") as f:
+                return load_binary(f)
+
+        try:
+            print(f"json.loads + deserialize: {timeit.timeit(json_loads, number=1):.3f}s")
+        except RecursionError:
+            print("json.loads + deserialize: RecursionError")
+        print(f"serialize.load: {timeit.timeit(json_load, number=1):.3f}s")
+        print(f"load_lazy, open: {timeit.timeit(json_open, number=1):.6f}s")
+        print(f"load_lazy, open and walk everything: {timeit.timeit(lambda: walk(json_open()), number=1):.3f}s")
+        print(f"load_binary, open: {timeit.timeit(binary_open, number=1):.6f}s")
+        print(f"load_binary, open and walk everything: {timeit.timeit(lambda: walk(binary_open()), number=1):.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Memory used by a trail with many repeated sub-trails, before and after interning it."""
+
+import gc
+import timeit
+import tracemalloc
+
+from trail_interning import TrailInterner
+from benchmarks.trails import random_trail
+
+def traced_size(build) -> tuple[object, int]:
+    """Returns the result of build(), and the bytes allocated while building it."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def main(mountains: int = 200_000, distinct: int = 20) -> None:
+    trail, trail_size = traced_size(lambda: random_trail(mountains, split_chance=0.4, distinct=distinct))
+    interner = TrailInterner()
+    canonical, canonical_size = traced_size(lambda: interner.intern(trail))
+    intern_time = timeit.timeit(lambda: TrailInterner().intern(trail), number=1)
+    print(f"{mountains} mountains ({distinct} distinct): trail {trail_size / 1e6:.1f}MB")
+    print(f"interned into {len(interner)} nodes: {canonical_size / 1e6:.1f}MB in {intern_time:.3f}s")
+    rebuilt = interner.intern(random_trail(mountains, split_chance=0.4, distinct=distinct))
+    print(f"equality check of interned trails: {timeit.timeit(lambda: canonical == rebuilt, number=1000) / 1000 * 1e9:.0f}ns")
+
+if __name__ == "__main__":
+    main()
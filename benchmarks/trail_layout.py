@@ -0,0 +1,59 @@
+"""Time to lay out a large trail with TrailDraw.layout, from scratch and after an edit, against recomputing every size the way draw_in_box used to."""
+
+import sys
+import timeit
+
+from mountain import Mountain
+from draw_trails import TrailDraw
+from trail import CompactTrailSeries, _drop_caches
+from benchmarks.trails import random_trail
+
+def uncached_width(draw: TrailDraw, trail) -> int:
+    """What required_width used to do (iteratively, so deep trails do not hit the recursion limit)."""
+    width = 0
+    stack = [trail]
+    while stack:
+        store = stack.pop().store
+        if store is None:
+            continue
+        if isinstance(store, CompactTrailSeries):
+            width += draw.TOTAL_MOUNTAIN_WIDTH
+            stack.append(store.following)
+        else:
+            width += 2 * draw.BRANCH_WIDTH + max(uncached_width(draw, store.path_top), uncached_width(draw, store.path_bottom), draw.MIN_BRANCH_CONTENT_WIDTH)
+            stack.append(store.path_follow)
+    return width
+
+def main(n: int = 10_000) -> None:
+    trail = random_trail(n)
+    print(f"{n} mountains")
+
+    def from_scratch():
+        for node in nodes:
+            _drop_caches(node)
+        draw.layout()
+
+    draw = TrailDraw(trail)
+    nodes = []
+    stack = [trail]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        store = node.store
+        if store is not None:
+            stack.extend([store.following] if isinstance(store, CompactTrailSeries) else [store.path_top, store.path_bottom, store.path_follow])
+
+    print(f"layout from scratch: {timeit.timeit(from_scratch, number=1):.4f}s")
+    print(f"layout, cached: {timeit.timeit(draw.layout, number=1):.6f}s")
+    draw.history.apply((), "add_mountain_before", Mountain("new", 1, 1))
+    print(f"layout after an edit: {timeit.timeit(draw.layout, number=1):.6f}s")
+
+    def uncached():
+        # draw_in_box asked for the width of every sub-trail it drew, each a fresh walk.
+        for node in nodes:
+            uncached_width(draw, node)
+
+    print(f"uncached widths of every sub-trail: {timeit.timeit(uncached, number=1):.3f}s")
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
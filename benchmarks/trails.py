@@ -0,0 +1,40 @@
+"""Generators for large trails and mountain lists used by the benchmarks."""
+
+from __future__ import annotations
+import random
+from copy import copy
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+
+def random_mountains(n: int, seed: int = 0, distinct: int | None = None) -> list[Mountain]:
+    """
+    Returns n mountains with random difficulty levels and lengths.
+    If distinct is given, the mountains are copies of only that many different mountains.
+    """
+    rng = random.Random(seed)
+    if distinct is None:
+        return [Mountain(f"m{i}", rng.randint(0, 9), rng.randint(1, 1000)) for i in range(n)]
+    originals = random_mountains(distinct, seed)
+    return [copy(rng.choice(originals)) for _ in range(n)]
+
+def random_trail(n: int, split_chance: float = 0.2, seed: int = 0, distinct: int | None = None) -> Trail:
+    """
+    Builds a random trail containing n mountains, bottom up so that no recursion is needed.
+    Roughly `split_chance` of the steps join three existing sub-trails with a TrailSplit.
+    """
+    rng = random.Random(seed)
+    mountains = random_mountains(n, seed, distinct)
+    pool = [Trail(None)]
+    for mountain in mountains:
+        if len(pool) >= 3 and rng.random() < split_chance:
+            follow, bottom, top = pool.pop(), pool.pop(), pool.pop()
+            pool.append(Trail(TrailSplit(top, bottom, follow)))
+        following = pool.pop() if pool and rng.random() < 0.5 else Trail(None)
+        pool.append(Trail(TrailSeries(mountain, following)))
+    while len(pool) > 1:
+        follow = pool.pop()
+        bottom = pool.pop()
+        top = pool.pop() if pool else Trail(None)
+        pool.append(Trail(TrailSplit(top, bottom, follow)))
+    return pool[0]
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from mountain import Mountain
+from trail import Trail, CompactTrailSeries
+from personality import WalkerPersonality
+from typing import Iterable
+
+class CompiledTrail:
+    """
+    A trail lowered into flat parallel lists, for replaying the same trail against many walkers.
+
+    Every TrailSeries / TrailSplit in the trail becomes one node index:
+    - kinds[i]: SERIES or SPLIT
+    - mountain_index[i]: index into `mountains` (series only)
+    - top[i] / bottom[i]: first node of each branch (split only)
+    - follow[i]: the node walked next (the following trail for a series, the path_follow for a split)
+
+    Empty trails are never given a node. Instead they are resolved to whatever the walker would
+    do next, so the path_follow of every enclosing split is baked into the successor indices
+    and walking needs no stack at all. END marks the end of the walk.
+
+    The compiled trail is a snapshot, edits made to the original trail afterwards are not seen.
+    """
+
+    SERIES = 0
+    SPLIT = 1
+    END = -1
+
+    def __init__(self, trail: Trail) -> None:
+        """
+        Complexity:
+        - O(n), where n is the number of TrailSeries and TrailSplit in the trail
+        - Best case = Worst case
+        - Each store is allocated a node and visited exactly once, using an explicit list as a stack
+        """
+        self.kinds = []
+        self.mountain_index = []
+        self.top = []
+        self.bottom = []
+        self.follow = []
+        self.mountains = []
+        # select_branch is given the original Trail objects, so look-ahead personalities still work.
+        self.top_trails = []
+        self.bottom_trails = []
+        self._pending = []
+        self.entry = self._allocate(trail.store, self.END)
+
+        while self._pending:
+            index, store, continuation = self._pending.pop()
+            if isinstance(store, CompactTrailSeries):
+                self.mountain_index[index] = len(self.mountains)
+                self.mountains.append(store.mountain)
+                self.follow[index] = self._allocate(store.following.store, continuation)
+            else:
+                follow = self._allocate(store.path_follow.store, continuation)
+                self.follow[index] = follow
+                self.top[index] = self._allocate(store.path_top.store, follow)
+                self.bottom[index] = self._allocate(store.path_bottom.store, follow)
+                self.top_trails[index] = store.path_top
+                self.bottom_trails[index] = store.path_bottom
+        del self._pending
+        # Mountains walked in a row from a node, filled in lazily by follow_paths.
+        self._runs = {}
+
+    def _allocate(self, store, continuation: int) -> int:
+        """
+        Returns the node index a walker reaches when it enters `store`.
+        An empty store means the walker carries straight on to `continuation`.
+        """
+        if store is None:
+            return continuation
+        index = len(self.kinds)
+        self.kinds.append(self.SERIES if isinstance(store, CompactTrailSeries) else self.SPLIT)
+        self.mountain_index.append(self.END)
+        self.top.append(self.END)
+        self.bottom.append(self.END)
+        self.follow.append(self.END)
+        self.top_trails.append(None)
+        self.bottom_trails.append(None)
+        self._pending.append((index, store, continuation))
+        return index
+
+    def __len__(self) -> int:
+        """Returns the number of nodes in the compiled trail."""
+        return len(self.kinds)
+
+    def follow_path(self, personality: WalkerPersonality) -> None:
+        """
+        Follow a path and add mountains according to a personality.
+        Equivalent to Trail.follow_path on the trail this was compiled from.
+
+        Complexity:
+        - O(n), where n is the length of path taken by the walker
+        - Best case = Worst case
+        - Each step is a couple of list lookups, with no isinstance checks and no stack operations
+        """
+        kinds = self.kinds
+        mountain_index = self.mountain_index
+        mountains = self.mountains
+        top = self.top
+        bottom = self.bottom
+        follow = self.follow
+        top_trails = self.top_trails
+        bottom_trails = self.bottom_trails
+        add_mountain = personality.add_mountain
+        select_branch = personality.select_branch
+        series = self.SERIES
+        end = self.END
+
+        current = self.entry
+        while current != end:
+            if kinds[current] == series:
+                add_mountain(mountains[mountain_index[current]])
+                current = follow[current]
+            elif select_branch(top_trails[current], bottom_trails[current]):
+                current = top[current]
+            else:
+                current = bottom[current]
+
+    def _run(self, start: int) -> tuple[list[Mountain], int]:
+        """
+        Returns the mountains walked in series from `start`, and the node reached afterwards
+        (a split, or END). Memoised, so each run is only gathered once.
+        """
+        if start in self._runs:
+            return self._runs[start]
+        run = []
+        current = start
+        while current != self.END and self.kinds[current] == self.SERIES:
+            run.append(self.mountains[self.mountain_index[current]])
+            current = self.follow[current]
+        self._runs[start] = (run, current)
+        return run, current
+
+    def follow_paths(self, personalities: Iterable[WalkerPersonality]) -> None:
+        """
+        Follow a path for every personality at once, as if follow_path was called on each.
+
+        The walkers move through the trail in groups. At every split the group is partitioned
+        by the branch each walker selects, so walkers that make the same decisions share the
+        traversal work and only pay for their own select_branch and add_mountain calls.
+        Walkers using the default add_mountain get each run of mountains in a single extend.
+
+        Complexity:
+        - O(R + W*S + W*M), where R is the number of nodes on the distinct routes taken,
+          W is the number of walkers, S is the number of splits on a walker's route,
+          and M is the number of mountains on a walker's route
+        - Best case = Worst case
+        """
+        default_add = WalkerPersonality.add_mountain
+        groups = [(self.entry, list(personalities))]
+        while groups:
+            current, walkers = groups.pop()
+            run, current = self._run(current)
+            if run:
+                for walker in walkers:
+                    if type(walker).add_mountain is default_add:
+                        walker.mountains.extend(run)
+                    else:
+                        for mountain in run:
+                            walker.add_mountain(mountain)
+            if current == self.END:
+                continue
+            top_branch = self.top_trails[current]
+            bottom_branch = self.bottom_trails[current]
+            top_walkers = []
+            bottom_walkers = []
+            for walker in walkers:
+                if walker.select_branch(top_branch, bottom_branch):
+                    top_walkers.append(walker)
+                else:
+                    bottom_walkers.append(walker)
+            if top_walkers:
+                groups.append((self.top[current], top_walkers))
+            if bottom_walkers:
+                groups.append((self.bottom[current], bottom_walkers))
@@ -0,0 +1,66 @@
+""" Fenwick (binary indexed) tree of integer counts, for prefix sums which change. """
+
+__docformat__ = 'reStructuredText'
+
+from typing import Iterable
+
+
+class FenwickTree:
+    """ Prefix sums over a fixed number of integer values, each of which can be changed.
+
+        Attributes:
+            tree (list[int]): tree[i] holds the sum of the values in (i - lowbit(i), i], 1-indexed
+    """
+
+    def __init__(self, values: Iterable[int] = ()) -> None:
+        """ Object initializer.
+        :complexity: O(n), where n is the number of values
+        """
+        self.tree = [0]
+        self.tree.extend(values)
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def __len__(self) -> int:
+        """ Returns the number of values.
+        :complexity: O(1)
+        """
+        return len(self.tree) - 1
+
+    def add(self, index: int, delta: int) -> None:
+        """ Adds delta to the value at index.
+        :complexity: O(log n)
+        """
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, end: int) -> int:
+        """ Returns the sum of the values before index end.
+        :complexity: O(log n)
+        """
+        total = 0
+        while end > 0:
+            total += self.tree[end]
+            end -= end & -end
+        return total
+
+    def search(self, target: int) -> tuple[int, int]:
+        """ Returns the first index whose prefix sum (including itself) is more than target,
+        and how far into that value target is. With the values as block sizes, this turns a position
+        into a (block, offset within block) pair.
+        :pre: 0 <= target < the sum of all the values, and no value is negative
+        :complexity: O(log n)
+        """
+        index = 0
+        bit = 1 << (len(self.tree) - 1).bit_length()
+        while bit:
+            next_index = index + bit
+            if next_index < len(self.tree) and self.tree[next_index] <= target:
+                index = next_index
+                target -= self.tree[next_index]
+            bit >>= 1
+        return index, target
@@ -0,0 +1,190 @@
+""" Sorted list stored as a list of sorted blocks, with a Fenwick tree over the block sizes. """
+
+__docformat__ = 'reStructuredText'
+
+from typing import Any, Callable, Generic, Iterable, Iterator, TypeVar
+
+from algorithms.binary_search import bisect_left, bisect_right, search_many
+from algorithms.mergesort import adaptive_mergesort
+from data_structures.fenwick_tree import FenwickTree
+
+T = TypeVar('T')
+
+
+class SortedBlockList(Generic[T]):
+    """ A list kept sorted by key as items are added.
+
+        Items live in blocks of at most 2 * load items, so adding or removing an item only shifts
+        the items in one block rather than the whole list. Positions are found by summing the sizes
+        of the blocks before an item, which the Fenwick tree does in O(log n).
+        The complexities below treat load as a constant.
+
+        Attributes:
+            blocks (list[list[T]]): the items, each block sorted, and every block before another
+            keys (list[list]): the key of each item, in the same layout as blocks
+            maxes (list): the largest key in each block
+            sizes (FenwickTree): the size of each block
+    """
+
+    DEFAULT_LOAD = 256
+    # update merges a batch in one pass when it is at least 1 / BULK_RATIO the size of the list.
+    BULK_RATIO = 8
+
+    def __init__(self, items: Iterable[T] = (), key: Callable[[T], Any] | None = None, load: int = DEFAULT_LOAD) -> None:
+        """ Object initializer.
+        :complexity: O(n log n) to sort the items, O(n) if they are already sorted
+        """
+        self.key = key if key is not None else (lambda item: item)
+        self.load = load
+        self._build(adaptive_mergesort(items, key=self.key))
+
+    def _build(self, items: list[T], keys: list | None = None) -> None:
+        """ Lays out already sorted items (whose keys may be given) in full blocks.
+        :complexity: O(n)
+        """
+        if keys is None:
+            keys = [self.key(item) for item in items]
+        self.blocks = [items[start:start + self.load] for start in range(0, len(items), self.load)]
+        self.keys = [keys[start:start + self.load] for start in range(0, len(keys), self.load)]
+        self.maxes = [keys[-1] for keys in self.keys]
+        self.sizes = FenwickTree(len(block) for block in self.blocks)
+        self.length = len(items)
+
+    def __len__(self) -> int:
+        """ :complexity: O(1) """
+        return self.length
+
+    def __iter__(self) -> Iterator[T]:
+        """ Iterates over the items in sorted order.
+        :complexity: O(n) for the whole iteration
+        """
+        for block in self.blocks:
+            yield from block
+
+    def __getitem__(self, index: int) -> T:
+        """ Returns the item at position index.
+        :complexity: O(log n)
+        :raises IndexError: if index is out of range
+        """
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(f"Index {index} out of range")
+        block, offset = self.sizes.search(index)
+        return self.blocks[block][offset]
+
+    def add(self, item: T) -> int:
+        """ Adds item after any items with an equal key, and returns its position.
+        :complexity: O(log n), and O(n / load) when a block has to be split
+        """
+        key = self.key(item)
+        if not self.blocks:
+            self._build([item])
+            return 0
+        block = bisect_right(self.maxes, key)
+        if block == len(self.blocks):
+            block -= 1
+        keys = self.keys[block]
+        offset = bisect_right(keys, key)
+        keys.insert(offset, key)
+        self.blocks[block].insert(offset, item)
+        self.maxes[block] = keys[-1]
+        self.length += 1
+        position = self.sizes.prefix_sum(block) + offset
+        if len(keys) > 2 * self.load:
+            self._split(block)
+        else:
+            self.sizes.add(block, 1)
+        return position
+
+    def update(self, items: Iterable[T]) -> None:
+        """ Adds every item, as if by add in the order given.
+        A large batch is sorted, merged with the existing items in a single pass, and the blocks
+        rebuilt, rather than adding the items one at a time. The merge finds where each item goes with
+        search_many, then copies across the runs of existing items between them.
+        :complexity: O(k log k + n) for a batch of k items, and O(k log n) when k < n / BULK_RATIO
+        """
+        batch = adaptive_mergesort(((self.key(item), item) for item in items), key=lambda pair: pair[0])
+        if len(batch) * self.BULK_RATIO < self.length:
+            for _, item in batch:
+                self.add(item)
+            return
+        old_keys = [key for keys in self.keys for key in keys]
+        old_items = list(self)
+        keys = []
+        merged = []
+        previous = 0
+        for position, (key, item) in zip(search_many(old_keys, [key for key, _ in batch], right=True), batch):
+            keys += old_keys[previous:position]
+            merged += old_items[previous:position]
+            keys.append(key)
+            merged.append(item)
+            previous = position
+        keys += old_keys[previous:]
+        merged += old_items[previous:]
+        self._build(merged, keys)
+
+    def remove(self, key: Any) -> T:
+        """ Removes the first item with key, and returns it.
+        :complexity: O(log n), and O(n / load) when its block is left empty
+        :raises KeyError: if there is no item with key
+        """
+        block, offset = self._position(key, bisect_left, bisect_left)
+        if block == len(self.blocks) or self.keys[block][offset] != key:
+            raise KeyError(key)
+        keys = self.keys[block]
+        del keys[offset]
+        item = self.blocks[block].pop(offset)
+        self.length -= 1
+        if keys:
+            self.maxes[block] = keys[-1]
+            self.sizes.add(block, -1)
+        else:
+            del self.blocks[block]
+            del self.keys[block]
+            del self.maxes[block]
+            self.sizes = FenwickTree(len(items) for items in self.blocks)
+        return item
+
+    def _split(self, block: int) -> None:
+        """ Splits a block which has grown too large in half.
+        :complexity: O(n / load), to rebuild the Fenwick tree
+        """
+        half = len(self.blocks[block]) // 2
+        self.blocks.insert(block + 1, self.blocks[block][half:])
+        del self.blocks[block][half:]
+        self.keys.insert(block + 1, self.keys[block][half:])
+        del self.keys[block][half:]
+        self.maxes.insert(block, self.keys[block][-1])
+        self.sizes = FenwickTree(len(items) for items in self.blocks)
+
+    def _position(self, key: Any, block_search: Callable, offset_search: Callable) -> tuple[int, int]:
+        """ Returns the (block, offset) a search for key finishes at, (len(blocks), 0) if past the end. """
+        block = block_search(self.maxes, key)
+        if block == len(self.blocks):
+            return block, 0
+        return block, offset_search(self.keys[block], key)
+
+    def bisect_left(self, key: Any) -> int:
+        """ Returns the position of the first item whose key is not less than key.
+        :complexity: O(log n)
+        """
+        block, offset = self._position(key, bisect_left, bisect_left)
+        return self.sizes.prefix_sum(block) + offset
+
+    def bisect_right(self, key: Any) -> int:
+        """ Returns the position after the last item whose key is not more than key.
+        :complexity: O(log n)
+        """
+        block, offset = self._position(key, bisect_right, bisect_right)
+        return self.sizes.prefix_sum(block) + offset
+
+    def find(self, key: Any) -> int:
+        """ Returns the position of the first item with key.
+        :complexity: O(log n)
+        :raises KeyError: if there is no item with key
+        """
+        block, offset = self._position(key, bisect_left, bisect_left)
+        if block == len(self.blocks) or self.keys[block][offset] != key:
+            raise KeyError(key)
+        return self.sizes.prefix_sum(block) + offset
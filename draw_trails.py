@@ -9,7 +9,8 @@ from dataclasses import dataclass, field
 from mountain import Mountain
 from utils import av, bezier
 from constants import DrawMode
-from trail import Trail, TrailSeries, TrailSplit
+from trail import Trail, TrailSeries, TrailSplit, TrailPath, CompactTrailSeries, edit_count
+from trail_history import TrailHistory
 
 @dataclass
 class Box:
@@ -46,6 +47,25 @@ class TrailBox(Trail):
 
     trail_box: Box = field(default_factory=Box)
 
+class TrailScene:
+    """
+    Everything TrailDraw.draw_in_box draws, kept so it can be drawn again without being recomputed.
+    Lines go in one ShapeElementList (sent to the GPU once), mountains in one SpriteList sharing a
+    single texture, and labels are arcade.Text objects, which keep their laid out glyphs.
+    """
+
+    def __init__(self) -> None:
+        import arcade
+        self.shapes = arcade.ShapeElementList()
+        self.sprites = arcade.SpriteList()
+        self.texts = []
+
+    def draw(self) -> None:
+        self.shapes.draw()
+        self.sprites.draw()
+        for text in self.texts:
+            text.draw()
+
 class TrailDraw:
 
     ### Visual constants
@@ -64,192 +84,249 @@ class TrailDraw:
     ### Click constants
     LINE_VERTICAL_BOX = MOUNTAIN_HEIGHT / 2
 
+    MOUNTAIN_IMAGE = "img/hike.png"
+    # Loaded the first time a mountain is drawn, and shared by every mountain sprite.
+    _mountain_texture = None
+
     def __init__(self, trail: TrailBox) -> None:
-        self.trail = trail
+        self.history = TrailHistory(trail)
+        # While draw_in_box is recording into a scene (see draw_scene) the draw methods add to it instead.
+        self.recording: TrailScene|None = None
+        self.scene: TrailScene|None = None
+        self.scene_trail: TrailBox|None = None
+        self.scene_key: tuple|None = None
+
+    @property
+    def trail(self) -> TrailBox:
+        return self.history.current
 
     # VISUAL CALCULATIONS
 
-    def required_height(self, cur_trail: TrailBox|None=None) -> int:
-        if cur_trail is None:
-            cur_trail = self.trail.store
-        else:
-            cur_trail = cur_trail.store
+    def layout(self, cur_trail: TrailBox|None=None) -> tuple[int, int]:
+        """
+        Returns the (width, height) cur_trail needs, computing and caching it for every sub-trail without one.
+
+        The sizes only depend on the shape of a trail, and edits are persistent, so a cached size stays
+        valid unless the trail is changed in place (see trail.invalidate_caches). After an edit only
+        the new trails along the edited path are laid out again, the rest are shared with the old version.
+        Sub-trails are laid out bottom up with a list as a stack, so each one is visited twice at most.
+        """
         if cur_trail is None:
-            return self.EMPTY_HEIGHT
-        elif isinstance(cur_trail, TrailSeries):
-            return max(self.MOUNTAIN_HEIGHT, self.required_height(cur_trail.following))
-        else:
-            return max(
-                self.required_height(cur_trail.path_top) + self.BRANCH_SEPARATION + self.required_height(cur_trail.path_bottom),
-                self.required_height(cur_trail.path_follow)
-            )
+            cur_trail = self.trail
+        cached = getattr(cur_trail, "_layout", None)
+        if cached is not None:
+            return cached
+
+        stack = [(cur_trail, False)]
+        while stack:
+            trail, children_done = stack.pop()
+            store = trail.store
+            if store is None:
+                width, height = 0, self.EMPTY_HEIGHT
+            elif not children_done:
+                stack.append((trail, True))
+                children = [store.following] if isinstance(store, CompactTrailSeries) else [store.path_top, store.path_bottom, store.path_follow]
+                stack.extend((child, False) for child in children if getattr(child, "_layout", None) is None)
+                continue
+            elif isinstance(store, CompactTrailSeries):
+                following_width, following_height = store.following._layout
+                width = self.TOTAL_MOUNTAIN_WIDTH + following_width
+                height = max(self.MOUNTAIN_HEIGHT, following_height)
+            else:
+                top_width, top_height = store.path_top._layout
+                bottom_width, bottom_height = store.path_bottom._layout
+                follow_width, follow_height = store.path_follow._layout
+                width = 2 * self.BRANCH_WIDTH + max(top_width, bottom_width, self.MIN_BRANCH_CONTENT_WIDTH) + follow_width
+                height = max(top_height + self.BRANCH_SEPARATION + bottom_height, follow_height)
+            # Set directly, as frozen trails are laid out too.
+            object.__setattr__(trail, "_layout", (width, height))
+        return cur_trail._layout
+
+    def required_height(self, cur_trail: TrailBox|None=None) -> int:
+        return self.layout(cur_trail)[1]
 
     def required_width(self, cur_trail: TrailBox|None=None) -> int:
-        if cur_trail is None:
-            cur_trail = self.trail.store
-        else:
-            cur_trail = cur_trail.store
-        if cur_trail is None:
-            return 0
-        elif isinstance(cur_trail, TrailSeries):
-            return self.TOTAL_MOUNTAIN_WIDTH + self.required_width(cur_trail.following)
-        else:
-            return 2 * self.BRANCH_WIDTH + max(
-                self.required_width(cur_trail.path_top),
-                self.required_width(cur_trail.path_bottom),
-                self.MIN_BRANCH_CONTENT_WIDTH,
-            ) + self.required_width(cur_trail.path_follow)
+        return self.layout(cur_trail)[0]
 
     def draw_in_box(self, height, width, minx, miny, cur_trail: TrailBox|None=None) -> None:
-        if cur_trail is None:
-            ref_trail = self.trail
-            cur_trail = self.trail.store
-        else:
-            ref_trail = cur_trail
-            cur_trail = cur_trail.store
-        if cur_trail is None:
-            self.draw_line(minx, miny + height/2, minx + width, miny + height/2)
-            ref_trail.trail_box = Box(minx, miny + height/2-self.LINE_VERTICAL_BOX, width, 2*self.LINE_VERTICAL_BOX)
-        elif isinstance(cur_trail, TrailSeries):
-            ref_trail.trail_box = Box(minx, miny, width, height)
-            p1 = self.TOTAL_MOUNTAIN_WIDTH
-            p2 = self.required_width(cur_trail.following)
-            total = p1 + p2
-            # Draw mountain
-            p1_total_dist = (p1 / total) * width
-            start_mountain_trail_x = minx
-            mountain_width = (self.MIN_MOUNTAIN_WIDTH / self.TOTAL_MOUNTAIN_WIDTH) * p1_total_dist
-            mountain_width = max(mountain_width, self.MIN_MOUNTAIN_WIDTH)
-            mountain_width = min(mountain_width, self.MAX_MOUNTAIN_WIDTH)
-            start_mountain_x = minx + p1_total_dist/2 - mountain_width/2
-            end_mountain_x = start_mountain_x + mountain_width
-            end_mountain_trail_x = minx + p1_total_dist
-            mid = miny + height/2
-            self.draw_mountain(av(start_mountain_x, end_mountain_x), mid, (end_mountain_x - start_mountain_x) / self.MIN_MOUNTAIN_WIDTH, cur_trail.mountain)
-            self.draw_line(start_mountain_trail_x, mid, start_mountain_x, mid)
-            self.draw_line(end_mountain_x, mid, end_mountain_trail_x, mid)
-            mountain_actual_height = self.MOUNTAIN_HEIGHT * (end_mountain_x - start_mountain_x) / self.MIN_MOUNTAIN_WIDTH
-            cur_trail.before_box = Box(start_mountain_trail_x, mid - mountain_actual_height/2, start_mountain_x - start_mountain_trail_x, mountain_actual_height)
-            cur_trail.mountain_box = Box(start_mountain_x, mid - mountain_actual_height/2, end_mountain_x - start_mountain_x, mountain_actual_height)
-            cur_trail.after_box = Box(end_mountain_x, mid - mountain_actual_height/2, end_mountain_trail_x - end_mountain_x, mountain_actual_height)
-            # Draw rest
-            self.draw_in_box(height, p2/total*width, minx+p1_total_dist, miny, cur_trail.following)
-        else:
-            ref_trail.trail_box = Box(minx, miny, width, height)
-            b1 = self.required_width(cur_trail.path_top)
-            b2 = self.required_width(cur_trail.path_bottom)
-            b3 = self.required_width(cur_trail.path_follow)
-            total = b3 + max(b1, b2)
-            mid = miny + height/2
-            pth = self.required_height(cur_trail.path_top)
-            pbh = self.required_height(cur_trail.path_bottom)
-            total_height = pth + pbh
-            top_section = pth / total_height * (height - self.BRANCH_SEPARATION)
-            bot_section = pbh / total_height * (height - self.BRANCH_SEPARATION)
-            if total > 0:
-                branch_dist = max(
-                    max(b1, b2)/total*(width - 2*self.BRANCH_WIDTH),
-                    self.MIN_BRANCH_CONTENT_WIDTH
-                )
+        """
+        Draws cur_trail (by default the current trail) to fill the box, setting the boxes box_and_action uses.
+        Sub-trails still to be drawn are kept on a list as a stack rather than recursed into, so trails of any depth can be drawn.
+        """
+        # (height, width, minx, miny, trail) for every sub-trail still to be drawn.
+        stack = [(height, width, minx, miny, self.trail if cur_trail is None else cur_trail)]
+        while stack:
+            height, width, minx, miny, ref_trail = stack.pop()
+            cur_trail = ref_trail.store
+            if cur_trail is None:
+                self.draw_line(minx, miny + height/2, minx + width, miny + height/2)
+                ref_trail.trail_box = Box(minx, miny + height/2-self.LINE_VERTICAL_BOX, width, 2*self.LINE_VERTICAL_BOX)
+            elif isinstance(cur_trail, CompactTrailSeries):
+                ref_trail.trail_box = Box(minx, miny, width, height)
+                p1 = self.TOTAL_MOUNTAIN_WIDTH
+                p2 = self.required_width(cur_trail.following)
+                total = p1 + p2
+                # Draw mountain
+                p1_total_dist = (p1 / total) * width
+                start_mountain_trail_x = minx
+                mountain_width = (self.MIN_MOUNTAIN_WIDTH / self.TOTAL_MOUNTAIN_WIDTH) * p1_total_dist
+                mountain_width = max(mountain_width, self.MIN_MOUNTAIN_WIDTH)
+                mountain_width = min(mountain_width, self.MAX_MOUNTAIN_WIDTH)
+                start_mountain_x = minx + p1_total_dist/2 - mountain_width/2
+                end_mountain_x = start_mountain_x + mountain_width
+                end_mountain_trail_x = minx + p1_total_dist
+                mid = miny + height/2
+                self.draw_mountain(av(start_mountain_x, end_mountain_x), mid, (end_mountain_x - start_mountain_x) / self.MIN_MOUNTAIN_WIDTH, cur_trail.mountain)
+                self.draw_line(start_mountain_trail_x, mid, start_mountain_x, mid)
+                self.draw_line(end_mountain_x, mid, end_mountain_trail_x, mid)
+                mountain_actual_height = self.MOUNTAIN_HEIGHT * (end_mountain_x - start_mountain_x) / self.MIN_MOUNTAIN_WIDTH
+                cur_trail.before_box = Box(start_mountain_trail_x, mid - mountain_actual_height/2, start_mountain_x - start_mountain_trail_x, mountain_actual_height)
+                cur_trail.mountain_box = Box(start_mountain_x, mid - mountain_actual_height/2, end_mountain_x - start_mountain_x, mountain_actual_height)
+                cur_trail.after_box = Box(end_mountain_x, mid - mountain_actual_height/2, end_mountain_trail_x - end_mountain_x, mountain_actual_height)
+                # Draw rest
+                stack.append((height, p2/total*width, minx+p1_total_dist, miny, cur_trail.following))
             else:
-                branch_dist = self.MIN_BRANCH_CONTENT_WIDTH
-            b3_dist = (width - 2*self.BRANCH_WIDTH) - branch_dist
-            # Draw branches
-            self.draw_branch(minx, mid, minx+self.BRANCH_WIDTH, miny + bot_section + self.BRANCH_SEPARATION + top_section / 2, miny + bot_section / 2)
-            self.draw_branch(minx + width - b3_dist, mid, minx + width - self.BRANCH_WIDTH - b3_dist, miny + bot_section + self.BRANCH_SEPARATION + top_section / 2, miny + bot_section / 2)
-            cur_trail.branch_start_box = Box(minx, mid - self.BRANCH_SEPARATION/2 - top_section/2, self.BRANCH_WIDTH, bot_section/2 + top_section/2 + self.BRANCH_SEPARATION)
-            cur_trail.branch_end_box = Box(minx+width-b3_dist-self.BRANCH_WIDTH, mid - self.BRANCH_SEPARATION/2 - top_section/2, self.BRANCH_WIDTH, bot_section/2 + top_section/2 + self.BRANCH_SEPARATION)
-            # Draw top & bottom
-            self.draw_in_box(top_section, branch_dist, minx+self.BRANCH_WIDTH, miny+bot_section+self.BRANCH_SEPARATION, cur_trail.path_top)
-            self.draw_in_box(bot_section, branch_dist, minx+self.BRANCH_WIDTH, miny, cur_trail.path_bottom)
-            # Draw following
-            self.draw_in_box(height, b3_dist, minx + width - b3_dist, miny, cur_trail.path_follow)
+                ref_trail.trail_box = Box(minx, miny, width, height)
+                b1 = self.required_width(cur_trail.path_top)
+                b2 = self.required_width(cur_trail.path_bottom)
+                b3 = self.required_width(cur_trail.path_follow)
+                total = b3 + max(b1, b2)
+                mid = miny + height/2
+                pth = self.required_height(cur_trail.path_top)
+                pbh = self.required_height(cur_trail.path_bottom)
+                total_height = pth + pbh
+                top_section = pth / total_height * (height - self.BRANCH_SEPARATION)
+                bot_section = pbh / total_height * (height - self.BRANCH_SEPARATION)
+                if total > 0:
+                    branch_dist = max(
+                        max(b1, b2)/total*(width - 2*self.BRANCH_WIDTH),
+                        self.MIN_BRANCH_CONTENT_WIDTH
+                    )
+                else:
+                    branch_dist = self.MIN_BRANCH_CONTENT_WIDTH
+                b3_dist = (width - 2*self.BRANCH_WIDTH) - branch_dist
+                # Draw branches
+                self.draw_branch(minx, mid, minx+self.BRANCH_WIDTH, miny + bot_section + self.BRANCH_SEPARATION + top_section / 2, miny + bot_section / 2)
+                self.draw_branch(minx + width - b3_dist, mid, minx + width - self.BRANCH_WIDTH - b3_dist, miny + bot_section + self.BRANCH_SEPARATION + top_section / 2, miny + bot_section / 2)
+                cur_trail.branch_start_box = Box(minx, mid - self.BRANCH_SEPARATION/2 - top_section/2, self.BRANCH_WIDTH, bot_section/2 + top_section/2 + self.BRANCH_SEPARATION)
+                cur_trail.branch_end_box = Box(minx+width-b3_dist-self.BRANCH_WIDTH, mid - self.BRANCH_SEPARATION/2 - top_section/2, self.BRANCH_WIDTH, bot_section/2 + top_section/2 + self.BRANCH_SEPARATION)
+                # Draw following, then bottom & top (pushed in reverse, so top is drawn first)
+                stack.append((height, b3_dist, minx + width - b3_dist, miny, cur_trail.path_follow))
+                stack.append((bot_section, branch_dist, minx+self.BRANCH_WIDTH, miny, cur_trail.path_bottom))
+                stack.append((top_section, branch_dist, minx+self.BRANCH_WIDTH, miny+bot_section+self.BRANCH_SEPARATION, cur_trail.path_top))
+
+    # RETAINED DRAWING
+
+    def draw_scene(self, height, width, minx, miny) -> None:
+        """
+        Draws the current trail in the box, like draw_in_box, but keeps what was drawn in a TrailScene and
+        just draws that again while nothing has changed. The scene is rebuilt when the current version
+        changes (an edit, undo or redo), when any trail or mountain is edited in place (see trail.edit_count),
+        when the box moves, or after invalidate_scene.
+        """
+        key = (height, width, minx, miny, edit_count())
+        if self.scene is None or self.scene_trail is not self.trail or self.scene_key != key:
+            self.scene = TrailScene()
+            self.recording = self.scene
+            try:
+                # Also sets the boxes used by box_and_action.
+                self.draw_in_box(height, width, minx, miny)
+            finally:
+                self.recording = None
+            self.scene_trail = self.trail
+            self.scene_key = key
+        self.scene.draw()
+
+    def invalidate_scene(self) -> None:
+        """Makes the next draw_scene rebuild the scene, eg. after changing the visual constants."""
+        self.scene = None
+
+    # DRAWING PRIMITIVES
+
+    @classmethod
+    def mountain_texture(cls):
+        import arcade
+        if cls._mountain_texture is None:
+            cls._mountain_texture = arcade.load_texture(cls.MOUNTAIN_IMAGE)
+        return cls._mountain_texture
 
     def draw_line(self, sx, sy, ex, ey):
         import arcade
+        if self.recording is not None:
+            self.recording.shapes.append(arcade.create_line(sx, sy, ex, ey, (0, 0, 0), 1))
+            return
         arcade.draw_line(sx, sy, ex, ey, (0, 0, 0), 1)
 
     def draw_mountain(self, x, y, scale, obj: Mountain):
         import arcade
-        sprite_list = arcade.SpriteList()
-        mountain = arcade.Sprite("img/hike.png", scale=self.MIN_MOUNTAIN_WIDTH/512 * scale)
+        mountain = arcade.Sprite(texture=self.mountain_texture(), scale=self.MIN_MOUNTAIN_WIDTH/512 * scale)
         mountain.center_x = x
         mountain.center_y = y
+        labels = [
+            (obj.difficulty_level, x - self.MIN_MOUNTAIN_WIDTH * scale / 2, (237, 17, 68)),
+            (obj.length, x + self.MIN_MOUNTAIN_WIDTH * scale / 2, (17, 127, 245)),
+        ]
+        label_y = y + self.MOUNTAIN_HEIGHT * scale / 2
+        label_style = dict(font_size=24, font_name=("Montserrat", "calibri", "arial"), anchor_x="center", anchor_y="center")
+        if self.recording is not None:
+            self.recording.sprites.append(mountain)
+            for text, label_x, color in labels:
+                self.recording.texts.append(arcade.Text(str(text), label_x, label_y, color, **label_style))
+            return
+        sprite_list = arcade.SpriteList()
         sprite_list.append(mountain)
         sprite_list.draw()
-        arcade.draw_text(
-            obj.difficulty_level,
-            x - self.MIN_MOUNTAIN_WIDTH * scale / 2,
-            y + self.MOUNTAIN_HEIGHT * scale / 2,
-            (237, 17, 68),
-            font_size=24,
-            font_name=("Montserrat", "calibri", "arial"),
-            anchor_x="center",
-            anchor_y="center"
-        )
-        arcade.draw_text(
-            obj.length,
-            x + self.MIN_MOUNTAIN_WIDTH * scale / 2,
-            y + self.MOUNTAIN_HEIGHT * scale / 2,
-            (17, 127, 245),
-            font_size=24,
-            font_name=("Montserrat", "calibri", "arial"),
-            anchor_x="center",
-            anchor_y="center"
-        )
+        for text, label_x, color in labels:
+            arcade.draw_text(text, label_x, label_y, color, **label_style)
 
 
     def draw_branch(self, sx, sy, ex, ety, eby):
         import arcade
         bez_top = bezier((sx, sy), (av(sx, ex), sy), (av(sx, ex), ety), (ex, ety))
-        arcade.draw_line_strip([
-            bez_top(t/100)
-            for t in range(101)
-        ], (0, 0, 0), 1)
         bez_bot = bezier((sx, sy), (av(sx, ex), sy), (av(sx, ex), eby), (ex, eby))
-        arcade.draw_line_strip([
-            bez_bot(t/100)
-            for t in range(101)
-        ], (0, 0, 0), 1)
+        for curve in [bez_top, bez_bot]:
+            points = [
+                curve(t/100)
+                for t in range(101)
+            ]
+            if self.recording is not None:
+                self.recording.shapes.append(arcade.create_line_strip(points, (0, 0, 0), 1))
+            else:
+                arcade.draw_line_strip(points, (0, 0, 0), 1)
 
-    def box_and_action(self, mouse_pos: tuple[float, float], mode=DrawMode, cur_trail: Trail|None=None, parent_sets: tuple[Trail, str]|None=None) -> tuple[Box|None, function|None, Trail|None]:
-        if cur_trail is None:
-            ref_trail = self.trail
-            cur_trail = self.trail.store
-            parent_sets = (self, "trail")
-        else:
-            ref_trail = cur_trail
-            cur_trail = cur_trail.store
-        if mouse_pos not in ref_trail.trail_box:
-            return None, None, None
-        def set_m(ref, cur_method):
+    def box_and_action(self, mouse_pos: tuple[float, float], mode=DrawMode, cur_trail: Trail|None=None, path: TrailPath=()) -> tuple[Box|None, function|None, Trail|None]:
+        def edit(method, path):
+            # Edits are persistent, so they add a new version to the history rather than mutating the trail.
             def func(*m):
-                ref.store = cur_method(*m)
+                self.history.apply(path, method, *m)
             return func
-        def set_parent(parent_set, cur_method):
-            parent, attribute = parent_set
-            def func(*m):
-                setattr(parent, attribute, cur_method(*m))
-            return func
-        if cur_trail is None:
-            if mode in [DrawMode.ADD_MOUNTAIN, DrawMode.ADD_BRANCH]:
-                return ref_trail.trail_box, set_parent(parent_sets, ref_trail.add_mountain_before if mode == DrawMode.ADD_MOUNTAIN else ref_trail.add_empty_branch_before), cur_trail
-        elif isinstance(cur_trail, TrailSeries):
-            if mouse_pos in cur_trail.before_box and mode in [DrawMode.ADD_MOUNTAIN, DrawMode.ADD_BRANCH]:
-                return cur_trail.before_box, set_m(ref_trail, cur_trail.add_mountain_before if mode == DrawMode.ADD_MOUNTAIN else cur_trail.add_empty_branch_before), cur_trail
-            if mouse_pos in cur_trail.mountain_box and mode in [DrawMode.REMOVE, DrawMode.EDIT]:
-                return cur_trail.mountain_box, (set_m(ref_trail, cur_trail.remove_mountain) if mode == DrawMode.REMOVE else lambda: cur_trail.mountain), cur_trail
-            if mouse_pos in cur_trail.after_box and mode in [DrawMode.ADD_MOUNTAIN, DrawMode.ADD_BRANCH]:
-                return cur_trail.after_box, set_m(ref_trail, cur_trail.add_mountain_after if mode == DrawMode.ADD_MOUNTAIN else cur_trail.add_empty_branch_after), cur_trail
-            return self.box_and_action(mouse_pos, mode, cur_trail.following, (cur_trail, 'following'))
-        else:
-            if mouse_pos in cur_trail.branch_start_box and mode == DrawMode.REMOVE:
-                return cur_trail.branch_start_box, set_m(ref_trail, cur_trail.remove_branch), cur_trail
-            if mouse_pos in cur_trail.branch_end_box and mode == DrawMode.REMOVE:
-                return cur_trail.branch_end_box, set_m(ref_trail, cur_trail.remove_branch), cur_trail
-            if mouse_pos in cur_trail.path_bottom.trail_box:
-                return self.box_and_action(mouse_pos, mode, cur_trail.path_bottom, (cur_trail, 'path_bottom'))
-            if mouse_pos in cur_trail.path_top.trail_box:
-                return self.box_and_action(mouse_pos, mode, cur_trail.path_top, (cur_trail, 'path_top'))
-            return self.box_and_action(mouse_pos, mode, cur_trail.path_follow, (cur_trail, 'path_follow'))
-        return None, None, None
+        # Walks down to the sub-trail under the mouse in a loop, so trails of any depth can be searched.
+        ref_trail = self.trail if cur_trail is None else cur_trail
+        while True:
+            cur_trail = ref_trail.store
+            if mouse_pos not in ref_trail.trail_box:
+                return None, None, None
+            if cur_trail is None:
+                if mode in [DrawMode.ADD_MOUNTAIN, DrawMode.ADD_BRANCH]:
+                    return ref_trail.trail_box, edit("add_mountain_before" if mode == DrawMode.ADD_MOUNTAIN else "add_empty_branch_before", path), cur_trail
+                return None, None, None
+            elif isinstance(cur_trail, CompactTrailSeries):
+                if mouse_pos in cur_trail.before_box and mode in [DrawMode.ADD_MOUNTAIN, DrawMode.ADD_BRANCH]:
+                    return cur_trail.before_box, edit("add_mountain_before" if mode == DrawMode.ADD_MOUNTAIN else "add_empty_branch_before", path), cur_trail
+                if mouse_pos in cur_trail.mountain_box and mode in [DrawMode.REMOVE, DrawMode.EDIT]:
+                    found_path, found_mountain = path, cur_trail.mountain
+                    return cur_trail.mountain_box, (edit("remove_mountain", path) if mode == DrawMode.REMOVE else lambda: (found_path, found_mountain)), cur_trail
+                if mouse_pos in cur_trail.after_box and mode in [DrawMode.ADD_MOUNTAIN, DrawMode.ADD_BRANCH]:
+                    return cur_trail.after_box, edit("add_mountain_after" if mode == DrawMode.ADD_MOUNTAIN else "add_empty_branch_after", path), cur_trail
+                ref_trail, path = cur_trail.following, path + ("following",)
+            else:
+                if mouse_pos in cur_trail.branch_start_box and mode == DrawMode.REMOVE:
+                    return cur_trail.branch_start_box, edit("remove_branch", path), cur_trail
+                if mouse_pos in cur_trail.branch_end_box and mode == DrawMode.REMOVE:
+                    return cur_trail.branch_end_box, edit("remove_branch", path), cur_trail
+                if mouse_pos in cur_trail.path_bottom.trail_box:
+                    ref_trail, path = cur_trail.path_bottom, path + ("path_bottom",)
+                elif mouse_pos in cur_trail.path_top.trail_box:
+                    ref_trail, path = cur_trail.path_top, path + ("path_top",)
+                else:
+                    ref_trail, path = cur_trail.path_follow, path + ("path_follow",)
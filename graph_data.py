@@ -0,0 +1,81 @@
+"""
+The data behind the difficulty graph, computed without a window so it can be built (and cached) headlessly.
+"""
+
+from __future__ import annotations
+
+import colorsys
+
+import numpy as np
+
+from mountain_manager import MountainManager
+from rank_history import RankHistory
+
+def get_col(index: int, total: int) -> list[int]:
+    """Returns the RGB color of line index out of total, spread evenly around the hue wheel."""
+    return [
+        int(255*x)
+        for x in colorsys.hls_to_rgb(index/total, 0.6, 0.6)
+    ]
+
+def position_history(history: RankHistory) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (positions, offsets), where positions[offsets[i]:offsets[i + 1]] are the positions
+    history.mountains[i] has after the step it is added at and after each step since, as
+    RankHistory.of_groups would record them. history is only used for its slots, none of its groups
+    need to have been added.
+
+    Each step's additions are counted per slot, and one cumulative sum over the counts gives
+    the number of mountains before every slot, which is gathered at each mountain's first slot.
+
+    Complexity:
+    - O(N*G) vectorised time, where N is the number of mountains and G the number of groups
+    - O(N + P) memory, where P is the number of positions returned
+    - Best case = Worst case
+    """
+    n = len(history.mountains)
+    steps = len(history.groups)
+    slots = np.array(history.slots, dtype=np.intp)
+    firsts = np.array(history.firsts, dtype=np.intp)
+    added_at = np.array(history.added_at, dtype=np.intp)
+
+    offsets = np.zeros(n + 1, dtype=np.intp)
+    np.cumsum(steps - added_at, out=offsets[1:])
+    positions = np.empty(offsets[-1], dtype=np.intp)
+    # counts[s + 1] is 1 once the mountain at slot s is added, so the cumulative sum at s is the number added before it.
+    counts = np.zeros(n + 1, dtype=np.intp)
+    ends = np.searchsorted(added_at, np.arange(steps), side="right")
+    start = 0
+    for step, end in enumerate(ends):
+        counts[slots[start:end] + 1] = 1
+        before = np.cumsum(counts)
+        # cur_position finds the first mountain with a key, so equal keys share its position.
+        positions[offsets[:end] + step - added_at[:end]] = before[firsts[:end]]
+        start = end
+    return positions, offsets
+
+def graph_data(mountain_manager: MountainManager) -> list[list]:
+    """
+    Returns the difficulty graph for the mountains in mountain_manager, adding them a difficulty at a
+    time (as MyWindow.on_graph_clicked shows it). Each entry follows this format:
+    [color, start_index, name, positions], where start_index is the step the mountain was added at and
+    positions is an array of its position after that step and each one since,
+    a view into one array holding every entry's positions.
+
+    Complexity:
+    - O(RankHistory() + position_history)
+    - Best case = Worst case
+    """
+    history = RankHistory(mountain_manager.group_by_difficulty())
+    if not history.mountains:
+        return []
+    positions, offsets = position_history(history)
+    return [
+        [
+            get_col(i, len(history.mountains)),
+            history.added_at[i],
+            mountain.name,
+            positions[offsets[i]:offsets[i + 1]]
+        ]
+        for i, mountain in enumerate(history.mountains)
+    ]
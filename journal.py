@@ -0,0 +1,199 @@
+"""
+Append-only persistence of trail edits.
+
+A stored trail is kept as a snapshot (the usual JSON store) plus a journal beside it,
+stores/<name>.journal, holding one JSON list per line:
+- ["snapshot", size, mtime_ns]: always the first line, identifying the snapshot the journal follows on from
+- ["edit", path, method, mountains]: TrailHistory.apply(path, method, *mountains)
+- ["undo"] / ["redo"]: TrailHistory.undo() / TrailHistory.redo()
+
+Each change is appended as it is made, so anything since the last compaction (or save) is
+recovered by replaying the journal onto the snapshot, even if it was never saved.
+Every compact_every records the current trail is written as a new snapshot and the journal restarted.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Callable
+
+from mountain import Mountain
+from serialize import dump, load_lazy
+from trail import Trail
+from trail_history import TrailEdit, TrailHistory
+
+class TrailJournal:
+
+    def __init__(self, snapshot_path: str, compact_every: int = 1000) -> None:
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + ".journal"
+        self.compact_every = compact_every
+        self.history: TrailHistory | None = None
+        # Records in the journal, not counting the snapshot line.
+        self.records = 0
+        # The history position of the snapshot, undoing past it needs a new snapshot.
+        self.base = 0
+        self._file = None
+
+    def load(self, on_mountain: Callable[[Mountain], None] = None) -> Trail:
+        """Lazily loads the snapshot, see serialize.load_lazy."""
+        with open(self.snapshot_path, "rb") as f:
+            return load_lazy(f, on_mountain)
+
+    def attach(self, history: TrailHistory) -> int:
+        """
+        Replays the journal onto a history of the snapshot, then records every later change to it.
+        A journal for an older snapshot (left by a crash while compacting) is ignored,
+        as is a final record cut short by a crash while appending.
+        Returns the number of records replayed.
+
+        Complexity:
+        - O(r * Trail.edit), where r is the number of records in the journal
+        - Best case = Worst case
+        :raises ValueError: if a record other than the last is corrupt.
+        """
+        self.history = history
+        self.base = history.position
+        records, end = self._read()
+        if records is None:
+            self._write_journal([])
+            history.journal = self
+            return 0
+        for record in records:
+            self._replay(record)
+        # Drop anything after the last complete record.
+        with open(self.journal_path, "r+b") as f:
+            f.truncate(end)
+        self.records = len(records)
+        self._file = open(self.journal_path, "a")
+        history.journal = self
+        return len(records)
+
+    def _read(self) -> tuple[list[list] | None, int]:
+        """
+        Returns the records in the journal and the offset just past the last complete one,
+        or None if there is no journal for the current snapshot.
+        """
+        try:
+            f = open(self.journal_path, "rb")
+        except FileNotFoundError:
+            return None, 0
+        with f:
+            header = f.readline()
+            if not header.endswith(b"\n") or json.loads(header) != ["snapshot", *self._fingerprint()]:
+                return None, 0
+            records = []
+            end = f.tell()
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    raise ValueError(f"Corrupt journal record at offset {end} of {self.journal_path}")
+                end += len(line)
+        return records, end
+
+    def _replay(self, record: list) -> None:
+        """Makes the change a record describes, without recording it again."""
+        journal, self.history.journal = self.history.journal, None
+        try:
+            kind = record[0]
+            if kind == "edit":
+                self.history.apply(tuple(record[1]), record[2], *(Mountain(*fields) for fields in record[3]))
+            elif kind == "undo":
+                self.history.undo()
+            elif kind == "redo":
+                self.history.redo()
+            else:
+                raise ValueError(f"Unknown journal record {record!r}")
+        finally:
+            self.history.journal = journal
+
+    def _fingerprint(self) -> list[int]:
+        stat = os.stat(self.snapshot_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    @staticmethod
+    def _edit_record(edit: TrailEdit) -> list:
+        return ["edit", list(edit.path), edit.method, [[m.name, m.difficulty_level, m.length] for m in edit.args]]
+
+    def _append(self, record: list) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self.records += 1
+        if self.records >= self.compact_every:
+            self.compact()
+
+    def applied(self, edit: TrailEdit) -> None:
+        """Records an edit, called by TrailHistory.apply."""
+        self._append(self._edit_record(edit))
+
+    def undone(self) -> None:
+        """Records an undo, called by TrailHistory.undo."""
+        if self.history.position < self.base:
+            # The snapshot is already past this version, so it has to be rewritten.
+            self.compact()
+        else:
+            self._append(["undo"])
+
+    def redone(self) -> None:
+        """Records a redo, called by TrailHistory.redo."""
+        self._append(["redo"])
+
+    def compact(self, snapshot_path: str = None) -> None:
+        """
+        Writes the current trail as a new snapshot, optionally to a new path, and restarts the journal.
+        When the path changes, the old snapshot's journal is deleted, as its edits now belong to the new snapshot.
+        Versions that could be redone are kept in the new journal, so redo still works after reloading.
+
+        Complexity:
+        - O(n + r), where n is the size of the trail and r is the number of versions that could be redone
+        - Best case = Worst case
+        """
+        old_journal_path = self.journal_path
+        if snapshot_path is not None:
+            self.snapshot_path = snapshot_path
+            self.journal_path = snapshot_path + ".journal"
+        history = self.history
+        temporary = self.snapshot_path + ".tmp"
+        with open(temporary, "w") as f:
+            dump(history.current, f)
+        # A crash from here on leaves the old journal, which no longer matches the snapshot and is ignored.
+        os.replace(temporary, self.snapshot_path)
+        redo = history.edits[history.position + 1:]
+        self._write_journal([self._edit_record(edit) for edit in redo] + [["undo"]] * len(redo))
+        self.base = history.position
+        if old_journal_path != self.journal_path:
+            # The old snapshot is unchanged, so its journal would still match it and replay these edits onto it.
+            try:
+                os.remove(old_journal_path)
+            except FileNotFoundError:
+                pass
+
+    def _write_journal(self, records: list[list]) -> None:
+        """Replaces the journal with a fresh one for the current snapshot, holding records."""
+        self._close_file()
+        temporary = self.journal_path + ".tmp"
+        with open(temporary, "w") as f:
+            for record in [["snapshot", *self._fingerprint()]] + records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        os.replace(temporary, self.journal_path)
+        self.records = len(records)
+        self._file = open(self.journal_path, "a")
+
+    def sync(self) -> None:
+        """Makes sure every recorded change has reached the disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Stops recording changes to the history."""
+        if self.history is not None and self.history.journal is self:
+            self.history.journal = None
+        self._close_file()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -5,19 +5,18 @@ Requires no student import, but will use your implemented classes as part of it'
 
 import arcade
 import arcade.gui as gui
-import json
+import os
 import sys
 import secrets
-from copy import copy
 
 from constants import DrawMode
 from mountain import Mountain
 from mountain_manager import MountainManager
-from trail import Trail, TrailSeries, TrailSplit
+from trail import Trail, TrailSeries, TrailSplit, edit_count
 from draw_trails import TrailDraw
-from mountain_organiser import MountainOrganiser
-from double_key_table import DoubleKeyTable
-from serialize import serialize, deserialize
+from graph_data import graph_data
+from serialize import dump, load, content_hash, file_hash
+from journal import TrailJournal
 
 class MyWindow(arcade.Window):
     """ Painter Window """
@@ -29,6 +28,10 @@ class MyWindow(arcade.Window):
     SCREEN_TITLE = "Paint"
 
     REPLAY_TIMER_DELTA = 0.05
+    # Also record every edit in an append-only journal beside the store, so unsaved edits survive a crash.
+    # The journal rewrites the store itself every TrailJournal.compact_every edits, so it is off unless
+    # the --journal flag is given.
+    USE_JOURNAL = False
 
     GRID_SIZE_X = 32
     GRID_SIZE_Y = 32
@@ -276,23 +279,72 @@ class MyWindow(arcade.Window):
     def setup(self) -> None:
         """Set up the game and initialize the variables."""
         self.reset()
+        args = sys.argv[1:]
+        if "--journal" in args:
+            args.remove("--journal")
+            self.USE_JOURNAL = True
+        self.cur_filename = args[0] if args else "basic.json"
+        # (filename, file fingerprint, trail, edit count) when it was loaded or saved, see load_store.
+        self.loaded = None
+        self.journal = None
+        self.load_store(self.cur_filename)
+        self.draw_box = None
+
+    def load_store(self, filename: str) -> None:
+        """
+        Load the trail stored in stores/filename.
+        Skipped if that file is unchanged since it was last loaded or saved and the trail has not been edited since.
+        The file's size and modification time are checked first, and only if they changed is the file
+        hashed and compared with the content hash of the trail, so touching a file doesn't reload it.
+
+        The whole trail is loaded up front, since laying out the first frame visits all of it anyway.
+        In journal mode any edits in the store's journal are replayed, recovering edits that were never saved.
+        """
+        path = f"stores/{filename}"
+        if self.loaded is not None:
+            loaded_filename, loaded_fingerprint, loaded_trail, loaded_edits = self.loaded
+            if (loaded_filename, loaded_edits) == (filename, edit_count()) and loaded_trail is self.mountain.trail:
+                fingerprint = self.fingerprint(path)
+                if fingerprint == loaded_fingerprint:
+                    return
+                with open(path, "rb") as f:
+                    if file_hash(f) == content_hash(loaded_trail):
+                        self.loaded = (filename, fingerprint, loaded_trail, loaded_edits)
+                        return
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        with open(path) as f:
+            t = load(f)
+        self.cur_filename = filename
+        self.mountain = TrailDraw(t)
+        if self.USE_JOURNAL:
+            self.journal = TrailJournal(path)
+            self.journal.attach(self.mountain.history)
+        self.index_mountains()
+        self.loaded = (filename, self.fingerprint(path), self.mountain.trail, edit_count())
+        self.draw_box, self.box_action, self.cur_trail = None, None, None
+
+    @staticmethod
+    def fingerprint(path: str) -> tuple[int, int]:
+        """Cheaply identifies the current contents of a file, without reading it."""
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def index_mountains(self) -> None:
+        """Rebuild the mountain manager from the mountains on the current trail."""
         self.mountain_manager = MountainManager()
-        self.cur_filename = sys.argv[1] if len(sys.argv) > 1 else "basic.json"
-        with open(f"stores/{self.cur_filename}", "r") as f:
-            t = deserialize(json.loads(f.read()))
         try:
             # Try to add all existing mountains
-            for mountain in t.collect_all_mountains():
+            for mountain in self.mountain.trail.collect_all_mountains():
                 self.mountain_manager.add_mountain(mountain)
         except NotImplementedError:
             pass
-        self.mountain = TrailDraw(t)
-        self.draw_box = None
 
     def on_draw(self) -> None:
         """Draw everything"""
         self.clear()
-        self.mountain.draw_in_box(self.SCREEN_HEIGHT, self.DRAW_PANEL, 0, 0)
+        self.mountain.draw_scene(self.SCREEN_HEIGHT, self.DRAW_PANEL, 0, 0)
         if self.draw_box is not None and not (self.showing_graph or self.is_editing or self.is_saving):
             arcade.draw_rectangle_filled(self.draw_box.x + self.draw_box.w/2, self.draw_box.y + self.draw_box.h/2, self.draw_box.w, self.draw_box.h, (0, 255, 0, 100))
         # UI - Draw Modes / Action buttons
@@ -352,7 +404,7 @@ class MyWindow(arcade.Window):
                                 pass
                         self.box_action()
                     elif self.cur_draw_mode == DrawMode.EDIT:
-                        self.cur_editing_mountain = self.box_action()
+                        self.cur_editing_path, self.cur_editing_mountain = self.box_action()
                         self.input_mountain_name.text = self.cur_editing_mountain.name
                         self.input_difficulty_level.text = str(self.cur_editing_mountain.difficulty_level)
                         self.input_length.text = str(self.cur_editing_mountain.length)
@@ -371,7 +423,21 @@ class MyWindow(arcade.Window):
 
     def on_key_press(self, symbol: int, modifiers: int) -> None:
         """Called when a keyboard key is pressed."""
-        pass
+        if self.is_editing or self.is_saving or not modifiers & arcade.key.MOD_CTRL:
+            return
+        history = self.mountain.history
+        if symbol == arcade.key.Z and history.can_undo():
+            history.undo()
+        elif symbol == arcade.key.Y and history.can_redo():
+            history.redo()
+        elif symbol == arcade.key.R:
+            self.load_store(self.cur_filename)
+            return
+        else:
+            return
+        # Any pending action was for the old version of the trail.
+        self.draw_box, self.box_action, self.cur_trail = None, None, None
+        self.index_mountains()
 
     def on_key_release(self, symbol: int, modifiers: int) -> None:
         """Called when a keyboard key is released."""
@@ -383,33 +449,7 @@ class MyWindow(arcade.Window):
 
     def on_graph_clicked(self):
         self.showing_graph = True
-        import colorsys
-        def get_col(index, total):
-            return [
-                int(255*x)
-                for x in colorsys.hls_to_rgb(index/total, 0.6, 0.6)
-            ]
-        groups = self.mountain_manager.group_by_difficulty()
-        to = MountainOrganiser()
-        positions = DoubleKeyTable()
-        positions.hash1 = lambda k: (k % positions.table_size)
-        all_mountains = []
-        for i, group in enumerate(groups):
-            to.add_mountains(group)
-            for mountain in group:
-                positions[mountain.difficulty_level, mountain.name] = []
-            all_mountains.extend(group)
-            for mountain in all_mountains:
-                positions[mountain.difficulty_level, mountain.name].append(to.cur_position(mountain))
-        self.graph_data = [
-            [
-                get_col(i, len(all_mountains)),
-                len(groups) - len(positions[mountain.difficulty_level, mountain.name]),
-                mountain.name,
-                positions[mountain.difficulty_level, mountain.name]
-            ]
-            for i, mountain in enumerate(all_mountains)
-        ]
+        self.graph_data = graph_data(self.mountain_manager)
 
     def on_save_file_clicked(self):
         self.is_saving = True
@@ -445,12 +485,14 @@ class MyWindow(arcade.Window):
         self.edit_mode = False
 
     def on_save_clicked(self, event):
-        old_mountain = copy(self.cur_editing_mountain)
-        self.cur_editing_mountain.name = self.input_mountain_name.text
-        self.cur_editing_mountain.difficulty_level = int(self.input_difficulty_level.text)
-        self.cur_editing_mountain.length = int(self.input_length.text)
+        new_mountain = self.mountain.history.edit_mountain(
+            self.cur_editing_path,
+            self.input_mountain_name.text,
+            int(self.input_difficulty_level.text),
+            int(self.input_length.text),
+        )
         try:
-            self.mountain_manager.edit_mountain(old_mountain, self.cur_editing_mountain)
+            self.mountain_manager.edit_mountain(self.cur_editing_mountain, new_mountain)
         except NotImplementedError:
             pass
         # Close the window.
@@ -460,11 +502,25 @@ class MyWindow(arcade.Window):
         self.is_editing = False
         self.manager.disable()
         self.cur_editing_mountain = None
+        self.cur_editing_path = None
 
     def on_file_save_clicked(self, event):
         new_path = str(self.input_file_name.text)
-        with open(f"stores/{new_path}", "w") as f:
-            f.write(serialize(self.mountain.trail))
+        if self.journal is None:
+            # Written beside the store and moved over it, so a crash while saving leaves the old store intact.
+            temporary = f"stores/{new_path}.tmp"
+            with open(temporary, "w") as f:
+                dump(self.mountain.trail, f)
+            os.replace(temporary, f"stores/{new_path}")
+        elif new_path == self.cur_filename:
+            # Every edit is already in the journal, so saving only has to make sure it reached the disk.
+            # The store itself is rewritten every TrailJournal.compact_every records.
+            self.journal.sync()
+        else:
+            # A new store starts from a snapshot of the trail, with a fresh journal beside it.
+            self.journal.compact(f"stores/{new_path}")
+        self.cur_filename = new_path
+        self.loaded = (new_path, self.fingerprint(f"stores/{new_path}"), self.mountain.trail, edit_count())
         # Close the window.
         self.on_file_close_clicked(event)
 
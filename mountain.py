@@ -1,9 +1,13 @@
 from __future__ import annotations
 from dataclasses import dataclass
 
-@dataclass
-class Mountain:
+@dataclass(slots=True)
+class CompactMountain:
 
     name: str
     difficulty_level: int
     length: int
+
+
+class Mountain(CompactMountain):
+    """A CompactMountain which can also be given extra attributes."""
@@ -1,7 +1,7 @@
 from mountain import Mountain
 from double_key_table import DoubleKeyTable
 from algorithms.mergesort import *
-from typing import List
+from typing import Callable, List
 
 class MountainManager:
 
@@ -12,6 +12,17 @@ class MountainManager:
         -Best case = Worst case
         """
         self.manager = DoubleKeyTable()
+        self.listeners: List[Callable[[Mountain, Mountain], None]] = []
+
+    def add_listener(self, listener: Callable[[Mountain, Mountain], None]) -> None:
+        """
+        Calls listener(old, new) after every edit_mountain, eg. MountainOrganiser.update_mountain.
+
+        Complexity:
+        -O(1)
+        -Best case = Worst case
+        """
+        self.listeners.append(listener)
 
     def add_mountain(self, mountain: Mountain):
         """
@@ -32,11 +43,13 @@ class MountainManager:
     def edit_mountain(self, old: Mountain, new: Mountain):
         """
         Complexity:
-        -O(1) since we assumed that all Double Key Table methods are O(1).
+        -O(L) where L is the number of listeners, since we assumed that all Double Key Table methods are O(1).
         -Best case = Worst case
         """
         del self.manager[str(old.difficulty_level), old.name]
         self.manager[str(new.difficulty_level), new.name] = new
+        for listener in self.listeners:
+            listener(old, new)
         
     def mountains_with_difficulty(self, diff: int) -> List[Mountain]:
         """
@@ -51,10 +64,11 @@ class MountainManager:
     def group_by_difficulty(self):
         """
         Complexity:
-        -Best case: O(1) if there is only one mountain to sort.
-        -Worst case: O(N*logN) when there are N mountains to sort.
+        -Best case: O(N) when the N difficulties are already (or nearly) in order.
+        -Worst case: O(N*logN) when there are N difficulties to sort.
         """
         mountain_list = self.manager.keys()
-        sorted_mountain_list = mergesort(mountain_list)
+        # Difficulties are stored as strings, so compare them as numbers (otherwise "10" < "2").
+        sorted_mountain_list = adaptive_mergesort(mountain_list, key=int)
         return [self.manager.values(mountain) for mountain in sorted_mountain_list]
 
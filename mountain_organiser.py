@@ -2,78 +2,110 @@ from __future__ import annotations
 from algorithms.mergesort import *
 from algorithms.binary_search import *
 from mountain import Mountain
+from data_structures.sorted_block_list import SortedBlockList
 
 class MountainOrganiser:
 
-    def __init__(self) -> None:
+    def __init__(self, container: SortedBlockList[Mountain] | None = None) -> None:
         """
+        container: the ordered container to keep the mountains in, which must be empty and keyed by
+        MountainOrganiser.order. Anything with the same add / update / find / iteration methods as
+        SortedBlockList can be used, by default a SortedBlockList is.
+
         Complexity:
-        -O(1) to initialize a list
+        -O(1) to initialize the container
         -Best case = Worst case
         """
-        self.list_of_mountains = []
+        self.mountains = container if container is not None else SortedBlockList(key=self.order)
+
+    @staticmethod
+    def order(mountain: Mountain) -> tuple[int, str]:
+        """Mountains are ordered by length, then by name."""
+        return mountain.length, mountain.name
+
+    @property
+    def list_of_mountains(self) -> list[Mountain]:
+        """
+        The mountains in order, as a list.
+
+        Complexity:
+        -O(N), where N is the number of mountains.
+        -Best case = Worst case
+        """
+        return list(self.mountains)
 
     def cur_position(self, mountain: Mountain) -> int:
         """
-        Implement binary search to find the index of the given mountain in the sorted list of mountains.
+        Finds the index of the given mountain in the sorted order of mountains.
+
+        Complexity:
+        -O(logN), where N is the number of mountains.
+        -Best case = Worst case
+        :raises KeyError: if the mountain has not been added.
+        """
+        try:
+            return self.mountains.find(self.order(mountain))
+        except KeyError:
+            raise KeyError(f"Mountain {mountain.name!r} of length {mountain.length} has not been added") from None
+
+    def kth_mountain(self, k: int) -> Mountain:
+        """
+        Returns the mountain at position k in the sorted order (the inverse of cur_position).
 
         Complexity:
-        -Best case: O(1) when the mountain you are trying to search for is in the middle of the sorted list of mountains.
-        -Worst case: O(logN) when the mountain you are trying to search for is at the front or end of the sorted list of mountains.
-        -N is len(self.list_of_mountains).
-        """
-        lo = 0
-        hi = len(self.list_of_mountains) - 1
-
-        while lo <= hi:
-            mid = (lo + hi) // 2
-            search_mountain = self.list_of_mountains[mid]
-
-            if search_mountain.length == mountain.length:
-                if search_mountain.name == mountain.name:
-                    return mid
-                elif search_mountain.name < mountain.name:
-                    lo = mid + 1
-                else:
-                    hi = mid - 1
-            elif search_mountain.length < mountain.length:
-                lo = mid + 1
-            else:
-                hi = mid - 1
-
-        raise KeyError
+        -O(logN), where N is the number of mountains.
+        -Best case = Worst case
+        :raises IndexError: if there are not more than k mountains.
+        """
+        return self.mountains[k]
+
+    def count_shorter_than(self, length: int) -> int:
+        """
+        Returns how many mountains are shorter than length.
+
+        Complexity:
+        -O(logN), where N is the number of mountains.
+        -Best case = Worst case
+        """
+        # (length,) sorts before (length, name) for every name.
+        return self.mountains.bisect_left((length,))
 
     def add_mountains(self, mountains: list[Mountain]) -> None:
         """
-        binary search to find the correct position for each mountain in the sorted list, and then inserts the mountain into the list at that position.
+        Adds each mountain to the ordered container, in its sorted position.
+        A large batch is sorted and merged in with the existing mountains in one pass.
+
+        Complexity:
+        -O(N*logN + M) for a batch of N mountains into M mountains already added.
+        -Best case: O(N*logM) when N is small compared to M, and the mountains are added one at a time.
+        -Worst case: O(N*logN + M).
+        """
+        self.mountains.update(mountains)
+
+    def remove_mountain(self, mountain: Mountain) -> None:
+        """
+        Removes a mountain, so the mountains after it move up a position.
 
         Complexity:
-        -Best case: O(N) where N is len(mountains) and every mountain is inserted into the middle of the list.
-        -Thus, the while loop only iterate once for every mountain.
-        -Worst case: O(N*logM) where N is len(mountains) and M is len(self.list_of_mountains).
-        -Every mountain is inserted at the front or end of the list.
-        -Thus, the binary search while loop will iterate logM times.
-        """
-        for mountain in mountains:  # O(N)
-            left, right = 0, len(self.list_of_mountains) - 1
-            index = None
-
-            while left <= right:  # O(logM)
-                mid = (left + right) // 2
-                search_mountain = self.list_of_mountains[mid]
-                if search_mountain.length < mountain.length:
-                    left = mid + 1
-                elif search_mountain.length > mountain.length:
-                    right = mid - 1
-                elif search_mountain.name < mountain.name:
-                    left = mid + 1
-                elif search_mountain.name > mountain.name:
-                    right = mid - 1
-                else:
-                    index = mid
-                    break
-
-            if index is None:
-                index = left
-
-            self.list_of_mountains.insert(index, mountain)
\ No newline at end of file
+        -O(logN), where N is the number of mountains.
+        -Best case = Worst case
+        :raises KeyError: if the mountain has not been added.
+        """
+        try:
+            self.mountains.remove(self.order(mountain))
+        except KeyError:
+            raise KeyError(f"Mountain {mountain.name!r} of length {mountain.length} has not been added") from None
+
+    def update_mountain(self, old: Mountain, new: Mountain) -> None:
+        """
+        Moves a mountain whose name or length has changed to its new position.
+        old holds the mountain's previous name and length (new may be the same mountain, edited in place).
+        Can be given to MountainManager.add_listener to stay in sync with its edits.
+
+        Complexity:
+        -O(logN), where N is the number of mountains.
+        -Best case = Worst case
+        :raises KeyError: if old has not been added.
+        """
+        self.remove_mountain(old)
+        self.mountains.add(new)
@@ -32,11 +32,20 @@ class LazyWalker(WalkerPersonality):
         """
 
         # isinstance breaks across imports if running the original file as main
-        # So just check __class__.__name__ :(
-        top_m = top_branch.store.__class__.__name__ == "TrailSeries"
-        bot_m = bottom_branch.store.__class__.__name__ == "TrailSeries"
+        # So just check the class names (including base classes, for compact and interned trails) :(
+        top_m = any(cls.__name__ == "CompactTrailSeries" for cls in type(top_branch.store).__mro__)
+        bot_m = any(cls.__name__ == "CompactTrailSeries" for cls in type(bottom_branch.store).__mro__)
         if top_m and bot_m:
             return top_branch.store.mountain.difficulty_level < bottom_branch.store.mountain.difficulty_level
         # If one of them has a mountain, don't take it.
         # If neither do, then take the top branch.
         return not top_m
+
+class ForesightWalker(WalkerPersonality):
+    def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+        """
+        Look at every route through each branch (using the cached aggregates),
+        take the branch whose easiest route has the least total difficulty.
+        Ties go to the top branch.
+        """
+        return top_branch.aggregates.min_cost <= bottom_branch.aggregates.min_cost
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from algorithms.mergesort import adaptive_mergesort
+from data_structures.fenwick_tree import FenwickTree
+from mountain import Mountain
+from mountain_organiser import MountainOrganiser
+
+class RankHistory:
+    """
+    Tracks the position of every mountain, in the order MountainOrganiser keeps them in,
+    after each group of mountains is added, as if cur_position was called for every mountain
+    added so far after each add_mountains.
+
+    Every mountain is given a slot in the final sorted order up front. A Fenwick tree counts the
+    mountains added at each slot, so adding a mountain is one O(logN) update which shifts the rank
+    of every later slot up by one, and a mountain's position is the count of mountains added before
+    the first slot with its key.
+    """
+
+    def __init__(self, groups: list[list[Mountain]]) -> None:
+        """
+        groups: the groups that will be added, in order. Nothing is added until add_next_group is called.
+
+        Complexity:
+        - O(N*logN), where N is the number of mountains in groups, to sort them into slots
+        - Best case = Worst case
+        """
+        self.groups = groups
+        # In the order they are added.
+        self.mountains: list[Mountain] = [mountain for group in groups for mountain in group]
+        # The step each mountain is added at.
+        self.added_at: list[int] = [step for step, group in enumerate(groups) for _ in group]
+        # positions[i] holds the position of mountains[i] after each step since it was added.
+        self.positions: list[list[int]] = [[] for _ in self.mountains]
+        self.steps = 0
+        self._added = 0
+
+        keys = [MountainOrganiser.order(mountain) for mountain in self.mountains]
+        # Stable, so mountains with equal keys keep the order they are added in.
+        order = adaptive_mergesort(list(range(len(keys))), key=keys.__getitem__)
+        # slots[i] is the slot of mountains[i] in the final sorted order, and firsts[i] the first slot holding its key.
+        self.slots = [0] * len(keys)
+        self.firsts = [0] * len(keys)
+        first = 0
+        for slot, index in enumerate(order):
+            if slot > 0 and keys[index] != keys[order[slot - 1]]:
+                first = slot
+            self.slots[index] = slot
+            self.firsts[index] = first
+        self._counts = FenwickTree([0] * len(keys))
+
+    def add_next_group(self) -> None:
+        """
+        Adds the next group as one step, recording the new position of every mountain added so far.
+
+        Complexity:
+        - O((k + n) * logN), where k is the size of the group, n is the number of mountains added so far
+          (including the group), which is also the number of positions recorded, and N is the number of mountains
+        - Best case = Worst case
+        :raises IndexError: if every group has already been added.
+        """
+        if self.steps >= len(self.groups):
+            raise IndexError("Every group has already been added")
+        end = self._added + len(self.groups[self.steps])
+        for i in range(self._added, end):
+            self._counts.add(self.slots[i], 1)
+        self._added = end
+        for i in range(end):
+            # cur_position finds the first mountain with a key, so equal keys share its position.
+            self.positions[i].append(self._counts.prefix_sum(self.firsts[i]))
+        self.steps += 1
+
+    @classmethod
+    def of_groups(cls, groups: list[list[Mountain]]) -> RankHistory:
+        """
+        Returns the rank history of adding each group in turn.
+
+        Complexity:
+        - O((N + P) * logN), where N is the number of mountains and P is the number of positions recorded
+        - Best case = Worst case
+        """
+        history = cls(groups)
+        for _ in groups:
+            history.add_next_group()
+        return history
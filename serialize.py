@@ -1,7 +1,8 @@
-import dataclasses, json
+import dataclasses, hashlib, io, json, mmap, os, re
 
-from trail import Trail, TrailSplit, TrailSeries
+from trail import Trail, TrailSplit, TrailSeries, CompactTrail, CompactTrailSeries, LazyTrail, TrailStore
 from mountain import Mountain
+from typing import Callable
 
 # https://stackoverflow.com/questions/51286748/make-the-python-json-encoder-support-pythons-new-dataclasses
 class EnhancedJSONEncoder(json.JSONEncoder):
@@ -24,20 +25,303 @@ class EnhancedJSONEncoder(json.JSONEncoder):
                 self.remove_box(o)
 
 def serialize(trail):
-    return json.dumps(trail, cls=EnhancedJSONEncoder)
+    f = io.StringIO()
+    dump(trail, f)
+    return f.getvalue()
+
+def dump(trail: CompactTrail, f, buffer_size: int = 4096) -> None:
+    """
+    Writes a trail to the file object f as JSON, in the same format as EnhancedJSONEncoder,
+    walking the trail with a stack rather than building a dictionary for it first.
+    Only the trail fields are written, so injected attributes like boxes are left out.
+
+    The stack holds the JSON text and trails still to be written. The closing braces of a run
+    of series are kept as a single count, so the stack only grows with the number of
+    splits being written at once.
+
+    Complexity:
+    - O(n), where n is the number of trails in the trail
+    - Best case = Worst case
+    """
+    buffer = []
+    stack = [trail]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, int):
+            buffer.append("}}" * item)
+        elif isinstance(item, str):
+            buffer.append(item)
+        elif item.store is None:
+            buffer.append('{"store": null}')
+        elif isinstance(item.store, CompactTrailSeries):
+            mountain = item.store.mountain
+            buffer.append('{"store": {"mountain": {"name": %s, "difficulty_level": %s, "length": %s}, "following": ' % (
+                json.dumps(mountain.name), json.dumps(mountain.difficulty_level), json.dumps(mountain.length)
+            ))
+            if stack and isinstance(stack[-1], int):
+                stack[-1] += 1
+            else:
+                stack.append(1)
+            stack.append(item.store.following)
+        else:
+            buffer.append('{"store": {"path_top": ')
+            stack.append(1)
+            stack.append(item.store.path_follow)
+            stack.append(', "path_follow": ')
+            stack.append(item.store.path_bottom)
+            stack.append(', "path_bottom": ')
+            stack.append(item.store.path_top)
+        if len(buffer) >= buffer_size:
+            f.write("".join(buffer))
+            buffer = []
+    f.write("".join(buffer))
+
+class _HashWriter:
+    """A file object which feeds everything written to it into a hash."""
+
+    def __init__(self) -> None:
+        self.hash = hashlib.sha256()
+
+    def write(self, text: str) -> int:
+        self.hash.update(text.encode("utf-8"))
+        return len(text)
+
+def content_hash(trail: CompactTrail) -> str:
+    """
+    Returns a sha256 hex digest of the trail's canonical JSON (as written by dump),
+    without holding the JSON in memory.
+    Equal trails always have the same hash, and a file written by dump has the same hash as its bytes.
+    """
+    writer = _HashWriter()
+    dump(trail, writer)
+    return writer.hash.hexdigest()
+
+def file_hash(f, chunk_size: int = 1 << 16) -> str:
+    """Returns a sha256 hex digest of the binary file object f, read chunk_size bytes at a time."""
+    digest = hashlib.sha256()
+    while chunk := f.read(chunk_size):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def _from_json_object(obj: dict):
+    """
+    Turns a decoded JSON object into the trail object it represents,
+    given that every object nested inside it has already been turned into one.
+    """
+    if "store" in obj:
+        return Trail(obj["store"])
+    if "name" in obj:
+        return Mountain(**obj)
+    if "mountain" in obj:
+        return TrailSeries(mountain=obj["mountain"], following=obj["following"])
+    return TrailSplit(path_top=obj["path_top"], path_bottom=obj["path_bottom"], path_follow=obj["path_follow"])
 
 def deserialize(obj):
-    if obj["store"] is None:
-        return Trail(None)
-    if "mountain" in obj["store"]:
-        inside = TrailSeries(
-            Mountain(**obj["store"]["mountain"]),
-            deserialize(obj["store"]["following"])
-        )
-    else:
-        inside = TrailSplit(
-            deserialize(obj["store"]["path_bottom"]),
-            deserialize(obj["store"]["path_top"]),
-            deserialize(obj["store"]["path_follow"])
-        )
-    return Trail(inside)
+    """
+    Turns a decoded JSON trail (as from json.loads) back into a Trail.
+
+    Complexity:
+    - O(n), where n is the number of JSON objects
+    - Best case = Worst case
+    - Uses a list as a stack rather than recursion, so any depth of trail can be loaded
+    """
+    converted = {}
+    stack = [(obj, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if not children_done:
+            stack.append((node, True))
+            stack.extend((value, False) for value in node.values() if isinstance(value, dict))
+        else:
+            converted[id(node)] = _from_json_object({
+                key: converted.pop(id(value)) if isinstance(value, dict) else value
+                for key, value in node.items()
+            })
+    return converted[id(obj)]
+
+# Group 1: punctuation, 2: string, 3: number, 4: literal
+# Numbers and literals must not run on into more characters (eg. "1x" or "nullx"), the other tokens can.
+_JSON_TOKEN = re.compile(r'''\s*(?:([{}\[\]:,])|("(?:[^"\\]|\\.)*")|(-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)(?![\w.+-])|(true|false|null)(?![\w.+-]))''')
+_PUNCTUATION = 1
+_NUMBER = 3
+
+def _json_tokens(f, chunk_size: int):
+    """
+    Yields (group, text) for each JSON token in the file object f, reading it chunk_size characters at a time.
+    A token cut off by the end of a chunk is only yielded once the next chunk has been read.
+    """
+    buffer = ""
+    position = 0
+    eof = False
+    while True:
+        match = _JSON_TOKEN.match(buffer, position)
+        # Numbers and literals at the end of the buffer might continue in the next chunk.
+        if match is None or (not eof and match.end() == len(buffer) and match.lastindex >= _NUMBER):
+            if eof:
+                if buffer[position:].strip():
+                    raise ValueError(f"Invalid JSON near {buffer[position:position + 20]!r}")
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        position = match.end()
+        yield match.lastindex, match.group(match.lastindex)
+
+def load(f, chunk_size: int = 1 << 16):
+    """
+    Reads a JSON trail from the file object f, building the Trail as the file is read in chunks.
+    Each object is turned into its trail object as soon as it closes, so only the objects
+    still open (one per level of nesting) and the current chunk are held on top of the result.
+    Expects well formed JSON, as written by dump (or json.dump, with any separators).
+
+    Complexity:
+    - O(c), where c is the number of characters in the file
+    - Best case = Worst case
+    - Uses a list as a stack rather than recursion, so any depth of trail can be loaded
+    """
+    # Each entry is [object being built, key waiting for its value]
+    stack = []
+    result = None
+    finished = False
+    for group, text in _json_tokens(f, chunk_size):
+        if finished:
+            raise ValueError(f"Unexpected {text!r} after the end of the JSON")
+        if group == _PUNCTUATION:
+            if text == "{":
+                stack.append([{}, None])
+                continue
+            if text != "}":
+                continue
+            if not stack:
+                raise ValueError("Unbalanced '}'")
+            value = _from_json_object(stack.pop()[0])
+        else:
+            value = json.loads(text)
+        if not stack:
+            result = value
+            finished = True
+            continue
+        entry = stack[-1]
+        if entry[1] is None:
+            entry[1] = value
+        else:
+            entry[0][entry[1]] = value
+            entry[1] = None
+    if not finished:
+        raise ValueError("Unexpected end of JSON")
+    return result
+
+_TRAIL_START = re.compile(rb'\s*\{\s*"store"\s*:\s*(?:(null)|\{)')
+_KEY = re.compile(rb'\s*"(\w+)"\s*:\s*')
+_FLAT_OBJECT = re.compile(rb'\{(?:[^{}"]|"(?:[^"\\]|\\.)*")*\}')
+_BRACE = re.compile(rb'[{}]|"(?:[^"\\]|\\.)*"')
+_SEPARATOR = re.compile(rb'\s*,')
+_STORE_KEYS = {"mountain": 2, "following": 2, "path_top": 3, "path_bottom": 3, "path_follow": 3}
+
+class LazyJSONReader:
+    """
+    Builds trails from JSON trail text held in any bytes buffer (bytes, or an mmap of the file).
+    A trail is referred to by the offset of its JSON object, and its store is only parsed the
+    first time it is accessed, so nothing is parsed up front.
+
+    Parsing a store only reads up to its last field, but has to scan over the JSON of any
+    sub-trail written before that field (eg. path_top and path_bottom of a split) to find it.
+    The ends of scanned objects are remembered, so over a whole load each byte is scanned at most once.
+    """
+
+    def __init__(self, buffer, on_mountain: Callable[[Mountain], None] = None) -> None:
+        """on_mountain, if given, is called with each mountain as it is parsed."""
+        self.buffer = buffer
+        self.on_mountain = on_mountain
+        # Offset of the start of each object scanned by skip -> offset just past its end
+        self._ends = {}
+
+    def trail(self, offset: int = 0) -> Trail:
+        """Returns the (lazy) trail whose JSON object starts at offset."""
+        return LazyTrail(lambda: self.store(offset))
+
+    def store(self, offset: int) -> TrailStore:
+        """
+        Parses the store of the trail whose JSON object starts at offset, giving it lazy trails.
+
+        Complexity:
+        - O(s), where s is the length of the JSON of the sub-trails which come before the store's last field
+          and have not been scanned before
+        - Best case = O(1), for a series (the mountain comes before following in files written by dump)
+        """
+        match = _TRAIL_START.match(self.buffer, offset)
+        if match is None:
+            raise ValueError(f"Expected a trail at offset {offset}")
+        if match.group(1) is not None:
+            return None
+        fields = {}
+        position = match.end()
+        while True:
+            key = _KEY.match(self.buffer, position)
+            name = key.group(1).decode() if key is not None else None
+            if name not in _STORE_KEYS:
+                raise ValueError(f"Expected a store field at offset {position}")
+            position = key.end()
+            if name == "mountain":
+                value = _FLAT_OBJECT.match(self.buffer, position)
+                if value is None:
+                    raise ValueError(f"Expected a mountain at offset {position}")
+                fields[name] = Mountain(**json.loads(value.group()))
+                if self.on_mountain is not None:
+                    self.on_mountain(fields[name])
+                position = value.end()
+            else:
+                fields[name] = self.trail(position)
+                if len(fields) < _STORE_KEYS[name]:
+                    position = self.skip(position)
+            if len(fields) == _STORE_KEYS[name]:
+                return _from_json_object(fields)
+            separator = _SEPARATOR.match(self.buffer, position)
+            if separator is None:
+                raise ValueError(f"Expected ',' at offset {position}")
+            position = separator.end()
+
+    def skip(self, offset: int) -> int:
+        """
+        Returns the offset just past the JSON object starting at offset.
+        The end of every object scanned over is remembered, and a remembered object is jumped
+        over rather than scanned again, so no byte is scanned more than once per reader.
+        Any sub-trail of a skipped object is later skipped in O(1).
+        """
+        if offset in self._ends:
+            return self._ends[offset]
+        starts = []
+        position = offset
+        while True:
+            match = _BRACE.search(self.buffer, position)
+            if match is None:
+                raise ValueError(f"Unterminated object at offset {offset}")
+            position = match.end()
+            token = match.group()
+            if token == b"{":
+                end = self._ends.get(match.start())
+                if end is not None:
+                    position = end
+                    if not starts:
+                        return end
+                else:
+                    starts.append(match.start())
+            elif token == b"}":
+                if not starts:
+                    raise ValueError(f"Unbalanced '}}' at offset {match.start()}")
+                self._ends[starts.pop()] = position
+                if not starts:
+                    return position
+
+def load_lazy(f, on_mountain: Callable[[Mountain], None] = None) -> Trail:
+    """
+    Memory maps the JSON trail in the binary file object f, and returns its trail in constant time.
+    Each store is parsed the first time it is accessed, calling on_mountain with each mountain found.
+    The map stays open for as long as any trail from it is still referenced.
+    :raises ValueError: if the file is empty.
+    """
+    if os.fstat(f.fileno()).st_size == 0:
+        raise ValueError("Cannot load a trail from an empty file")
+    return LazyJSONReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), on_mountain).trail()
@@ -0,0 +1,62 @@
+import bisect
+import random
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from algorithms.binary_search import binary_search, bisect_left, bisect_right, find, search_many
+
+class TestBinarySearch(unittest.TestCase):
+
+    def random_lists(self):
+        rng = random.Random(7)
+        for n in [0, 1, 2, 3, 10, 100]:
+            yield sorted(rng.randint(0, n) for _ in range(n))
+
+    @number("18.1")
+    def test_bisect(self):
+        for l in self.random_lists():
+            for x in range(-1, len(l) + 2):
+                self.assertEqual(bisect_left(l, x), bisect.bisect_left(l, x))
+                self.assertEqual(bisect_right(l, x), bisect.bisect_right(l, x))
+                self.assertEqual(binary_search(l, x), bisect.bisect_left(l, x))
+                lo, hi = len(l) // 4, 3 * len(l) // 4
+                self.assertEqual(bisect_left(l, x, lo=lo, hi=hi), bisect.bisect_left(l, x, lo, hi))
+                self.assertEqual(bisect_right(l, x, lo=lo, hi=hi), bisect.bisect_right(l, x, lo, hi))
+
+    @number("18.2")
+    def test_key_and_find(self):
+        mountains = [Mountain("a", 1, 3), Mountain("b", 1, 5), Mountain("c", 1, 5), Mountain("d", 1, 9)]
+        length = lambda m: m.length
+        self.assertEqual(bisect_left(mountains, 5, key=length), 1)
+        self.assertEqual(bisect_right(mountains, 5, key=length), 3)
+        self.assertEqual(find(mountains, 5, key=length), 1)
+        self.assertEqual(find(mountains, 9, key=length), 3)
+        self.assertRaises(KeyError, lambda: find(mountains, 4, key=length))
+        self.assertRaises(KeyError, lambda: find(mountains, 10, key=length))
+        self.assertRaises(KeyError, lambda: find(mountains, 3, key=length, lo=1))
+
+    @number("18.3")
+    def test_search_many(self):
+        rng = random.Random(8)
+        for l in self.random_lists():
+            queries = sorted(rng.randint(-1, len(l) + 1) for _ in range(20))
+            self.assertEqual(search_many(l, queries), [bisect.bisect_left(l, x) for x in queries])
+            self.assertEqual(search_many(l, queries, right=True), [bisect.bisect_right(l, x) for x in queries])
+        self.assertEqual(search_many([], [1, 2]), [0, 0])
+
+    @number("18.4")
+    def test_search_many_comparisons(self):
+        calls = 0
+        def key(x):
+            nonlocal calls
+            calls += 1
+            return x
+        l = list(range(100_000))
+        queries = list(range(5000, 5100))
+        self.assertEqual(search_many(l, queries, key=key), queries)
+        many = calls
+        calls = 0
+        for x in queries:
+            bisect_left(l, x, key=key)
+        self.assertLess(many, calls / 2)
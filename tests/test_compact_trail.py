@@ -0,0 +1,84 @@
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain, CompactMountain
+from trail import Trail, TrailSeries, TrailSplit, CompactTrail, CompactTrailSeries, CompactTrailSplit
+from draw_trails import Box, TrailBox, TrailSeriesBox
+from personality import TopWalker, BottomWalker, LazyWalker
+
+class TestCompactTrail(unittest.TestCase):
+
+    def load_example(self):
+        self.top_top = Mountain("top-top", 5, 3)
+        self.top_bot = Mountain("top-bot", 3, 5)
+        self.top_mid = Mountain("top-mid", 4, 7)
+        self.bot_one = Mountain("bot-one", 2, 5)
+        self.bot_two = Mountain("bot-two", 0, 0)
+        self.final   = Mountain("final", 4, 4)
+        self.trail = Trail(TrailSplit(
+            Trail(TrailSplit(
+                Trail(TrailSeries(self.top_top, Trail(None))),
+                Trail(TrailSeries(self.top_bot, Trail(None))),
+                Trail(TrailSeries(self.top_mid, Trail(None))),
+            )),
+            Trail(TrailSeries(self.bot_one, Trail(TrailSplit(
+                Trail(TrailSeries(self.bot_two, Trail(None))),
+                Trail(None),
+                Trail(None),
+            )))),
+            Trail(TrailSeries(self.final, Trail(None)))
+        ))
+
+    @number("12.1")
+    def test_compacted(self):
+        self.load_example()
+        compact = self.trail.compacted()
+        self.assertIs(type(compact), CompactTrail)
+        self.assertIs(type(compact.store), CompactTrailSplit)
+        self.assertIs(type(compact.store.path_follow.store), CompactTrailSeries)
+        self.assertIs(type(compact.store.path_follow.store.mountain), CompactMountain)
+        for node in (compact, compact.store, compact.store.path_follow.store, compact.store.path_follow.store.mountain):
+            self.assertFalse(hasattr(node, "__dict__"))
+            self.assertRaises(AttributeError, lambda: setattr(node, "trail_box", Box()))
+
+        for personality in (TopWalker, BottomWalker, LazyWalker):
+            expected = personality()
+            actual = personality()
+            self.trail.follow_path(expected)
+            compact.follow_path(actual)
+            self.assertListEqual([m.name for m in actual.mountains], [m.name for m in expected.mountains])
+        self.assertEqual(compact.aggregates, self.trail.aggregates)
+        self.assertEqual(len(compact.length_k_paths(3)), 3)
+
+        edited = compact.edit(("path_follow",), "add_mountain_after", Mountain("new", 1, 1))
+        self.assertEqual(edited.aggregates.mountains, 7)
+        # Edits build compact nodes too, so the trail stays compact throughout.
+        for path, method in [(("path_follow",), "add_empty_branch_after"), ((), "add_mountain_before"), (("path_top",), "add_empty_branch_before")]:
+            edited = compact.edit(path, method, *([Mountain("new", 1, 1)] if method == "add_mountain_before" else []))
+            stack = [edited]
+            while stack:
+                node = stack.pop()
+                self.assertFalse(hasattr(node, "__dict__"))
+                store = node.store
+                if store is not None:
+                    self.assertFalse(hasattr(store, "__dict__"))
+                    stack.extend([store.following] if isinstance(store, CompactTrailSeries) else [store.path_top, store.path_bottom, store.path_follow])
+
+    @number("12.2")
+    def test_same_api(self):
+        mountain = Mountain("m", 1, 2)
+        compact_mountain = CompactMountain("m", 1, 2)
+        self.assertEqual((mountain.name, mountain.difficulty_level, mountain.length), ("m", 1, 2))
+        self.assertEqual((compact_mountain.name, compact_mountain.difficulty_level, compact_mountain.length), ("m", 1, 2))
+        self.assertEqual(CompactTrail().store, None)
+        series = CompactTrailSeries(compact_mountain, following=CompactTrail(None))
+        self.assertIsInstance(series.add_empty_branch_after().following.store, CompactTrailSplit)
+
+        # The regular classes, and the draw_trails subclasses, can still be given boxes.
+        trail = Trail(None)
+        trail.trail_box = Box(1, 2, 3, 4)
+        self.assertEqual(trail.trail_box.w, 3)
+        self.assertEqual(TrailBox(None).trail_box, Box())
+        series_box = TrailSeriesBox(mountain, Trail(None))
+        series_box.mountain_box = Box(0, 0, 1, 1)
+        self.assertIn((0.5, 0.5), series_box.mountain_box)
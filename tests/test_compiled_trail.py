@@ -0,0 +1,100 @@
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+from personality import WalkerPersonality, TopWalker, BottomWalker, LazyWalker
+
+class TestCompiledTrail(unittest.TestCase):
+
+    def load_example(self):
+        self.top_top = Mountain("top-top", 5, 3)
+        self.top_bot = Mountain("top-bot", 3, 5)
+        self.top_mid = Mountain("top-mid", 4, 7)
+        self.bot_one = Mountain("bot-one", 2, 5)
+        self.bot_two = Mountain("bot-two", 0, 0)
+        self.final   = Mountain("final", 4, 4)
+        self.trail = Trail(TrailSplit(
+            Trail(TrailSplit(
+                Trail(TrailSeries(self.top_top, Trail(None))),
+                Trail(TrailSeries(self.top_bot, Trail(None))),
+                Trail(TrailSeries(self.top_mid, Trail(None))),
+            )),
+            Trail(TrailSeries(self.bot_one, Trail(TrailSplit(
+                Trail(TrailSeries(self.bot_two, Trail(None))),
+                Trail(None),
+                Trail(None),
+            )))),
+            Trail(TrailSeries(self.final, Trail(None)))
+        ))
+
+    @number("8.1")
+    def test_matches_follow_path(self):
+        self.load_example()
+        compiled = self.trail.compile()
+        self.assertEqual(len(compiled), 9)
+        for personality in (TopWalker, BottomWalker, LazyWalker):
+            expected = personality()
+            actual = personality()
+            self.trail.follow_path(expected)
+            compiled.follow_path(actual)
+            self.assertListEqual(actual.mountains, expected.mountains)
+
+        # Compiled trails can be walked again and again.
+        lw = LazyWalker()
+        compiled.follow_path(lw)
+        self.assertListEqual(lw.mountains, [self.top_bot, self.top_mid, self.final])
+
+    @number("8.2")
+    def test_custom_walk(self):
+        class CustomWalker(WalkerPersonality):
+            def __init__(self) -> None:
+                super().__init__()
+                self.branches = []
+
+            def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+                self.branches.append((top_branch, bottom_branch))
+                return len(self.branches) == 2
+
+        self.load_example()
+        cw = CustomWalker()
+        self.trail.compile().follow_path(cw)
+
+        self.assertListEqual(cw.mountains, [self.bot_one, self.bot_two, self.final])
+        # The original branches are handed to the personality.
+        self.assertIs(cw.branches[0][0], self.trail.store.path_top)
+        self.assertIs(cw.branches[0][1], self.trail.store.path_bottom)
+
+    @number("8.3")
+    def test_empty(self):
+        tw = TopWalker()
+        Trail(None).compile().follow_path(tw)
+        self.assertListEqual(tw.mountains, [])
+        tw = TopWalker()
+        Trail(TrailSplit(Trail(None), Trail(None), Trail(None))).compile().follow_path(tw)
+        self.assertListEqual(tw.mountains, [])
+
+    @number("8.4")
+    def test_follow_paths(self):
+        class AlternatingWalker(WalkerPersonality):
+            def __init__(self) -> None:
+                super().__init__()
+                self.count = 0
+
+            def add_mountain(self, mountain: Mountain) -> None:
+                self.mountains.append(mountain.name)
+
+            def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+                self.count += 1
+                return self.count % 2 == 0
+
+        self.load_example()
+        kinds = [TopWalker, BottomWalker, LazyWalker, AlternatingWalker]
+        walkers = [kinds[i % len(kinds)]() for i in range(40)]
+        self.trail.follow_paths(walkers)
+
+        for walker in walkers:
+            expected = type(walker)()
+            self.trail.follow_path(expected)
+            self.assertListEqual(walker.mountains, expected.mountains)
+        self.assertListEqual(walkers[3].mountains, ["bot-one", "bot-two", "final"])
@@ -0,0 +1,136 @@
+import io
+import json
+import tempfile
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+from serialize import serialize, deserialize, load, LazyJSONReader, load_lazy
+
+class TestDeserialize(unittest.TestCase):
+
+    def load_example(self):
+        self.trail = Trail(TrailSplit(
+            Trail(TrailSeries(Mountain("top \"quoted\"", 5, 3), Trail(None))),
+            Trail(TrailSeries(Mountain("bot\\slash", 3, 5), Trail(TrailSplit(
+                Trail(None),
+                Trail(TrailSeries(Mountain("bot-bot", -2, 1.5e2), Trail(None))),
+                Trail(None),
+            )))),
+            Trail(TrailSeries(Mountain("final", 4, 4), Trail(None)))
+        ))
+
+    @number("14.1")
+    def test_load_matches_deserialize(self):
+        self.load_example()
+        text = serialize(self.trail)
+        expected = serialize(deserialize(json.loads(text)))
+        # Small chunks cut strings and numbers in half.
+        for chunk_size in (1, 3, 7, 4096):
+            self.assertEqual(serialize(load(io.StringIO(text), chunk_size)), expected)
+
+    @number("14.2")
+    def test_load_basic_store(self):
+        with open("stores/basic.json") as f:
+            text = f.read()
+        self.assertEqual(load(io.StringIO(text), 64), deserialize(json.loads(text)))
+
+    @number("14.3")
+    def test_deep_trail(self):
+        depth = 100_000
+        text = '{"store": null}'
+        text = '{"store": {"mountain": {"name": "m", "difficulty_level": 1, "length": 1}, "following": ' * depth + text + "}}" * depth
+        # json.loads itself recurses, so the decoded form is built by hand.
+        obj = {"store": None}
+        for _ in range(depth):
+            obj = {"store": {"mountain": {"name": "m", "difficulty_level": 1, "length": 1}, "following": obj}}
+        for trail in (load(io.StringIO(text)), deserialize(obj)):
+            count = 0
+            while trail.store is not None:
+                count += 1
+                trail = trail.store.following
+            self.assertEqual(count, depth)
+
+    @number("14.4")
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            load(io.StringIO('{"store": nul}'))
+        with self.assertRaises(ValueError):
+            load(io.StringIO('{"store": '))
+        with self.assertRaises(ValueError):
+            load(io.StringIO('}'))
+        with self.assertRaises(ValueError):
+            load(io.StringIO('{"store": null}}'))
+
+    @number("14.9")
+    def test_load_compact_separators(self):
+        with open("stores/basic.json") as f:
+            obj = json.load(f)
+        text = json.dumps(obj, separators=(",", ":"))
+        for chunk_size in (1, 5, 4096):
+            self.assertEqual(load(io.StringIO(text), chunk_size), deserialize(obj))
+
+    @number("14.5")
+    def test_load_lazy(self):
+        self.load_example()
+        found = []
+        loaded = LazyJSONReader(serialize(self.trail).encode("utf-8"), found.append).trail()
+        self.assertFalse(loaded.loaded)
+        bottom = loaded.store.path_bottom
+        self.assertFalse(bottom.loaded)
+        self.assertEqual(found, [])
+        self.assertEqual(bottom.store.mountain.name, "bot\\slash")
+        self.assertEqual(found, [Mountain("bot\\slash", 3, 5)])
+        self.assertEqual(serialize(loaded), serialize(self.trail))
+        self.assertEqual(len(found), 4)
+
+    @number("14.6")
+    def test_load_lazy_file(self):
+        # basic.json has its fields in a different order to dump.
+        with open("stores/basic.json", "rb") as f:
+            loaded = load_lazy(f)
+        with open("stores/basic.json") as f:
+            self.assertEqual(serialize(loaded), serialize(load(f)))
+
+    @number("14.7")
+    def test_load_lazy_is_lazy(self):
+        # Only the parts of the file that are visited are parsed.
+        text = b'{"store": {"mountain": {"name": "a", "difficulty_level": 1, "length": 2}, "following": not json'
+        loaded = LazyJSONReader(text).trail()
+        self.assertEqual(loaded.store.mountain, Mountain("a", 1, 2))
+        with self.assertRaises(ValueError):
+            loaded.store.following.store
+        with tempfile.TemporaryFile() as f:
+            with self.assertRaisesRegex(ValueError, "empty"):
+                load_lazy(f)
+
+    @number("14.8")
+    def test_load_lazy_deep(self):
+        depth = 100_000
+        text = '{"store": {"mountain": {"name": "m", "difficulty_level": 1, "length": 1}, "following": ' * depth + '{"store": null}' + "}}" * depth
+        with tempfile.TemporaryFile() as f:
+            f.write(text.encode("utf-8"))
+            f.flush()
+            trail = load_lazy(f)
+        count = 0
+        while trail.store is not None:
+            count += 1
+            trail = trail.store.following
+        self.assertEqual(count, depth)
+
+    @number("14.10")
+    def test_load_lazy_nested_splits(self):
+        # Each split skips over its path_top, so without remembering object ends this is quadratic.
+        depth = 5000
+        text = '{"store": null}'
+        for _ in range(depth):
+            text = '{"store": {"path_top": %s, "path_bottom": {"store": null}, "path_follow": {"store": null}}}' % text
+        reader = LazyJSONReader(text.encode("utf-8"))
+        trail = reader.trail()
+        count = 0
+        while trail.store is not None:
+            count += 1
+            trail = trail.store.path_top
+        self.assertEqual(count, depth)
+        self.assertEqual(reader.skip(0), len(text))
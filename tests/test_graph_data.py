@@ -0,0 +1,41 @@
+import random
+import unittest
+import numpy as np
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from mountain_manager import MountainManager
+from graph_data import graph_data, get_col
+from rank_history import RankHistory
+
+class TestGraphData(unittest.TestCase):
+
+    @number("21.1")
+    def test_views_of_rank_history(self):
+        random.seed(21)
+        manager = MountainManager()
+        for i in range(400):
+            # Few lengths and names, so some mountains have equal keys.
+            manager.add_mountain(Mountain(f"m{random.randint(0, 200)}", random.randint(1, 15), random.randint(1, 50)))
+        history = RankHistory.of_groups(manager.group_by_difficulty())
+        data = graph_data(manager)
+        self.assertEqual([name for _, _, name, _ in data], [mountain.name for mountain in history.mountains])
+        self.assertEqual([start_index for _, start_index, _, _ in data], history.added_at)
+        self.assertEqual([color for color, _, _, _ in data], [get_col(i, len(data)) for i in range(len(data))])
+        self.assertEqual([p.tolist() for _, _, _, p in data], history.positions)
+
+        # Every entry's positions are consecutive views into one integer array.
+        base = data[0][3].base
+        self.assertIsNotNone(base)
+        end = 0
+        for _, _, _, positions in data:
+            self.assertIs(positions.base, base)
+            self.assertEqual(positions.dtype, np.intp)
+            self.assertEqual(positions.ndim, 1)
+            self.assertEqual(positions.ctypes.data - base.ctypes.data, end * base.itemsize)
+            end += len(positions)
+        self.assertEqual(end, len(base))
+
+    @number("21.2")
+    def test_empty(self):
+        self.assertEqual(graph_data(MountainManager()), [])
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+from trail_history import TrailHistory
+from serialize import serialize, dump
+from journal import TrailJournal
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "trail.json")
+        self.trail = Trail(TrailSeries(Mountain("a", 5, 5), Trail(TrailSplit(
+            Trail(TrailSeries(Mountain("b", 5, 5), Trail(None))),
+            Trail(None),
+            Trail(TrailSeries(Mountain("c", 5, 5), Trail(None))),
+        ))))
+        with open(self.path, "w") as f:
+            dump(self.trail, f)
+
+    def open(self, compact_every: int = 1000) -> tuple[TrailJournal, TrailHistory]:
+        journal = TrailJournal(self.path, compact_every)
+        self.addCleanup(journal.close)
+        history = TrailHistory(journal.load())
+        journal.attach(history)
+        return journal, history
+
+    def edit(self, history: TrailHistory) -> None:
+        history.apply(("following", "path_bottom"), "add_mountain_before", Mountain("d", 1, 2))
+        history.edit_mountain(("following", "path_bottom"), "e", 3, 4)
+        history.apply(("following", "path_top"), "add_empty_branch_after")
+        history.apply(("following", "path_top"), "remove_mountain")
+        history.undo()
+
+    @number("16.1")
+    def test_replay(self):
+        journal, history = self.open()
+        self.edit(history)
+        with open(self.path) as f:
+            snapshot = f.read()
+        journal.close()
+
+        # The snapshot is untouched, the journal holds the edits.
+        self.assertEqual(snapshot, serialize(self.trail))
+        _, recovered = self.open()
+        self.assertEqual(serialize(recovered.current), serialize(history.current))
+        self.assertEqual(recovered.current.store.following.store.path_bottom.store.mountain, Mountain("e", 3, 4))
+        # The history is recovered too.
+        self.assertTrue(recovered.can_redo())
+        recovered.redo()
+        self.assertEqual(serialize(recovered.current), serialize(history.redo()))
+
+    @number("16.2")
+    def test_compaction(self):
+        journal, history = self.open(compact_every=3)
+        self.edit(history)
+        self.assertLess(journal.records, 3)
+        with open(self.path) as f:
+            self.assertNotEqual(f.read(), serialize(self.trail))
+        journal.close()
+        _, recovered = self.open()
+        self.assertEqual(serialize(recovered.current), serialize(history.current))
+        self.assertEqual(serialize(recovered.redo()), serialize(history.redo()))
+
+    @number("16.3")
+    def test_undo_past_snapshot(self):
+        journal, history = self.open()
+        self.edit(history)
+        journal.compact()
+        history.undo()
+        history.undo()
+        journal.close()
+        _, recovered = self.open()
+        self.assertEqual(serialize(recovered.current), serialize(history.current))
+        self.assertEqual(serialize(recovered.redo()), serialize(history.redo()))
+
+    @number("16.4")
+    def test_torn_and_stale_journal(self):
+        journal, history = self.open()
+        self.edit(history)
+        journal.close()
+        # A crash part way through appending a record.
+        with open(journal.journal_path, "a") as f:
+            f.write('["edit",["follo')
+        _, recovered = self.open()
+        self.assertEqual(serialize(recovered.current), serialize(history.current))
+        recovered.journal.close()
+
+        # A journal for an older snapshot is ignored.
+        with open(self.path, "w") as f:
+            dump(Trail(None), f)
+        os.utime(self.path, ns=(0, 0))
+        _, recovered = self.open()
+        self.assertIsNone(recovered.current.store)
+        self.assertFalse(recovered.can_undo())
+
+    @number("16.5")
+    def test_compact_to_new_path(self):
+        journal, history = self.open()
+        self.edit(history)
+        old_journal = journal.journal_path
+        new_path = self.path[:-len(".json")] + "-copy.json"
+        journal.compact(new_path)
+        journal.close()
+        self.assertFalse(os.path.exists(old_journal))
+        self.assertTrue(os.path.exists(new_path + ".journal"))
+
+        # The old store is reopened as it was, without the edits saved to the new one.
+        _, reopened = self.open()
+        self.assertEqual(serialize(reopened.current), serialize(self.trail))
+        self.assertFalse(reopened.can_undo())
+        with open(new_path) as f:
+            self.assertEqual(f.read(), serialize(history.current))
@@ -0,0 +1,109 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from algorithms.mergesort import mergesort, bottom_up_mergesort, adaptive_mergesort, parallel_mergesort, kway_merge
+from algorithms.external_sort import external_sort
+
+class TestMergesort(unittest.TestCase):
+
+    def random_lists(self):
+        rng = random.Random(17)
+        for n in [0, 1, 2, 31, 32, 33, 64, 65, 1000]:
+            yield [rng.randint(0, n // 3 + 1) for _ in range(n)]
+
+    @number("17.1")
+    def test_bottom_up(self):
+        for l in self.random_lists():
+            original = l.copy()
+            self.assertEqual(bottom_up_mergesort(l), sorted(l))
+            self.assertEqual(bottom_up_mergesort(l), mergesort(l))
+            # The input is left alone.
+            self.assertEqual(l, original)
+        self.assertEqual(bottom_up_mergesort(list(range(100, 0, -1))), list(range(1, 101)))
+
+    @number("17.2")
+    def test_bottom_up_key(self):
+        rng = random.Random(3)
+        mountains = [Mountain(f"m{i}", rng.randint(0, 5), rng.randint(0, 5)) for i in range(500)]
+        calls = []
+        def key(mountain):
+            calls.append(mountain)
+            return mountain.difficulty_level
+        res = bottom_up_mergesort(mountains, key=key)
+        # Stable, and the key is only called once per mountain.
+        self.assertEqual(res, sorted(mountains, key=lambda m: m.difficulty_level))
+        self.assertEqual(len(calls), len(mountains))
+        for a, b in zip(res, sorted(mountains, key=lambda m: m.difficulty_level)):
+            self.assertIs(a, b)
+
+    @number("17.3")
+    def test_adaptive(self):
+        for l in self.random_lists():
+            self.assertEqual(adaptive_mergesort(l), sorted(l))
+            # Nearly sorted, and reversed.
+            nearly = sorted(l) + l[:10]
+            self.assertEqual(adaptive_mergesort(nearly), sorted(nearly))
+            self.assertEqual(adaptive_mergesort(nearly[::-1]), sorted(nearly))
+
+    @number("17.4")
+    def test_adaptive_stable(self):
+        rng = random.Random(5)
+        mountains = [Mountain(f"m{i}", rng.randint(0, 5), 0) for i in range(2000)]
+        for l in (mountains, sorted(mountains, key=lambda m: -m.difficulty_level)):
+            res = adaptive_mergesort(l, key=lambda m: m.difficulty_level)
+            for a, b in zip(res, sorted(l, key=lambda m: m.difficulty_level)):
+                self.assertIs(a, b)
+
+    @number("17.5")
+    def test_adaptive_sorted_is_linear(self):
+        class Counted:
+            comparisons = 0
+            def __init__(self, value):
+                self.value = value
+            def __lt__(self, other):
+                Counted.comparisons += 1
+                return self.value < other.value
+        n = 10_000
+        adaptive_mergesort([Counted(i) for i in range(n)])
+        self.assertLess(Counted.comparisons, 2 * n)
+        Counted.comparisons = 0
+        adaptive_mergesort([Counted(i) for i in range(n)] + [Counted(n // 2)])
+        self.assertLess(Counted.comparisons, 2 * n)
+
+    @number("17.6")
+    def test_parallel(self):
+        rng = random.Random(11)
+        mountains = [Mountain(f"m{i}", rng.randint(0, 5), 0) for i in range(3001)]
+        expected = sorted(mountains, key=lambda m: m.difficulty_level)
+        # Keys need not be picklable, and the mountains keep their identity.
+        res = parallel_mergesort(mountains, key=lambda m: m.difficulty_level, workers=3, cutoff=100)
+        for a, b in zip(res, expected):
+            self.assertIs(a, b)
+        for l in self.random_lists():
+            self.assertEqual(parallel_mergesort(l, workers=2, cutoff=10), sorted(l))
+        # Below the cutoff nothing is sent to a worker.
+        self.assertEqual(parallel_mergesort([3, 1, 2], workers=2), [1, 2, 3])
+
+    @number("17.7")
+    def test_kway_merge(self):
+        runs = [[1, 4, 7], [], [2, 2, 9], [0, 10]]
+        merged = kway_merge(iter(run) for run in runs)
+        self.assertEqual(next(merged), 0)
+        self.assertEqual(list(merged), [1, 2, 2, 4, 7, 9, 10])
+        self.assertEqual(list(kway_merge([])), [])
+        # Stable across the iterables.
+        a, b, c = Mountain("a", 1, 1), Mountain("b", 1, 1), Mountain("c", 0, 1)
+        res = list(kway_merge([[a], [c, b]], key=lambda m: m.difficulty_level))
+        self.assertEqual([m.name for m in res], ["c", "a", "b"])
+
+    @number("17.8")
+    def test_external_sort(self):
+        rng = random.Random(2)
+        mountains = [Mountain(f"m{i}", rng.randint(0, 9), rng.randint(0, 5)) for i in range(2000)]
+        expected = sorted(mountains, key=lambda m: m.length)
+        for run_size, fan_in in [(10, 3), (100, 2), (1999, 64), (2000, 2), (5000, 2)]:
+            res = external_sort(iter(mountains), key=lambda m: m.length, run_size=run_size, fan_in=fan_in)
+            self.assertEqual(list(res), expected)
+        self.assertEqual(list(external_sort([])), [])
@@ -56,3 +56,11 @@ class TestInfiniteHash(unittest.TestCase):
         self.assertEqual(len(res), 4)
 
         self.assertEqual(make_set(res[3]), make_set([m10]))
+
+    @number("5.2")
+    def test_group_by_difficulty_order(self):
+        mm = MountainManager()
+        for difficulty in [10, 2, 1, 30, 9]:
+            mm.add_mountain(Mountain(f"m{difficulty}", difficulty, 1))
+        res = mm.group_by_difficulty()
+        self.assertEqual([group[0].difficulty_level for group in res], [1, 2, 9, 10, 30])
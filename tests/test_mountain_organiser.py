@@ -2,6 +2,8 @@ import unittest
 from ed_utils.decorators import number
 
 from mountain import Mountain
+from copy import copy
+from mountain_manager import MountainManager
 from mountain_organiser import MountainOrganiser
 
 class TestInfiniteHash(unittest.TestCase):
@@ -31,3 +33,32 @@ class TestInfiniteHash(unittest.TestCase):
         self.assertEqual([mo.cur_position(m) for m in [m1, m2, m3, m4, m5, m6, m7, m8, m9]], [1, 8, 3, 0, 4, 2, 6, 7, 5])
 
         self.assertRaises(KeyError, lambda: mo.cur_position(m10))
+
+    @number("6.2")
+    def test_remove_and_update(self):
+        m1 = Mountain("m1", 2, 2)
+        m2 = Mountain("m2", 2, 9)
+        m3 = Mountain("m3", 3, 6)
+        m4 = Mountain("m4", 3, 1)
+
+        mo = MountainOrganiser()
+        mo.add_mountains([m1, m2, m3, m4])
+        mo.remove_mountain(m3)
+        self.assertEqual([mo.cur_position(m) for m in [m1, m2, m4]], [1, 2, 0])
+        self.assertRaises(KeyError, lambda: mo.cur_position(m3))
+        self.assertRaises(KeyError, lambda: mo.remove_mountain(m3))
+
+        # Edited in place, and kept in sync through the manager.
+        mm = MountainManager()
+        for m in [m1, m2, m4]:
+            mm.add_mountain(m)
+        mm.add_listener(mo.update_mountain)
+        old = copy(m2)
+        m2.length = 0
+        mm.edit_mountain(old, m2)
+        self.assertEqual([mo.cur_position(m) for m in [m1, m2, m4]], [2, 0, 1])
+        old = copy(m4)
+        m4.name = "m0"
+        m4.length = 5
+        mm.edit_mountain(old, m4)
+        self.assertEqual(mo.list_of_mountains, [m2, m1, m4])
@@ -0,0 +1,77 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from mountain_manager import MountainManager
+from mountain_organiser import MountainOrganiser
+from rank_history import RankHistory
+
+class TestRankHistory(unittest.TestCase):
+
+    def replay(self, groups):
+        """The positions cur_position gives after each group, for every mountain added so far."""
+        organiser = MountainOrganiser()
+        added = []
+        positions = []
+        for group in groups:
+            organiser.add_mountains(group)
+            added.extend(group)
+            positions.extend([] for _ in group)
+            for i, mountain in enumerate(added):
+                positions[i].append(organiser.cur_position(mountain))
+        return added, positions
+
+    @number("20.1")
+    def test_example(self):
+        m1 = Mountain("m1", 2, 2)
+        m2 = Mountain("m2", 2, 9)
+        m3 = Mountain("m3", 3, 6)
+        m4 = Mountain("m4", 3, 1)
+        m5 = Mountain("m5", 4, 6)
+
+        history = RankHistory.of_groups([[m1, m2], [m4, m3], [m5]])
+        self.assertEqual(history.mountains, [m1, m2, m4, m3, m5])
+        self.assertEqual(history.added_at, [0, 0, 1, 1, 2])
+        self.assertEqual(history.positions, [[0, 1, 1], [1, 3, 4], [0, 0], [2, 2], [3]])
+        self.assertEqual(history.steps, 3)
+
+    @number("20.2")
+    def test_matches_organiser(self):
+        random.seed(20)
+        manager = MountainManager()
+        for i in range(300):
+            # Few lengths and names, so some mountains have equal keys.
+            manager.add_mountain(Mountain(f"m{random.randint(0, 150)}", random.randint(1, 12), random.randint(1, 40)))
+        groups = manager.group_by_difficulty()
+        history = RankHistory.of_groups(groups)
+        added, positions = self.replay(groups)
+        self.assertEqual(history.mountains, added)
+        self.assertEqual(history.positions, positions)
+        self.assertEqual(
+            history.added_at,
+            [len(groups) - len(p) for p in positions],
+        )
+
+    @number("20.3")
+    def test_empty(self):
+        history = RankHistory.of_groups([])
+        self.assertEqual(history.mountains, [])
+        self.assertEqual(history.positions, [])
+        history = RankHistory.of_groups([[]])
+        self.assertEqual(history.steps, 1)
+        with self.assertRaises(IndexError):
+            history.add_next_group()
+
+    @number("20.4")
+    def test_step_by_step(self):
+        m1 = Mountain("m1", 2, 2)
+        m2 = Mountain("m2", 3, 1)
+        m3 = Mountain("m1", 4, 2)
+        history = RankHistory([[m1], [m2, m3]])
+        self.assertEqual(history.positions, [[], [], []])
+        history.add_next_group()
+        self.assertEqual(history.positions, [[0], [], []])
+        history.add_next_group()
+        # m3 has the same key as m1, so shares its position.
+        self.assertEqual(history.positions, [[0, 1], [0], [1]])
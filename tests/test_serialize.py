@@ -0,0 +1,70 @@
+import io
+import json
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+from serialize import EnhancedJSONEncoder, serialize, dump, deserialize, load, content_hash, file_hash
+
+class TestSerialize(unittest.TestCase):
+
+    def load_example(self):
+        self.trail = Trail(TrailSplit(
+            Trail(TrailSplit(
+                Trail(TrailSeries(Mountain("top-top", 5, 3), Trail(None))),
+                Trail(TrailSeries(Mountain("top-bot", 3, 5), Trail(None))),
+                Trail(TrailSeries(Mountain("top-mid", 4, 7), Trail(None))),
+            )),
+            Trail(TrailSeries(Mountain("bot-one", 2, 5), Trail(TrailSplit(
+                Trail(TrailSeries(Mountain("bot-\"two\"", 0, 0), Trail(None))),
+                Trail(None),
+                Trail(None),
+            )))),
+            Trail(TrailSeries(Mountain("final", 4, 4), Trail(None)))
+        ))
+
+    @number("13.1")
+    def test_dump(self):
+        self.load_example()
+        # Injected boxes are never written.
+        self.trail.trail_box = object()
+        self.trail.store.path_follow.store.mountain_box = object()
+        expected = json.dumps(self.trail, cls=EnhancedJSONEncoder)
+        f = io.StringIO()
+        dump(self.trail, f, buffer_size=3)
+        self.assertEqual(f.getvalue(), expected)
+        self.assertEqual(serialize(self.trail), expected)
+
+    @number("13.2")
+    def test_dump_deep(self):
+        depth = 10000
+        trail = Trail(None)
+        for i in range(depth):
+            trail = Trail(TrailSeries(Mountain(f"m{i}", 1, 1), trail))
+        trail = Trail(TrailSplit(trail, Trail(None), trail))
+        text = serialize(trail)
+        self.assertEqual(text.count('"mountain"'), 2 * depth)
+        self.assertTrue(text.endswith('{"store": null}' + "}" * (2 * depth + 2)))
+
+    @number("13.3")
+    def test_round_trip(self):
+        self.load_example()
+        text = serialize(self.trail)
+        self.assertEqual(deserialize(json.loads(text)), self.trail)
+        self.assertEqual(load(io.StringIO(text)), self.trail)
+        # Branches keep their place however many times the trail is saved and loaded.
+        trail = self.trail
+        for _ in range(3):
+            trail = load(io.StringIO(serialize(trail)))
+        self.assertEqual(trail.store.path_top.store.path_top.store.mountain.name, "top-top")
+        self.assertEqual(serialize(trail), text)
+
+    @number("13.4")
+    def test_content_hash(self):
+        self.load_example()
+        digest = content_hash(self.trail)
+        self.assertEqual(content_hash(load(io.StringIO(serialize(self.trail)))), digest)
+        self.assertEqual(file_hash(io.BytesIO(serialize(self.trail).encode("utf-8")), 7), digest)
+        self.trail.store.path_top, self.trail.store.path_bottom = self.trail.store.path_bottom, self.trail.store.path_top
+        self.assertNotEqual(content_hash(self.trail), digest)
@@ -0,0 +1,116 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from data_structures.fenwick_tree import FenwickTree
+from data_structures.sorted_block_list import SortedBlockList
+from mountain_organiser import MountainOrganiser
+
+class TestSortedBlockList(unittest.TestCase):
+
+    @number("19.1")
+    def test_fenwick_tree(self):
+        values = [3, 0, 2, 5, 1]
+        tree = FenwickTree(values)
+        self.assertEqual(len(tree), 5)
+        self.assertEqual([tree.prefix_sum(end) for end in range(6)], [0, 3, 3, 5, 10, 11])
+        tree.add(1, 4)
+        self.assertEqual(tree.prefix_sum(2), 7)
+        # Values are now [3, 4, 2, 5, 1]
+        self.assertEqual([tree.search(target) for target in (0, 2, 3, 6, 7, 10, 14)], [(0, 0), (0, 2), (1, 0), (1, 3), (2, 0), (3, 1), (4, 0)])
+
+    @number("19.2")
+    def test_add_and_positions(self):
+        rng = random.Random(4)
+        blocks = SortedBlockList(load=4)
+        expected = []
+        for _ in range(500):
+            item = rng.randint(0, 100)
+            position = blocks.add(item)
+            expected.insert(position, item)
+            self.assertEqual(expected, sorted(expected))
+        self.assertEqual(list(blocks), expected)
+        self.assertEqual(len(blocks), 500)
+        self.assertGreater(len(blocks.blocks), 10)
+        self.assertEqual([blocks[i] for i in range(500)], expected)
+        self.assertEqual(blocks[-1], expected[-1])
+        self.assertRaises(IndexError, lambda: blocks[500])
+        for value in range(-1, 102):
+            self.assertEqual(blocks.bisect_left(value), sum(x < value for x in expected))
+            self.assertEqual(blocks.bisect_right(value), sum(x <= value for x in expected))
+            if value in expected:
+                self.assertEqual(blocks.find(value), expected.index(value))
+            else:
+                self.assertRaises(KeyError, lambda: blocks.find(value))
+
+    @number("19.3")
+    def test_key(self):
+        mountains = [Mountain(f"m{i}", 0, i % 7) for i in range(50)]
+        blocks = SortedBlockList(mountains[:20], key=lambda m: m.length, load=2)
+        for mountain in mountains[20:]:
+            blocks.add(mountain)
+        # Equal keys keep the order they were added in.
+        self.assertEqual(list(blocks), sorted(mountains, key=lambda m: m.length))
+
+    @number("19.4")
+    def test_organiser_container(self):
+        organiser = MountainOrganiser(SortedBlockList(key=MountainOrganiser.order, load=2))
+        mountains = [Mountain(f"m{i}", 0, (i * 37) % 11) for i in range(40)]
+        organiser.add_mountains(mountains)
+        expected = sorted(mountains, key=MountainOrganiser.order)
+        self.assertEqual(organiser.list_of_mountains, expected)
+        self.assertEqual([organiser.cur_position(m) for m in expected], list(range(40)))
+
+    @number("19.5")
+    def test_update(self):
+        rng = random.Random(6)
+        mountains = [Mountain(f"m{i}", 0, rng.randint(0, 30)) for i in range(600)]
+        blocks = SortedBlockList(key=lambda m: m.length, load=4)
+        # Batches both large (merged) and small (added one by one) compared to the list.
+        for start, end in [(0, 300), (300, 310), (310, 320), (320, 600)]:
+            blocks.update(mountains[start:end])
+            self.assertEqual(list(blocks), sorted(mountains[:end], key=lambda m: m.length))
+            self.assertEqual(len(blocks), end)
+        self.assertEqual(blocks.find(5), sorted(m.length for m in mountains).index(5))
+        blocks.add(Mountain("last", 0, 31))
+        self.assertEqual(blocks[-1].name, "last")
+
+    @number("19.6")
+    def test_remove(self):
+        rng = random.Random(9)
+        blocks = SortedBlockList(load=2)
+        expected = []
+        for _ in range(300):
+            if expected and rng.random() < 0.4:
+                value = rng.choice(expected)
+                self.assertEqual(blocks.remove(value), value)
+                expected.remove(value)
+            else:
+                value = rng.randint(0, 50)
+                blocks.add(value)
+                expected.append(value)
+                expected.sort()
+            self.assertEqual(list(blocks), expected)
+            self.assertEqual(len(blocks), len(expected))
+            if expected:
+                index = rng.randrange(len(expected))
+                self.assertEqual(blocks[index], expected[index])
+                self.assertEqual(blocks.find(expected[index]), expected.index(expected[index]))
+        self.assertRaises(KeyError, lambda: blocks.remove(51))
+
+    @number("19.7")
+    def test_order_statistics(self):
+        organiser = MountainOrganiser(SortedBlockList(key=MountainOrganiser.order, load=2))
+        mountains = [Mountain(f"m{i}", 0, (i * 13) % 9) for i in range(30)]
+        organiser.add_mountains(mountains)
+        expected = sorted(mountains, key=MountainOrganiser.order)
+        for k, mountain in enumerate(expected):
+            self.assertIs(organiser.kth_mountain(k), mountain)
+            self.assertEqual(organiser.cur_position(mountain), k)
+        for length in range(-1, 11):
+            self.assertEqual(organiser.count_shorter_than(length), sum(m.length < length for m in mountains))
+        self.assertRaises(IndexError, lambda: organiser.kth_mountain(30))
+        with self.assertRaises(KeyError) as context:
+            organiser.cur_position(Mountain("missing", 0, 4))
+        self.assertIn("missing", str(context.exception))
@@ -0,0 +1,122 @@
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit, TrailAggregates, invalidate_caches
+from personality import ForesightWalker
+from draw_trails import TrailDraw
+
+class TestTrailAggregates(unittest.TestCase):
+
+    def load_example(self):
+        self.top_top = Mountain("top-top", 5, 3)
+        self.top_bot = Mountain("top-bot", 3, 5)
+        self.top_mid = Mountain("top-mid", 4, 7)
+        self.bot_one = Mountain("bot-one", 2, 5)
+        self.bot_two = Mountain("bot-two", 0, 0)
+        self.final   = Mountain("final", 4, 4)
+        self.trail = Trail(TrailSplit(
+            Trail(TrailSplit(
+                Trail(TrailSeries(self.top_top, Trail(None))),
+                Trail(TrailSeries(self.top_bot, Trail(None))),
+                Trail(TrailSeries(self.top_mid, Trail(None))),
+            )),
+            Trail(TrailSeries(self.bot_one, Trail(TrailSplit(
+                Trail(TrailSeries(self.bot_two, Trail(None))),
+                Trail(None),
+                Trail(None),
+            )))),
+            Trail(TrailSeries(self.final, Trail(None)))
+        ))
+
+    @number("9.1")
+    def test_example(self):
+        self.load_example()
+        self.assertEqual(self.trail.aggregates, TrailAggregates(
+            mountains=6,
+            min_length=9,
+            max_length=16,
+            total_difficulty=18,
+            max_difficulty=5,
+            min_cost=6,
+            max_cost=13,
+        ))
+        bottom = self.trail.store.path_bottom
+        self.assertEqual(bottom.aggregates, TrailAggregates(2, 5, 5, 2, 2, 2, 2))
+        self.assertEqual(Trail(None).aggregates, TrailAggregates())
+
+        fw = ForesightWalker()
+        self.trail.follow_path(fw)
+        self.assertListEqual(fw.mountains, [self.bot_one, self.bot_two, self.final])
+
+    @number("9.2")
+    def test_invalidation(self):
+        self.load_example()
+        self.assertEqual(self.trail.aggregates.mountains, 6)
+        heavy = Mountain("heavy", 9, 10)
+
+        # Changes made in place have to be invalidated, with the path to the changed sub-trail.
+        bottom = self.trail.store.path_bottom
+        bottom.store = bottom.store.add_mountain_after(heavy)
+        invalidate_caches(self.trail, ("path_bottom",))
+        self.assertEqual(self.trail.aggregates.mountains, 7)
+        self.assertEqual(self.trail.aggregates.max_difficulty, 9)
+        self.assertEqual(self.trail.aggregates.min_cost, 11)
+
+        bottom.store = bottom.store.remove_mountain()
+        invalidate_caches(self.trail, ("path_bottom",))
+        self.assertEqual(self.trail.aggregates.mountains, 6)
+        self.assertEqual(self.trail.aggregates.max_difficulty, 9)
+
+        top = self.trail.store.path_top
+        top.store = top.store.remove_branch()
+        invalidate_caches(self.trail, ("path_top",))
+        self.assertEqual(self.trail.aggregates.mountains, 4)
+        self.assertEqual(self.trail.aggregates.min_cost, 8)
+
+        self.trail.store.path_follow = self.trail.store.path_follow.add_mountain_before(heavy)
+        invalidate_caches(self.trail)
+        self.assertEqual(self.trail.aggregates.mountains, 5)
+        self.assertEqual(self.trail.aggregates.max_length, 24)
+
+    @number("9.4")
+    def test_in_place_edit_recomputes_every_ancestor(self):
+        self.load_example()
+        draw = TrailDraw(self.trail)
+        path = ("path_bottom", "following", "path_top")
+        ancestors = [self.trail.sub_trail(path[:i]) for i in range(len(path) + 1)]
+        for trail in ancestors:
+            trail.aggregates
+            draw.layout(trail)
+        off_path = self.trail.store.path_top
+        off_path_aggregates, off_path_layout = off_path.aggregates, draw.layout(off_path)
+
+        # Changed in place, deep in the trail, then invalidated with the documented call.
+        leaf = ancestors[-1]
+        leaf.store = leaf.store.add_mountain_after(Mountain("heavy", 9, 10))
+        invalidate_caches(self.trail, path)
+
+        for trail in ancestors:
+            # A copy has nothing cached, so it gives the values worked out from scratch.
+            fresh = trail.compacted()
+            self.assertEqual(trail.aggregates, fresh.aggregates)
+            self.assertEqual(draw.layout(trail), TrailDraw(fresh).layout())
+        self.assertEqual(self.trail.aggregates.mountains, 7)
+        self.assertEqual(self.trail.aggregates.max_difficulty, 9)
+        self.assertEqual(self.trail.store.path_bottom.aggregates.max_length, 15)
+        # Sub-trails off the path keep their cached values.
+        self.assertIs(off_path.aggregates, off_path_aggregates)
+        self.assertIs(draw.layout(off_path), off_path_layout)
+
+    @number("9.3")
+    def test_edits_keep_other_caches(self):
+        self.load_example()
+        old = self.trail.aggregates
+        top = self.trail.store.path_top
+        top_aggregates = top.aggregates
+        edited = self.trail.edit(("path_bottom",), "add_mountain_before", Mountain("heavy", 9, 10))
+        self.assertEqual(edited.aggregates.mountains, 7)
+        # The old version, and the sub-trails shared with it, kept their cached values.
+        self.assertIs(self.trail.aggregates, old)
+        self.assertIs(edited.store.path_top, top)
+        self.assertIs(top.aggregates, top_aggregates)
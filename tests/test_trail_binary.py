@@ -0,0 +1,96 @@
+import io
+import json
+import tempfile
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit, LazyTrail
+from serialize import serialize, deserialize
+from trail_binary import BinaryTrailReader, dump_binary, load_binary
+
+class TestTrailBinary(unittest.TestCase):
+
+    def load_example(self):
+        shared = Trail(TrailSeries(Mountain("shared", 1, 1), Trail(None)))
+        self.trail = Trail(TrailSplit(
+            Trail(TrailSeries(Mountain("top \"quoted\"", 5, 3), shared)),
+            Trail(TrailSeries(Mountain("bôt", 3, 5), Trail(TrailSplit(
+                Trail(None),
+                Trail(TrailSeries(Mountain("bot-bot", -2, 150), shared)),
+                Trail(None),
+            )))),
+            Trail(TrailSeries(Mountain("final", 4, 4), Trail(None)))
+        ))
+
+    def round_trip(self, trail: Trail) -> Trail:
+        f = tempfile.TemporaryFile()
+        self.addCleanup(f.close)
+        dump_binary(trail, f)
+        f.flush()
+        return load_binary(f)
+
+    @number("15.1")
+    def test_round_trip(self):
+        self.load_example()
+        self.assertEqual(serialize(self.round_trip(self.trail)), serialize(self.trail))
+        self.assertEqual(serialize(self.round_trip(Trail(None))), serialize(Trail(None)))
+
+    @number("15.2")
+    def test_basic_store(self):
+        with open("stores/basic.json") as f:
+            trail = deserialize(json.loads(f.read()))
+        self.assertEqual(serialize(self.round_trip(trail)), serialize(trail))
+
+    @number("15.3")
+    def test_lazy(self):
+        self.load_example()
+        loaded = self.round_trip(self.trail)
+        self.assertIsInstance(loaded, LazyTrail)
+        self.assertFalse(loaded.loaded)
+        top = loaded.store.path_top
+        self.assertTrue(loaded.loaded)
+        self.assertFalse(top.loaded)
+        self.assertFalse(loaded.store.path_follow.loaded)
+        self.assertEqual(top.store.mountain, Mountain("top \"quoted\"", 5, 3))
+        # Shared stores stay shared.
+        self.assertIs(top.store.following, loaded.store.path_bottom.store.following.store.path_bottom.store.following)
+
+    @number("15.4")
+    def test_smaller_than_json(self):
+        self.load_example()
+        buffer = io.BytesIO()
+        dump_binary(self.trail, buffer)
+        self.assertLess(len(buffer.getvalue()), len(serialize(self.trail).encode("utf-8")))
+        self.assertEqual(serialize(BinaryTrailReader(buffer.getvalue()).trail()), serialize(self.trail))
+
+    @number("15.5")
+    def test_deep_trail(self):
+        trail = Trail(None)
+        for i in range(100_000):
+            trail = Trail(TrailSeries(Mountain(f"m{i % 10}", 1, i), trail))
+        loaded = self.round_trip(trail)
+        count = 0
+        while loaded.store is not None:
+            count += 1
+            loaded = loaded.store.following
+        self.assertEqual(count, 100_000)
+
+    @number("15.6")
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            BinaryTrailReader(b"TRLB")
+        with self.assertRaises(ValueError):
+            BinaryTrailReader(b"{\"store\": null}" + bytes(16))
+
+    @number("15.7")
+    def test_unstorable_fields(self):
+        for difficulty_level, length in [(1, 1.5e2), (1, 1 << 31), (-(1 << 31) - 1, 1), ("1", 1)]:
+            trail = Trail(TrailSeries(Mountain("a", 1, 1), Trail(TrailSeries(Mountain("b", difficulty_level, length), Trail(None)))))
+            f = io.BytesIO()
+            with self.assertRaisesRegex(ValueError, "'b'"):
+                dump_binary(trail, f)
+            self.assertEqual(f.getvalue(), b"")
+        f = io.BytesIO()
+        dump_binary(Trail(TrailSeries(Mountain("c", -(1 << 31), (1 << 31) - 1), Trail(None))), f)
+        self.assertEqual(BinaryTrailReader(f.getvalue()).trail().store.mountain, Mountain("c", -(1 << 31), (1 << 31) - 1))
@@ -0,0 +1,81 @@
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+from trail_history import TrailHistory, TrailEdit
+
+class TestTrailHistory(unittest.TestCase):
+
+    def load_example(self):
+        self.a, self.b, self.c, self.d = (Mountain(letter, 5, 5) for letter in "abcd")
+        self.trail = Trail(TrailSeries(self.a, Trail(TrailSplit(
+            Trail(TrailSeries(self.b, Trail(None))),
+            Trail(None),
+            Trail(TrailSeries(self.c, Trail(None))),
+        ))))
+
+    @number("10.1")
+    def test_edit_is_persistent(self):
+        self.load_example()
+        old_split = self.trail.store.following.store
+
+        res = self.trail.edit(("following", "path_bottom"), "add_mountain_before", self.d)
+        self.assertIsInstance(res, Trail)
+        self.assertIsNot(res, self.trail)
+        new_split = res.store.following.store
+        self.assertEqual(new_split.path_bottom.store.mountain, self.d)
+        # Only the path is copied, the rest is shared.
+        self.assertIs(new_split.path_top, old_split.path_top)
+        self.assertIs(new_split.path_follow, old_split.path_follow)
+        # The original is untouched.
+        self.assertIsNone(old_split.path_bottom.store)
+
+        # Trails holding a split have no store method for this, so the trail's own is used.
+        before_split = self.trail.edit(("following",), "add_mountain_before", self.d)
+        self.assertEqual(before_split.store.following.store.mountain, self.d)
+        self.assertIs(before_split.store.following.store.following.store, old_split)
+
+        res = res.edit(("following",), "remove_branch")
+        self.assertEqual(res.store.following.store.mountain, self.c)
+        res = res.edit((), "add_mountain_after", self.d)
+        self.assertEqual([m.name for m in res.collect_all_mountains()], ["a", "d", "c"])
+        self.assertEqual([m.name for m in self.trail.collect_all_mountains()], ["a", "c", "b"])
+
+    @number("10.2")
+    def test_undo_redo(self):
+        self.load_example()
+        history = TrailHistory(self.trail)
+        history.apply(("following", "path_top"), "remove_mountain")
+        history.apply(("following", "path_follow"), "add_empty_branch_after")
+        self.assertEqual(len(history), 3)
+        self.assertIsNone(history.current.store.following.store.path_top.store)
+
+        self.assertIsNone(history.undo().store.following.store.path_follow.store.following.store)
+        self.assertIs(history.undo(), self.trail)
+        self.assertRaises(IndexError, history.undo)
+        history.redo()
+        self.assertTrue(history.can_redo())
+        self.assertEqual(history.diff(0, 2), [
+            TrailEdit(("following", "path_top"), "remove_mountain"),
+            TrailEdit(("following", "path_follow"), "add_empty_branch_after"),
+        ])
+
+        # A new edit discards everything that could be redone.
+        history.apply((), "add_mountain_before", self.d)
+        self.assertFalse(history.can_redo())
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.current.store.mountain, self.d)
+
+    @number("10.3")
+    def test_edit_mountain_undo(self):
+        self.load_example()
+        history = TrailHistory(self.trail)
+        edited = history.edit_mountain(("following", "path_top"), "e", 1, 2)
+        self.assertEqual(edited, Mountain("e", 1, 2))
+        self.assertIs(history.current.store.following.store.path_top.store.mountain, edited)
+        # The old mountain is untouched, and comes back with undo.
+        self.assertEqual(self.b, Mountain("b", 5, 5))
+        self.assertIs(history.undo().store.following.store.path_top.store.mountain, self.b)
+        self.assertIs(history.redo().store.following.store.path_top.store.mountain, edited)
+        self.assertEqual(history.edits[-1], TrailEdit(("following", "path_top"), "replace_mountain", (edited,)))
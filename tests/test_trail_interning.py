@@ -0,0 +1,73 @@
+import unittest
+from dataclasses import FrozenInstanceError
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+from trail_interning import TrailInterner, FrozenTrail
+from personality import LazyWalker
+
+class TestTrailInterning(unittest.TestCase):
+
+    def make_loop(self, name):
+        return Trail(TrailSplit(
+            Trail(TrailSeries(Mountain(name, 3, 4), Trail(None))),
+            Trail(None),
+            Trail(None),
+        ))
+
+    @number("11.1")
+    def test_sharing(self):
+        interner = TrailInterner()
+        trail = Trail(TrailSeries(
+            Mountain("start", 1, 1),
+            Trail(TrailSplit(self.make_loop("loop"), self.make_loop("loop"), self.make_loop("other"))),
+        ))
+        canonical = interner.intern(trail)
+        self.assertIsInstance(canonical, FrozenTrail)
+
+        split = canonical.store.following.store
+        self.assertIs(split.path_top, split.path_bottom)
+        self.assertIsNot(split.path_top, split.path_follow)
+        # Every empty trail is the same node.
+        self.assertIs(split.path_top.store.path_bottom, split.path_follow.store.path_follow)
+        # Structurally equal trails intern to the same node, even through another trail.
+        self.assertIs(interner.intern(self.make_loop("other")), split.path_follow)
+        self.assertIs(interner.intern(trail), canonical)
+        self.assertEqual(hash(interner.intern(self.make_loop("loop"))), hash(split.path_top))
+        self.assertNotEqual(split.path_top, split.path_follow)
+        # 1 empty trail, 2 mountains + series + trails for the loops, 2 splits + trails for the loops,
+        # the outer split + trail, the start mountain, series + trail
+        self.assertEqual(len(interner), 1 + 2 * 3 + 2 * 2 + 2 + 3)
+
+    @number("11.2")
+    def test_immutable(self):
+        interner = TrailInterner()
+        canonical = interner.intern(self.make_loop("loop"))
+        self.assertRaises(FrozenInstanceError, lambda: setattr(canonical, "store", None))
+        mountain = canonical.store.path_top.store.mountain
+        self.assertRaises(FrozenInstanceError, lambda: setattr(mountain, "length", 10))
+
+        # Interned trails can still be walked and edited persistently.
+        lw = LazyWalker()
+        canonical.follow_path(lw)
+        self.assertListEqual(lw.mountains, [])
+        edited = canonical.edit(("path_bottom",), "add_mountain_before", Mountain("new", 1, 1))
+        self.assertEqual(edited.aggregates.mountains, 2)
+        self.assertIs(interner.intern(edited).store.path_top, canonical.store.path_top)
+
+    @number("11.3")
+    def test_equality_across_interners(self):
+        def deep(depth, last):
+            trail = Trail(TrailSeries(Mountain(last, 1, 1), Trail(None)))
+            for i in range(depth):
+                trail = Trail(TrailSeries(Mountain("m", 1, 1), trail))
+            return trail
+
+        # Far deeper than the recursion limit.
+        first = TrailInterner().intern(deep(20_000, "end"))
+        second = TrailInterner().intern(deep(20_000, "end"))
+        self.assertIsNot(first, second)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, TrailInterner().intern(deep(20_000, "other")))
+        self.assertNotEqual(first, TrailInterner().intern(deep(19_999, "end")))
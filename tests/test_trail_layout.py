@@ -0,0 +1,109 @@
+import unittest
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from constants import DrawMode
+from trail import Trail, TrailSeries, TrailSplit, invalidate_caches
+from draw_trails import TrailDraw
+from trail_interning import TrailInterner
+from benchmarks.trails import random_trail
+
+class CountingDraw(TrailDraw):
+    """A TrailDraw which counts what it draws instead of drawing it, so no window is needed."""
+
+    def __init__(self, trail) -> None:
+        super().__init__(trail)
+        self.mountains = 0
+
+    def draw_line(self, sx, sy, ex, ey):
+        pass
+
+    def draw_mountain(self, x, y, scale, obj):
+        self.mountains += 1
+
+    def draw_branch(self, sx, sy, ex, ety, eby):
+        pass
+
+class TestTrailLayout(unittest.TestCase):
+
+    def expected(self, draw, trail):
+        """The (width, height) of trail, worked out recursively from scratch."""
+        store = trail.store
+        if store is None:
+            return 0, draw.EMPTY_HEIGHT
+        if isinstance(store, TrailSeries):
+            width, height = self.expected(draw, store.following)
+            return draw.TOTAL_MOUNTAIN_WIDTH + width, max(draw.MOUNTAIN_HEIGHT, height)
+        top_width, top_height = self.expected(draw, store.path_top)
+        bottom_width, bottom_height = self.expected(draw, store.path_bottom)
+        follow_width, follow_height = self.expected(draw, store.path_follow)
+        return (
+            2 * draw.BRANCH_WIDTH + max(top_width, bottom_width, draw.MIN_BRANCH_CONTENT_WIDTH) + follow_width,
+            max(top_height + draw.BRANCH_SEPARATION + bottom_height, follow_height),
+        )
+
+    @number("22.1")
+    def test_matches_recursive(self):
+        draw = TrailDraw(random_trail(300, seed=22))
+        self.assertEqual(draw.layout(), self.expected(draw, draw.trail))
+        self.assertEqual((draw.required_width(), draw.required_height()), draw.layout())
+        split = draw.trail.store
+        self.assertEqual(draw.required_width(split.path_top), self.expected(draw, split.path_top)[0])
+        self.assertEqual(TrailDraw(Trail(None)).layout(), (0, TrailDraw.EMPTY_HEIGHT))
+
+    @number("22.2")
+    def test_edit_only_lays_out_path(self):
+        draw = TrailDraw(random_trail(300, seed=22))
+        draw.layout()
+        old = draw.trail
+        path = ("path_follow",)
+        draw.history.apply(path, "add_mountain_before", Mountain("new", 1, 1))
+        new = draw.trail
+        # Everything off the edited path is shared, and keeps its cached layout.
+        self.assertIs(new.store.path_top, old.store.path_top)
+        self.assertEqual(new.store.path_top._layout, old.store.path_top._layout)
+        self.assertFalse(hasattr(new, "_layout"))
+        self.assertEqual(draw.layout(), self.expected(draw, new))
+        self.assertEqual(draw.layout(), (old._layout[0] + draw.TOTAL_MOUNTAIN_WIDTH, old._layout[1]))
+
+    @number("22.3")
+    def test_in_place_edit_invalidates(self):
+        leaf = Trail(None)
+        draw = TrailDraw(Trail(TrailSeries(Mountain("a", 1, 1), leaf)))
+        self.assertEqual(draw.layout(), (draw.TOTAL_MOUNTAIN_WIDTH, draw.MOUNTAIN_HEIGHT))
+        leaf.store = TrailSplit(Trail(None), Trail(None), Trail(None))
+        invalidate_caches(draw.trail, ("following",))
+        self.assertEqual(draw.layout(), self.expected(draw, draw.trail))
+
+    @number("22.4")
+    def test_deep(self):
+        # Far deeper than the recursion limit.
+        trail = Trail(None)
+        for i in range(10000):
+            trail = Trail(TrailSeries(Mountain(f"m{i}", 1, 1), trail))
+        draw = TrailDraw(trail)
+        self.assertEqual(draw.layout(), (10000 * draw.TOTAL_MOUNTAIN_WIDTH, draw.MOUNTAIN_HEIGHT))
+
+    @number("22.5")
+    def test_compact_and_frozen(self):
+        trail = random_trail(200, seed=22)
+        expected = TrailDraw(trail).layout()
+        for other in (trail.compacted(), TrailInterner().intern(trail)):
+            self.assertEqual(TrailDraw(other).layout(), expected)
+
+    @number("22.6")
+    def test_draw_deep(self):
+        # Far deeper than the recursion limit.
+        depth = 10000
+        trail = Trail(None)
+        for i in range(depth):
+            trail = Trail(TrailSeries(Mountain(f"m{i}", 1, 1), trail))
+        draw = CountingDraw(trail)
+        width, height = draw.layout()
+        draw.draw_in_box(height, width, 0, 0)
+        self.assertEqual(draw.mountains, depth)
+        # Hovering over the end of the trail walks all the way down to the last mountain.
+        box, action, cur_trail = draw.box_and_action((width - 1, height / 2), DrawMode.ADD_MOUNTAIN)
+        self.assertEqual(cur_trail.mountain, Mountain("m0", 1, 1))
+        action(Mountain("end", 1, 1))
+        self.assertEqual(draw.trail.sub_trail(("following",) * depth).store.mountain, Mountain("end", 1, 1))
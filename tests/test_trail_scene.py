@@ -0,0 +1,92 @@
+import sys
+import types
+import unittest
+from unittest import mock
+from ed_utils.decorators import number
+
+from mountain import Mountain
+from draw_trails import TrailDraw
+from benchmarks.trails import random_trail
+
+class _Drawable:
+    """Stands in for every arcade object the scene holds, counting how often it is drawn."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.draws = 0
+
+    def draw(self) -> None:
+        self.draws += 1
+
+class _DrawableList(_Drawable, list):
+
+    def __init__(self, *args, **kwargs) -> None:
+        list.__init__(self)
+        _Drawable.__init__(self)
+
+def _arcade_stub() -> types.ModuleType:
+    """Just enough of arcade for TrailDraw to record a scene, without a window."""
+    arcade = types.ModuleType("arcade")
+    arcade.ShapeElementList = _DrawableList
+    arcade.SpriteList = _DrawableList
+    arcade.Sprite = _Drawable
+    arcade.Text = _Drawable
+    arcade.create_line = lambda *args, **kwargs: ("line", args)
+    arcade.create_line_strip = lambda *args, **kwargs: ("line_strip", args)
+    arcade.load_texture = lambda path: ("texture", path)
+    return arcade
+
+class TestTrailScene(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.dict(sys.modules, {"arcade": _arcade_stub()})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.draw = TrailDraw(random_trail(50, seed=23))
+        self.box = (700, 600, 0, 0)
+
+    def frame(self, box=None):
+        """Draws one frame and returns the scene and shape list it drew."""
+        self.draw.draw_scene(*(box or self.box))
+        return self.draw.scene, self.draw.scene.shapes
+
+    @number("23.1")
+    def test_reused_while_unchanged(self):
+        scene, shapes = self.frame()
+        self.assertGreater(len(shapes), 0)
+        self.assertEqual(len(scene.sprites), 50)
+        for _ in range(3):
+            self.assertEqual(self.frame(), (scene, shapes))
+            self.assertIs(self.draw.scene, scene)
+            self.assertIs(self.draw.scene.shapes, shapes)
+        # Drawn every frame, but only built once.
+        self.assertEqual(shapes.draws, 4)
+        self.assertEqual(len(scene.sprites), 50)
+
+    @number("23.2")
+    def test_rebuilt_after_apply_and_undo(self):
+        scene, shapes = self.frame()
+        self.draw.history.apply((), "add_mountain_before", Mountain("new", 1, 1))
+        edited, edited_shapes = self.frame()
+        self.assertIsNot(edited, scene)
+        self.assertIsNot(edited_shapes, shapes)
+        self.assertEqual(len(edited.sprites), 51)
+
+        self.draw.history.undo()
+        undone, undone_shapes = self.frame()
+        self.assertIsNot(undone, edited)
+        self.assertIsNot(undone_shapes, edited_shapes)
+        self.assertEqual(len(undone.sprites), 50)
+        self.assertIs(self.frame()[0], undone)
+
+    @number("23.3")
+    def test_rebuilt_after_box_change(self):
+        scene, shapes = self.frame()
+        moved, moved_shapes = self.frame((700, 600, 10, 0))
+        self.assertIsNot(moved, scene)
+        self.assertIsNot(moved_shapes, shapes)
+        resized, _ = self.frame((700, 500, 10, 0))
+        self.assertIsNot(resized, moved)
+        self.assertIs(self.frame((700, 500, 10, 0))[0], resized)
+        # The boxes box_and_action uses follow the new box too.
+        self.assertEqual(self.draw.trail.trail_box.h, 700)
+        self.assertEqual(self.draw.trail.trail_box.w, 500)
@@ -1,16 +1,62 @@
 from __future__ import annotations
 from dataclasses import dataclass
 
-from mountain import Mountain
+from mountain import Mountain, CompactMountain
 from data_structures.linked_stack import LinkedStack
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Callable, Union
 
 # Avoid circular imports for typing.
 if TYPE_CHECKING:
     from personality import WalkerPersonality
+    from compiled_trail import CompiledTrail
 
-@dataclass
-class TrailSplit:
+# Bumped on every edit, persistent (Trail.edit) or in place (see invalidate_caches).
+_edits = 0
+
+# The attributes trails cache derived values in, see Trail.aggregates and TrailDraw.layout.
+_CACHES = ("_aggregates", "_layout")
+
+def invalidate_caches(trail: CompactTrail | None = None, path: TrailPath = ()) -> None:
+    """
+    Records an edit, and throws away the cached values (aggregates and layout) of trail and of every
+    sub-trail along path.
+    After changing a sub-trail (its store, or anything in it such as a mountain) in place, call this
+    with the root and the path to the changed sub-trail, so it and its ancestors are recomputed.
+    The edit methods of the trail classes build new nodes and change nothing, so assigning their
+    result into an existing trail (eg. trail.store = trail.store.remove_mountain()) is such a change.
+    Nothing else is touched, so the caches of the rest of the trail are kept.
+
+    Trail.edit calls this without a trail, as the trails along its path are new and have nothing cached.
+    """
+    global _edits
+    _edits += 1
+    node = trail
+    for attribute in (path if trail is not None else ()):
+        _drop_caches(node)
+        node = getattr(node.store, attribute)
+    if node is not None:
+        _drop_caches(node)
+
+def _drop_caches(trail: CompactTrail) -> None:
+    for name in _CACHES:
+        try:
+            # Not a structural change, and frozen trails cache values too.
+            object.__delattr__(trail, name)
+        except AttributeError:
+            pass
+
+def edit_count() -> int:
+    """Returns how many times trails have been edited so far, so a caller can tell whether any trail has changed."""
+    return _edits
+
+
+# The Compact* classes hold all of the fields and behaviour, using __slots__ instead of a __dict__.
+# Trail, TrailSeries and TrailSplit are the same classes with a __dict__ added back,
+# so that extra attributes can be injected (draw_trails does this for boxes).
+# Always check isinstance against the Compact* classes, so both kinds of trail are handled.
+
+@dataclass(slots=True)
+class CompactTrailSplit:
     """
     A split in the trail.
        ___path_top____
@@ -24,12 +70,19 @@ class TrailSplit:
     path_follow: Trail
 
     def remove_branch(self) -> TrailStore:
-        """Removes the branch, should just leave the remaining following trail."""
+        """
+        Removes the branch, should just leave the remaining following trail.
+        If the result replaces this store in an existing trail, call invalidate_caches with the path to it.
+        """
         return self.path_follow.store
 
 
-@dataclass
-class TrailSeries:
+class TrailSplit(CompactTrailSplit):
+    """A CompactTrailSplit which can also be given extra attributes."""
+
+
+@dataclass(slots=True)
+class CompactTrailSeries:
     """
     A mountain, followed by the rest of the trail
 
@@ -40,47 +93,181 @@ class TrailSeries:
     following: Trail
 
     def remove_mountain(self) -> TrailStore:
-        """Removes the mountain at the beginning of this series."""
+        """
+        Removes the mountain at the beginning of this series.
+        If the result replaces this store in an existing trail, call invalidate_caches with the path to it.
+        """
         return self.following.store
 
+    def replace_mountain(self, mountain: Mountain) -> TrailStore:
+        """
+        Replaces the mountain at the beginning of this series, keeping the following trail.
+        If the result replaces this store in an existing trail, call invalidate_caches with the path to it.
+        """
+        return self._series_type(mountain, self.following)
+
     def add_mountain_before(self, mountain: Mountain) -> TrailStore:
-        """Adds a mountain in series before the current one."""
-        new_mountain_before = TrailSeries(mountain, Trail(self))
+        """
+        Adds a mountain in series before the current one.
+        If the result replaces this store in an existing trail, call invalidate_caches with the path to it.
+        """
+        new_mountain_before = self._series_type(mountain, self._trail_type(self))
         return new_mountain_before
 
     def add_empty_branch_before(self) -> TrailStore:
-        """Adds an empty branch, where the current trailstore is now the following path."""
-        new_empty_branch_before = TrailSplit(Trail(None), Trail(None), Trail(self))
+        """
+        Adds an empty branch, where the current trailstore is now the following path.
+        If the result replaces this store in an existing trail, call invalidate_caches with the path to it.
+        """
+        new_empty_branch_before = self._split_type(self._trail_type(None), self._trail_type(None), self._trail_type(self))
         return new_empty_branch_before
 
     def add_mountain_after(self, mountain: Mountain) -> TrailStore:
-        """Adds a mountain after the current mountain, but before the following trail."""
-        new_mountain_after = TrailSeries(self.mountain, Trail(TrailSeries(mountain, self.following)))
+        """
+        Adds a mountain after the current mountain, but before the following trail.
+        If the result replaces this store in an existing trail, call invalidate_caches with the path to it.
+        """
+        new_mountain_after = self._series_type(self.mountain, self._trail_type(self._series_type(mountain, self.following)))
         return new_mountain_after
 
     def add_empty_branch_after(self) -> TrailStore:
-        """Adds an empty branch after the current mountain, but before the following trail."""
-        new_empty_branch_after = TrailSeries(self.mountain, Trail(TrailSplit(Trail(None), Trail(None), self.following)))
+        """
+        Adds an empty branch after the current mountain, but before the following trail.
+        If the result replaces this store in an existing trail, call invalidate_caches with the path to it.
+        """
+        new_empty_branch_after = self._series_type(self.mountain, self._trail_type(self._split_type(self._trail_type(None), self._trail_type(None), self.following)))
         return new_empty_branch_after
 
 
-TrailStore = Union[TrailSplit, TrailSeries, None]
+class TrailSeries(CompactTrailSeries):
+    """A CompactTrailSeries which can also be given extra attributes."""
+
+
+TrailStore = Union[CompactTrailSplit, CompactTrailSeries, None]
+
+# The attributes followed from a root trail to reach a sub-trail,
+# eg. ("following", "path_top") is root.store.following.store.path_top
+TrailPath = tuple[str, ...]
+
+@dataclass(frozen=True)
+class TrailAggregates:
+    """
+    Summary of every route through a trail.
+    A route's length is the sum of its mountain lengths, and its cost the sum of its difficulty levels.
+    """
 
-@dataclass
-class Trail:
+    mountains: int = 0
+    min_length: int = 0
+    max_length: int = 0
+    total_difficulty: int = 0
+    max_difficulty: int = 0
+    min_cost: int = 0
+    max_cost: int = 0
+
+    def then(self, following: TrailAggregates) -> TrailAggregates:
+        """Aggregates of this trail walked in series with the following trail."""
+        return TrailAggregates(
+            self.mountains + following.mountains,
+            self.min_length + following.min_length,
+            self.max_length + following.max_length,
+            self.total_difficulty + following.total_difficulty,
+            max(self.max_difficulty, following.max_difficulty),
+            self.min_cost + following.min_cost,
+            self.max_cost + following.max_cost,
+        )
+
+    def either(self, other: TrailAggregates) -> TrailAggregates:
+        """Aggregates of a choice between this trail and the other one."""
+        return TrailAggregates(
+            self.mountains + other.mountains,
+            min(self.min_length, other.min_length),
+            max(self.max_length, other.max_length),
+            self.total_difficulty + other.total_difficulty,
+            max(self.max_difficulty, other.max_difficulty),
+            min(self.min_cost, other.min_cost),
+            max(self.max_cost, other.max_cost),
+        )
+
+    @classmethod
+    def of_mountain(cls, mountain: Mountain) -> TrailAggregates:
+        return cls(
+            1,
+            mountain.length,
+            mountain.length,
+            mountain.difficulty_level,
+            mountain.difficulty_level,
+            mountain.difficulty_level,
+            mountain.difficulty_level,
+        )
+
+
+class _CachesAggregates:
+
+    __slots__ = _CACHES
+
+
+@dataclass(slots=True)
+class CompactTrail(_CachesAggregates):
 
     store: TrailStore = None
 
     def add_mountain_before(self, mountain: Mountain) -> Trail:
-        """Adds a mountain before everything currently in the trail."""
-        new_mountain_before = Trail(TrailSeries(mountain, self))
+        """
+        Adds a mountain before everything currently in the trail.
+        If the result replaces this trail inside an existing trail, call invalidate_caches with the path to its parent.
+        """
+        new_mountain_before = self._trail_type(self._series_type(mountain, self))
         return new_mountain_before
 
     def add_empty_branch_before(self) -> Trail:
-        """Adds an empty branch before everything currently in the trail."""
-        empty_branch_before = Trail(TrailSplit(Trail(None), Trail(None), self))
+        """
+        Adds an empty branch before everything currently in the trail.
+        If the result replaces this trail inside an existing trail, call invalidate_caches with the path to its parent.
+        """
+        empty_branch_before = self._trail_type(self._split_type(self._trail_type(None), self._trail_type(None), self))
         return empty_branch_before
 
+    def sub_trail(self, path: TrailPath) -> Trail:
+        """Returns the sub-trail found by following path from this trail."""
+        trail = self
+        for attribute in path:
+            trail = getattr(trail.store, attribute)
+        return trail
+
+    def edit(self, path: TrailPath, method: str, *args) -> Trail:
+        """
+        Persistently applies an edit method to the sub-trail at path, and returns the new root trail.
+        The method is called on the sub-trail's store, or on the sub-trail itself when the store
+        has no such method (eg. adding a mountain before an empty trail or a split).
+
+        Only the trails and stores along the path are copied (as nodes of the same family as this
+        trail, see _set_family), everything else is shared with this trail, which is left untouched.
+
+        Complexity:
+        - O(d + method), where d is the length of path
+        - Best case = Worst case
+        """
+        ancestors = []
+        trail = self
+        for attribute in path:
+            ancestors.append((trail, attribute))
+            trail = getattr(trail.store, attribute)
+
+        result = getattr(trail.store if hasattr(trail.store, method) else trail, method)(*args)
+        new_trail = result if isinstance(result, CompactTrail) else self._trail_type(result)
+        for trail, attribute in reversed(ancestors):
+            store = trail.store
+            if isinstance(store, CompactTrailSeries):
+                fields = {"mountain": store.mountain, "following": store.following}
+                fields[attribute] = new_trail
+                new_trail = self._trail_type(self._series_type(**fields))
+            else:
+                fields = {"path_top": store.path_top, "path_bottom": store.path_bottom, "path_follow": store.path_follow}
+                fields[attribute] = new_trail
+                new_trail = self._trail_type(self._split_type(**fields))
+        invalidate_caches()
+        return new_trail
+
     def follow_path(self, personality: WalkerPersonality) -> None:
         """
         Follow a path and add mountains according to a personality.
@@ -96,11 +283,11 @@ class Trail:
         path_follow_tracker = LinkedStack()
 
         while True:
-            if isinstance(next_path, TrailSplit):
+            if isinstance(next_path, CompactTrailSplit):
                 path_follow_tracker.push(next_path.path_follow)
                 next_path = next_path.path_top.store if personality.select_branch(next_path.path_top, next_path.path_bottom) else next_path.path_bottom.store
 
-            elif isinstance(next_path, TrailSeries):
+            elif isinstance(next_path, CompactTrailSeries):
                 personality.add_mountain(next_path.mountain)
                 next_path = next_path.following.store
 
@@ -110,16 +297,110 @@ class Trail:
             else:
                 break
 
+    def compile(self) -> CompiledTrail:
+        """
+        Lowers the trail into a CompiledTrail, which can replay follow_path much faster.
+        Worth it when the same trail is walked by many personalities.
+
+        Complexity:
+        - O(n), where n is the number of TrailSeries and TrailSplit in the trail
+        - Best case = Worst case
+        """
+        from compiled_trail import CompiledTrail
+        return CompiledTrail(self)
+
+    def follow_paths(self, personalities: list[WalkerPersonality]) -> None:
+        """
+        Follow a path for every personality, as if follow_path was called on each of them.
+        Walkers making the same branch decisions share a single walk, see CompiledTrail.follow_paths.
+
+        Complexity:
+        - O(n + CompiledTrail.follow_paths), where n is the number of TrailSeries and TrailSplit in the trail
+        - Best case = Worst case
+        """
+        self.compile().follow_paths(personalities)
+
+    @property
+    def aggregates(self) -> TrailAggregates:
+        """
+        Returns the TrailAggregates of this trail, computing and caching them for every sub-trail.
+        Edits are persistent, so the cached values stay valid, except for sub-trails changed in place
+        (see invalidate_caches).
+
+        Complexity:
+        - Best case: O(1) when the aggregates are already cached.
+        - Worst case: O(n) after an edit, where n is the number of sub-trails without a cached value.
+        - Each sub-trail is visited twice at most, using a list as a stack instead of recursion.
+        """
+        cached = getattr(self, "_aggregates", None)
+        if cached is not None:
+            return cached
+
+        stack = [(self, False)]
+        while stack:
+            trail, children_done = stack.pop()
+            store = trail.store
+            if store is None:
+                result = TrailAggregates()
+            elif not children_done:
+                stack.append((trail, True))
+                children = [store.following] if isinstance(store, CompactTrailSeries) else [store.path_top, store.path_bottom, store.path_follow]
+                stack.extend((child, False) for child in children if getattr(child, "_aggregates", None) is None)
+                continue
+            elif isinstance(store, CompactTrailSeries):
+                result = TrailAggregates.of_mountain(store.mountain).then(store.following._aggregates)
+            else:
+                branches = store.path_top._aggregates.either(store.path_bottom._aggregates)
+                result = branches.then(store.path_follow._aggregates)
+            # Set directly, as frozen trails cache values too.
+            object.__setattr__(trail, "_aggregates", result)
+        return self._aggregates
+
+    def compacted(self) -> CompactTrail:
+        """
+        Returns a copy of this trail made only of Compact* nodes and CompactMountains,
+        which have no __dict__ and so take much less memory.
+
+        Complexity:
+        - O(n), where n is the number of trails in the trail
+        - Best case = Worst case
+        - Each trail is visited twice at most, using a list as a stack instead of recursion
+        """
+        copies = {}
+        stack = [(self, False)]
+        while stack:
+            trail, children_done = stack.pop()
+            store = trail.store
+            if store is None:
+                copies[id(trail)] = CompactTrail(None)
+            elif not children_done:
+                stack.append((trail, True))
+                children = [store.following] if isinstance(store, CompactTrailSeries) else [store.path_top, store.path_bottom, store.path_follow]
+                stack.extend((child, False) for child in children if id(child) not in copies)
+            elif isinstance(store, CompactTrailSeries):
+                mountain = store.mountain
+                copies[id(trail)] = CompactTrail(CompactTrailSeries(
+                    CompactMountain(mountain.name, mountain.difficulty_level, mountain.length),
+                    copies[id(store.following)],
+                ))
+            else:
+                copies[id(trail)] = CompactTrail(CompactTrailSplit(
+                    copies[id(store.path_top)],
+                    copies[id(store.path_bottom)],
+                    copies[id(store.path_follow)],
+                ))
+        return copies[id(self)]
+
     def collect_all_mountains(self) -> list[Mountain]:
         """Returns a list of all mountains on the trail."""
         list_of_trails = [self.store]
         list_of_mountains = []
         while list_of_trails:
             current = list_of_trails.pop()
-            if isinstance(current, TrailSeries):
+            if isinstance(current, CompactTrailSeries):
                 list_of_trails.append(current.following.store)
                 list_of_mountains.append(current.mountain)
-            elif isinstance(current, TrailSplit):
+            elif isinstance(current, CompactTrailSplit):
                 list_of_trails.append(current.path_top.store)
                 list_of_trails.append(current.path_bottom.store)
                 list_of_trails.append(current.path_follow.store)
@@ -147,11 +428,11 @@ class Trail:
                 next_path = trail_split_list.pop()
                 self.length_k_paths_aux(next_path, paths_list, trail_split_list, current_mountains)
 
-        elif isinstance(current_path, TrailSeries):
+        elif isinstance(current_path, CompactTrailSeries):
             current_mountains.append(current_path.mountain)
             self.length_k_paths_aux(current_path.following.store, paths_list, trail_split_list, current_mountains)
 
-        elif isinstance(current_path, TrailSplit):
+        elif isinstance(current_path, CompactTrailSplit):
             previous_trail_split = trail_split_list[-1] if trail_split_list else None
             trail_split_list.append(current_path.path_follow.store)
             new_top_path_list = current_mountains.copy()
@@ -160,4 +441,48 @@ class Trail:
             trail_split_list.append(previous_trail_split)
             trail_split_list.append(current_path.path_follow.store)
             new_bottom_path_list = current_mountains.copy()
-            self.length_k_paths_aux(current_path.path_bottom.store, paths_list, trail_split_list, new_bottom_path_list)
\ No newline at end of file
+            self.length_k_paths_aux(current_path.path_bottom.store, paths_list, trail_split_list, new_bottom_path_list)
+
+
+class Trail(CompactTrail):
+    """A CompactTrail which can also be given extra attributes."""
+
+
+def _set_family(trail_type: type, series_type: type, split_type: type) -> None:
+    """
+    Makes the edit methods of each class build new nodes of these types, so an edited trail is made
+    of the same kind of nodes throughout (eg. editing a compact trail gives a compact trail).
+    """
+    for cls in (trail_type, series_type, split_type):
+        cls._trail_type, cls._series_type, cls._split_type = trail_type, series_type, split_type
+
+_set_family(CompactTrail, CompactTrailSeries, CompactTrailSplit)
+_set_family(Trail, TrailSeries, TrailSplit)
+
+
+class LazyTrail(Trail):
+    """
+    A Trail whose store is only built, by calling loader, the first time it is accessed.
+    Used to load large stored trails on demand (see trail_binary).
+    """
+
+    def __init__(self, loader: Callable[[], TrailStore]) -> None:
+        # Kept in the __dict__, as the store slot is left unset until loaded.
+        object.__setattr__(self, "_loader", loader)
+
+    @property
+    def store(self) -> TrailStore:
+        loader = self.__dict__.pop("_loader", None)
+        if loader is not None:
+            CompactTrail.store.__set__(self, loader())
+        return CompactTrail.store.__get__(self)
+
+    @store.setter
+    def store(self, value: TrailStore) -> None:
+        self.__dict__.pop("_loader", None)
+        CompactTrail.store.__set__(self, value)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the store has been built yet."""
+        return "_loader" not in self.__dict__
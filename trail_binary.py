@@ -0,0 +1,158 @@
+"""
+A compact binary format for stored trails, which can be loaded lazily.
+
+The file is laid out as:
+- HEADER: magic, version, number of nodes, root node
+- the node table: one fixed-width NODE record per TrailSeries / TrailSplit
+- the string pool: every distinct mountain name once, each as a length followed by utf-8 bytes
+
+A node record is a kind followed by four ints:
+- SERIES: name (byte offset into the string pool), difficulty_level, length, following
+- SPLIT: path_top, path_bottom, path_follow, unused
+Trails are not given records, a trail is referred to by the index of its store's node, or EMPTY.
+Stores shared between trails are written once, and stay shared when loaded.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+from typing import BinaryIO
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit, LazyTrail, CompactTrailSeries, TrailStore
+
+MAGIC = b"TRLB"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxii")
+NODE = struct.Struct("<b4i")
+NAME_LENGTH = struct.Struct("<I")
+
+SERIES = 0
+SPLIT = 1
+EMPTY = -1
+
+INT_MIN = -(1 << 31)
+INT_MAX = (1 << 31) - 1
+
+def _field(mountain: Mountain, field: str) -> int:
+    """Returns a mountain's difficulty_level or length, checking it fits in a node record."""
+    value = getattr(mountain, field)
+    if not isinstance(value, int) or not INT_MIN <= value <= INT_MAX:
+        raise ValueError(f"Mountain {mountain.name!r} has {field} {value!r}, the binary format only stores 32-bit integers")
+    return value
+
+def dump_binary(trail: Trail, f: BinaryIO) -> None:
+    """
+    Writes trail to the binary file object f.
+    Everything is checked before anything is written, so a trail which can't be stored leaves f untouched.
+    :raises ValueError: if a mountain's difficulty_level or length is not an integer that fits in 32 bits.
+
+    Complexity:
+    - O(n + c), where n is the number of TrailSeries and TrailSplit in the trail,
+      and c is the number of characters in the distinct mountain names
+    - Best case = Worst case
+    - Uses a list as a stack rather than recursion, so any depth of trail can be written
+    """
+    nodes = {}
+    pending = []
+    records = []
+
+    def node(trail: Trail) -> int:
+        store = trail.store
+        if store is None:
+            return EMPTY
+        if id(store) not in nodes:
+            nodes[id(store)] = len(records)
+            records.append(None)
+            pending.append(store)
+        return nodes[id(store)]
+
+    names = {}
+    pool = bytearray()
+
+    def name(text: str) -> int:
+        if text not in names:
+            names[text] = len(pool)
+            encoded = text.encode("utf-8")
+            pool.extend(NAME_LENGTH.pack(len(encoded)))
+            pool.extend(encoded)
+        return names[text]
+
+    root = node(trail)
+    while pending:
+        store = pending.pop()
+        if isinstance(store, CompactTrailSeries):
+            mountain = store.mountain
+            record = (SERIES, name(mountain.name), _field(mountain, "difficulty_level"), _field(mountain, "length"), node(store.following))
+        else:
+            record = (SPLIT, node(store.path_top), node(store.path_bottom), node(store.path_follow), 0)
+        records[nodes[id(store)]] = NODE.pack(*record)
+
+    f.write(HEADER.pack(MAGIC, VERSION, len(records), root))
+    f.write(b"".join(records))
+    f.write(pool)
+
+
+class BinaryTrailReader:
+    """
+    Builds trails from a binary trail held in any buffer (bytes, or an mmap of the file).
+    Each node is only decoded when the store of a trail referring to it is first accessed.
+    """
+
+    def __init__(self, buffer) -> None:
+        """Raises ValueError if buffer does not hold a binary trail."""
+        if len(buffer) < HEADER.size:
+            raise ValueError("Not a binary trail: too short")
+        magic, version, self.node_count, self.root = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a binary trail: bad magic")
+        if version != VERSION:
+            raise ValueError(f"Unsupported binary trail version {version}")
+        self.pool_offset = HEADER.size + self.node_count * NODE.size
+        if len(buffer) < self.pool_offset:
+            raise ValueError("Not a binary trail: truncated node table")
+        self.buffer = buffer
+        self._trails = {}
+
+    def trail(self, index: int = None) -> Trail:
+        """Returns the (lazy) trail whose store is node index, by default the root."""
+        if index is None:
+            index = self.root
+        if index == EMPTY:
+            return Trail(None)
+        if index not in self._trails:
+            self._trails[index] = LazyTrail(lambda: self.store(index))
+        return self._trails[index]
+
+    def store(self, index: int) -> TrailStore:
+        """
+        Decodes node index into a store, whose trails are themselves lazy.
+
+        Complexity:
+        - O(1) for a split, O(c) for a series, where c is the length of the mountain name
+        - Best case = Worst case
+        """
+        if not 0 <= index < self.node_count:
+            raise ValueError(f"Node {index} is outside the node table")
+        kind, a, b, c, d = NODE.unpack_from(self.buffer, HEADER.size + index * NODE.size)
+        if kind == SERIES:
+            return TrailSeries(Mountain(self.name(a), b, c), self.trail(d))
+        if kind == SPLIT:
+            return TrailSplit(self.trail(a), self.trail(b), self.trail(c))
+        raise ValueError(f"Node {index} has unknown kind {kind}")
+
+    def name(self, offset: int) -> str:
+        """Returns the mountain name at offset into the string pool."""
+        start = self.pool_offset + offset
+        (length,) = NAME_LENGTH.unpack_from(self.buffer, start)
+        start += NAME_LENGTH.size
+        return bytes(self.buffer[start:start + length]).decode("utf-8")
+
+
+def load_binary(f: BinaryIO) -> Trail:
+    """
+    Memory maps the binary file object f and returns its trail.
+    Nothing but the header is read up front, every store is decoded the first time it is accessed.
+    The map stays open for as long as any trail from it is still referenced.
+    """
+    return BinaryTrailReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).trail()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+from mountain import Mountain
+from trail import Trail, TrailPath
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from journal import TrailJournal
+
+@dataclass(frozen=True)
+class TrailEdit:
+    """A record of Trail.edit(path, method, *args)."""
+
+    path: TrailPath
+    method: str
+    args: tuple = ()
+
+
+class TrailHistory:
+    """
+    A log of trail versions supporting undo and redo.
+
+    Edits are made with Trail.edit, so each version shares everything but the edited path
+    with the version before it, and costs O(depth) memory rather than a copy of the trail.
+    """
+
+    def __init__(self, trail: Trail) -> None:
+        """
+        Complexity:
+        - O(1)
+        - Best case = Worst case
+        """
+        self.versions = [trail]
+        self.edits = [None]
+        self.position = 0
+        # If set, told about every change so it can be persisted.
+        self.journal: TrailJournal | None = None
+
+    @property
+    def current(self) -> Trail:
+        """Returns the trail at the current version."""
+        return self.versions[self.position]
+
+    def __len__(self) -> int:
+        """Returns the number of versions, including any that could be redone."""
+        return len(self.versions)
+
+    def apply(self, path: TrailPath, method: str, *args) -> Trail:
+        """
+        Edits the current trail, and makes the result the current version.
+        Any undone versions are discarded.
+
+        Complexity:
+        - O(Trail.edit + r), where r is the number of undone versions being discarded
+        - Best case = Worst case
+        """
+        new_trail = self.current.edit(path, method, *args)
+        del self.versions[self.position + 1:]
+        del self.edits[self.position + 1:]
+        self.versions.append(new_trail)
+        self.edits.append(TrailEdit(path, method, args))
+        self.position += 1
+        if self.journal is not None:
+            self.journal.applied(self.edits[-1])
+        return new_trail
+
+    def can_undo(self) -> bool:
+        return self.position > 0
+
+    def can_redo(self) -> bool:
+        return self.position < len(self.versions) - 1
+
+    def undo(self) -> Trail:
+        """
+        Steps back to the previous version, and returns it.
+        :raises IndexError: if there is nothing to undo.
+        """
+        if not self.can_undo():
+            raise IndexError("Nothing to undo")
+        self.position -= 1
+        if self.journal is not None:
+            self.journal.undone()
+        return self.current
+
+    def redo(self) -> Trail:
+        """
+        Steps forward to the next version, and returns it.
+        :raises IndexError: if there is nothing to redo.
+        """
+        if not self.can_redo():
+            raise IndexError("Nothing to redo")
+        self.position += 1
+        if self.journal is not None:
+            self.journal.redone()
+        return self.current
+
+    def edit_mountain(self, path: TrailPath, name: str, difficulty_level: int, length: int) -> Mountain:
+        """
+        Replaces the mountain of the series at path with a new one, as a new version, and returns it.
+        The old mountain is left untouched, so undo brings it back.
+
+        Complexity:
+        - O(apply)
+        - Best case = Worst case
+        """
+        mountain = Mountain(name, difficulty_level, length)
+        self.apply(path, "replace_mountain", mountain)
+        return mountain
+
+    def diff(self, start: int, end: int) -> list[TrailEdit]:
+        """
+        Returns the edits which turn version `start` into version `end`.
+
+        Complexity:
+        - O(end - start)
+        - Best case = Worst case
+        :raises IndexError: if start > end or either is not a version.
+        """
+        if not 0 <= start <= end < len(self.versions):
+            raise IndexError(f"Cannot diff version {start} against {end}")
+        return self.edits[start + 1:end + 1]
@@ -0,0 +1,177 @@
+"""
+Hash-consing for trails.
+
+A TrailInterner turns a trail into its canonical form. The canonical form is built from immutable
+Frozen* nodes, and every structurally equal node is shared. The structural hash of each node is
+computed once on creation, so hashing is O(1). Equality is an identity check for nodes from the
+same interner.
+"""
+from __future__ import annotations
+from dataclasses import FrozenInstanceError, fields
+
+from mountain import Mountain, CompactMountain
+from trail import Trail, TrailSeries, TrailSplit, CompactTrail, CompactTrailSeries, CompactTrailSplit
+
+class _Frozen:
+    """Immutable node with a cached structural hash, see the Frozen* classes below."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        # Interned nodes are equal exactly when they are the same node, so the full
+        # comparison only happens for hash collisions or nodes from different interners.
+        # It uses a list as a stack rather than the recursive dataclass __eq__, so any depth of
+        # trail can be compared, and skips pairs already compared, as interned nodes are shared.
+        if self is other:
+            return True
+        stack = [(self, other)]
+        compared = set()
+        while stack:
+            node, other = stack.pop()
+            if node is other or (id(node), id(other)) in compared:
+                continue
+            if type(node) is not type(other) or node._hash != other._hash:
+                return False
+            compared.add((id(node), id(other)))
+            for field in fields(node):
+                value, other_value = getattr(node, field.name), getattr(other, field.name)
+                if isinstance(value, _Frozen):
+                    stack.append((value, other_value))
+                elif value != other_value:
+                    return False
+        return True
+
+    def _freeze(self, **fields) -> None:
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_hash", hash((type(self).__name__,) + tuple(fields.values())))
+
+
+class FrozenMountain(_Frozen, CompactMountain):
+
+    __slots__ = ("_hash",)
+
+    def __init__(self, name: str, difficulty_level: int, length: int) -> None:
+        self._freeze(name=name, difficulty_level=difficulty_level, length=length)
+
+
+class FrozenTrailSeries(_Frozen, CompactTrailSeries):
+
+    __slots__ = ("_hash",)
+
+    def __init__(self, mountain: FrozenMountain, following: FrozenTrail) -> None:
+        self._freeze(mountain=mountain, following=following)
+
+
+class FrozenTrailSplit(_Frozen, CompactTrailSplit):
+
+    __slots__ = ("_hash",)
+
+    def __init__(self, path_top: FrozenTrail, path_bottom: FrozenTrail, path_follow: FrozenTrail) -> None:
+        self._freeze(path_top=path_top, path_bottom=path_bottom, path_follow=path_follow)
+
+
+class FrozenTrail(_Frozen, CompactTrail):
+
+    __slots__ = ("_hash",)
+
+    def __init__(self, store: FrozenTrailSeries | FrozenTrailSplit | None = None) -> None:
+        self._freeze(store=store)
+
+
+# Frozen nodes can't be changed, so editing an interned trail copies the edited path into plain trails.
+for _cls in (FrozenTrail, FrozenTrailSeries, FrozenTrailSplit):
+    _cls._trail_type, _cls._series_type, _cls._split_type = Trail, TrailSeries, TrailSplit
+
+
+class TrailInterner:
+    """
+    Canonicalises structurally equal trails, stores and mountains into shared Frozen* nodes.
+
+    Canonical nodes are kept in a table keyed by their type and (already canonical) children,
+    so looking a node up only hashes and compares a handful of references.
+    """
+
+    def __init__(self) -> None:
+        """
+        Complexity:
+        - O(1)
+        - Best case = Worst case
+        """
+        self._table = {}
+
+    def __len__(self) -> int:
+        """Returns the number of distinct canonical nodes."""
+        return len(self._table)
+
+    def clear(self) -> None:
+        """Forgets every canonical node. Nodes already handed out stay valid."""
+        self._table = {}
+
+    def _canonical(self, cls: type, *fields):
+        """Returns the canonical cls(*fields), creating it if it's the first of its kind."""
+        key = (cls,) + fields
+        node = self._table.get(key)
+        if node is None:
+            node = cls(*fields)
+            self._table[key] = node
+        return node
+
+    def mountain(self, mountain: Mountain) -> FrozenMountain:
+        """
+        Returns the canonical mountain equal to this one.
+
+        Complexity:
+        - O(hash(name))
+        - Best case = Worst case
+        """
+        return self._canonical(FrozenMountain, mountain.name, mountain.difficulty_level, mountain.length)
+
+    def intern(self, trail: Trail) -> FrozenTrail:
+        """
+        Returns the canonical trail structurally equal to this one.
+
+        Complexity:
+        - O(n), where n is the number of trails, stores and mountains in the trail
+        - Best case = Worst case
+        - Each node is visited twice at most, using a list as a stack instead of recursion
+        - Nodes that are shared within the trail are only interned once
+        """
+        done = {}
+        stack = [(trail, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if id(node) in done:
+                continue
+            store = node.store
+            if store is None:
+                done[id(node)] = self._canonical(FrozenTrail, None)
+            elif not children_done:
+                stack.append((node, True))
+                children = [store.following] if isinstance(store, CompactTrailSeries) else [store.path_top, store.path_bottom, store.path_follow]
+                stack.extend((child, False) for child in children if id(child) not in done)
+            elif isinstance(store, CompactTrailSeries):
+                canonical_store = self._canonical(
+                    FrozenTrailSeries,
+                    self.mountain(store.mountain),
+                    done[id(store.following)],
+                )
+                done[id(node)] = self._canonical(FrozenTrail, canonical_store)
+            else:
+                canonical_store = self._canonical(
+                    FrozenTrailSplit,
+                    done[id(store.path_top)],
+                    done[id(store.path_bottom)],
+                    done[id(store.path_follow)],
+                )
+                done[id(node)] = self._canonical(FrozenTrail, canonical_store)
+        return done[id(trail)]